@@ -0,0 +1,216 @@
+"""Detector and pipeline micro-benchmarks on seeded synthetic merchant windows.
+
+Builds one merchant window per size with `DataGenerator`, then times the
+window build, the fused analysis, each detector's analysis stage, the risk score
+and end-to-end `analyze_merchant_risk` against the in-memory Mongo and Redis
+stand-ins. Reports median latency, throughput, peak traced memory and the
+scaling exponent between consecutive sizes (1.0 is linear).
+
+Usage:
+    python -m benchmarks.bench_detectors [--sizes 1000 100000 1000000] [--repeat 5]
+        [--seed 42] [--executor auto] [--no-memory] [--json results.json]
+"""
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import math
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.stand_ins import install_stand_ins
+from src.models.risk_profile import RiskPatternType
+from src.services.data_generator import BusinessConfig, DataGenerator, TransactionConfig
+from src.services.detector_executor import DetectorExecutor, ExecutorMode
+from src.services.pattern_engine import (
+    STAGE_DETECTORS, TransactionWindow, WINDOW_FIELDS, analysis_stages, analyze_window, run_timed, sort_window
+)
+from src.services.risk_calculator import (
+    AdvancedRiskCalculator, RiskAnalysisContext, RiskCalculatorService
+)
+from src.utils.cache import cache
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+BUSINESS_CONFIG = BusinessConfig(
+    category_weights={"retail": 0.4, "food": 0.3, "services": 0.3},
+    revenue_ranges={"retail": (100000, 1000000), "food": (50000, 500000), "services": (75000, 750000)},
+    ticket_ranges={"retail": (50, 500), "food": (20, 200), "services": (100, 1000)},
+    operating_hours={"retail": [(9, 21)], "food": [(8, 22)], "services": [(9, 18)]},
+    seasonality={"q1": 0.8, "q2": 1.0, "q3": 1.2, "q4": 1.5},
+    risk_factors={"retail": 0.3, "food": 0.2, "services": 0.4}
+)
+
+TRANSACTION_CONFIG = TransactionConfig(
+    volume_ranges={"retail": (50, 500), "food": (100, 1000), "services": (20, 200)},
+    payment_methods={"credit": 0.4, "debit": 0.3, "wallet": 0.2, "upi": 0.1},
+    status_weights={"success": 0.95, "failed": 0.05},
+    platform_weights={"web": 0.4, "mobile": 0.4, "pos": 0.2},
+    time_patterns={"morning": [(9, 12)], "afternoon": [(12, 17)], "evening": [(17, 21)]}
+)
+
+
+async def _time(func: Callable[[], Awaitable[Optional[float]]], repeat: int) -> float:
+    """Median wall time of `func` in seconds, preferring the seconds it reports itself."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        reported = await func()
+        samples.append(reported if reported is not None else time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+async def _peak_memory(func: Callable[[], Awaitable]) -> int:
+    """Peak bytes traced while `func` runs once."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        await func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _stages(calculator: RiskCalculatorService, merchant_id: str, rows: List[Dict]) -> Dict[str, Callable[[], Awaitable]]:
+    """Benchmarked stages for one window, each an awaitable factory."""
+    params = calculator._analysis_params()
+    window = TransactionWindow.from_documents(merchant_id, rows)
+    ordered = sort_window(window)
+    analysis = analyze_window(window, params)
+    configs = calculator.pattern_configs
+
+    async def build_window():
+        TransactionWindow.from_documents(merchant_id, rows)
+
+    async def fused_analysis():
+        analyze_window(window, params)
+
+    def stage(func, args):
+        # The `_detect_*` methods only read the finished WindowAnalysis; the
+        # detector's real cost is its kernel over the ordered window
+        async def run():
+            return run_timed(func, *args)[1]
+        return run
+
+    async def comprehensive_risk():
+        patterns = [
+            pattern for pattern in [
+                await calculator._detect_late_night_pattern(analysis, configs[RiskPatternType.LATE_NIGHT]),
+                await calculator._detect_velocity_spike(analysis, configs[RiskPatternType.VELOCITY_SPIKE]),
+                await calculator._detect_split_transactions(analysis, configs[RiskPatternType.SPLIT_TRANSACTIONS]),
+                await calculator._detect_round_amount_pattern(analysis, configs[RiskPatternType.ROUND_AMOUNT]),
+                await calculator._detect_customer_concentration(analysis, configs[RiskPatternType.CUSTOMER_CONCENTRATION]),
+            ] if pattern
+        ]
+        context = RiskAnalysisContext(merchant_id=merchant_id)
+        await AdvancedRiskCalculator(context).calculate_comprehensive_risk(patterns)
+
+    async def end_to_end():
+        # New data version per run, as after ingest: pattern and timeline caches start cold
+        await cache.bump_data_version(merchant_id)
+        await calculator.analyze_merchant_risk(merchant_id)
+
+    return {
+        "build_window": build_window,
+        "fused_analysis": fused_analysis,
+        "sort_window (shared)": stage(sort_window, (window,)),
+        **{
+            f"{name} ({STAGE_DETECTORS[name]})": stage(func, args)
+            for name, (func, args) in analysis_stages(ordered, params).items()
+        },
+        "calculate_comprehensive_risk": comprehensive_risk,
+        "analyze_merchant_risk": end_to_end,
+    }
+
+
+async def run_benchmarks(
+    sizes: List[int], repeat: int, seed: int, executor_mode: str, measure_memory: bool
+) -> List[Dict]:
+    collections = install_stand_ins()
+    executor = DetectorExecutor(mode=executor_mode)
+    calculator = RiskCalculatorService(executor=executor)
+    results = []
+    try:
+        for size in sizes:
+            generator = DataGenerator(BUSINESS_CONFIG, TRANSACTION_CONFIG, seed=seed)
+            # Window ends "now" from the service's point of view
+            merchant, transactions = generator.generate_benchmark_window(size, days=30, end_date=datetime.utcnow())
+            merchant_id = merchant["merchant_id"]
+            collections["transactions"].insert_bulk(transactions)
+            rows = [{field: txn[field] for field in WINDOW_FIELDS} for txn in transactions]
+
+            for stage, func in _stages(calculator, merchant_id, rows).items():
+                await func()  # warm up
+                seconds = await _time(func, repeat)
+                result = {
+                    "size": size,
+                    "stage": stage,
+                    "median_ms": seconds * 1000,
+                    "throughput_tps": size / seconds if seconds else math.inf,
+                }
+                if measure_memory:
+                    result["peak_memory_mb"] = await _peak_memory(func) / 2**20
+                results.append(result)
+
+            del transactions, rows
+            collections["transactions"].__init__("transactions")
+            gc.collect()
+    finally:
+        executor.shutdown()
+    return results
+
+
+def _scaling(results: List[Dict]) -> None:
+    """Annotate each result with log(t2/t1) / log(n2/n1) against the previous size."""
+    previous: Dict[str, Dict] = {}
+    for result in results:
+        before = previous.get(result["stage"])
+        if before and result["size"] != before["size"] and before["median_ms"] > 0:
+            result["scaling_exponent"] = (
+                math.log(result["median_ms"] / before["median_ms"]) / math.log(result["size"] / before["size"])
+            )
+        previous[result["stage"]] = result
+
+
+def print_report(results: List[Dict]) -> None:
+    header = f"{'size':>9}  {'stage':<46} {'median ms':>11} {'txn/s':>14} {'peak MB':>9} {'scaling':>8}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        peak = f"{result['peak_memory_mb']:.1f}" if "peak_memory_mb" in result else "-"
+        scaling = f"{result['scaling_exponent']:.2f}" if "scaling_exponent" in result else "-"
+        print(
+            f"{result['size']:>9}  {result['stage']:<46} {result['median_ms']:>11.3f} "
+            f"{result['throughput_tps']:>14,.0f} {peak:>9} {scaling:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--executor", default=ExecutorMode.AUTO,
+                        choices=[ExecutorMode.INLINE, ExecutorMode.THREAD, ExecutorMode.PROCESS, ExecutorMode.AUTO])
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    # Detectors log on every call; keep the report readable
+    logging.disable(logging.INFO)
+    results = asyncio.run(run_benchmarks(
+        sorted(args.sizes), args.repeat, args.seed, args.executor, not args.no_memory
+    ))
+    _scaling(results)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""HTTP load harness for the API at a fixed target rate.
+
+Starts the app on the in-memory stand-ins (`benchmarks.stand_in_app`) in a
+uvicorn subprocess, seeds it with `DataGenerator` history through the bulk
+endpoint, then replays generated transactions against
+`POST /api/transactions` open-loop at the target rate, mixed with
+`GET /api/risks/{merchant_id}` and `GET /api/transactions` reads. Reports
+per-endpoint throughput, p50/p95/p99 latency and error rate.
+
+Requests are scheduled on a fixed clock and latency is measured from the
+scheduled send time, so time spent waiting for a free client connection
+behind a saturated server counts against the server rather than being
+hidden (coordinated omission).
+
+Passing several rates sweeps them in order and reports the highest rate
+that kept p99 under `--slo-ms`, errors under `--max-error-rate` and
+achieved throughput within 90% of the target.
+
+Usage:
+    python -m benchmarks.load_test --rates 50 100 200 400 [--duration 10]
+        [--risk-reads 0.1] [--list-reads 0.2] [--merchants 20] [--days 3]
+        [--url http://host:port] [--json results.json]
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+from src.services.data_generator import DataGenerator
+from benchmarks.bench_detectors import BUSINESS_CONFIG, TRANSACTION_CONFIG
+
+WRITE = "POST /api/transactions"
+RISK_READ = "GET /api/risks/{merchant_id}"
+LIST_READ = "GET /api/transactions"
+
+SEED_CHUNK_SIZE = 1000
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies_ms)
+
+    def summary(self, elapsed: float) -> Dict:
+        latencies = sorted(self.latencies_ms)
+        return {
+            "requests": self.requests,
+            "throughput_rps": (self.requests - self.errors) / elapsed if elapsed else 0.0,
+            "error_rate": self.errors / self.requests if self.requests else 0.0,
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "p99_ms": _percentile(latencies, 99),
+        }
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _to_request(transaction: Dict, merchant: Dict) -> Dict:
+    """Map a generated transaction onto the TransactionRequest body."""
+    location = transaction["location"]
+    return {
+        "merchant_id": transaction["merchant_id"],
+        "timestamp": transaction["timestamp"],
+        "amount": transaction["amount"],
+        "customer_id": transaction["customer_id"],
+        "device_id": transaction["device_id"],
+        "customer_location": f"{location['latitude']:.4f},{location['longitude']:.4f}",
+        "payment_method": transaction["payment_method"],
+        "status": transaction["status"],
+        "product_category": merchant["category"],
+        "platform": transaction["platform"],
+    }
+
+
+def build_workload(merchant_count: int, days: int, seed: int) -> Tuple[List[str], List[Dict]]:
+    """
+    Generate request bodies for `merchant_count` merchants over `days` days.
+
+    Returns:
+        Tuple of (merchant_ids, transaction bodies in timestamp order).
+    """
+    generator = DataGenerator(BUSINESS_CONFIG, TRANSACTION_CONFIG, seed=seed)
+    merchants, bodies = {}, []
+    for batch_merchants, transactions in generator.generate_dataset(merchant_count, days):
+        merchants.update((merchant["merchant_id"], merchant) for merchant in batch_merchants)
+        bodies.extend(_to_request(txn, merchants[txn["merchant_id"]]) for txn in transactions)
+    bodies.sort(key=lambda body: body["timestamp"])
+    return list(merchants), bodies
+
+
+async def seed_history(client: httpx.AsyncClient, bodies: List[Dict]) -> None:
+    """Load history through the NDJSON bulk endpoint."""
+    for start in range(0, len(bodies), SEED_CHUNK_SIZE):
+        chunk = bodies[start:start + SEED_CHUNK_SIZE]
+        response = await client.post(
+            "/api/transactions/bulk",
+            content="".join(json.dumps(body) + "\n" for body in chunk),
+            headers={"content-type": "application/x-ndjson"},
+        )
+        response.raise_for_status()
+
+
+async def _issue(
+    client: httpx.AsyncClient, endpoint: str, request: Tuple[str, str, Optional[Dict]],
+    intended: float, stats: Dict[str, EndpointStats]
+) -> None:
+    method, url, body = request
+    loop = asyncio.get_running_loop()
+    failed = False
+    try:
+        response = await client.request(method, url, json=body)
+        failed = response.status_code >= 400
+    except httpx.HTTPError:
+        failed = True
+    stats[endpoint].latencies_ms.append((loop.time() - intended) * 1000)
+    stats[endpoint].errors += failed
+
+
+async def run_step(
+    client: httpx.AsyncClient, rate: float, duration: float, mix: Dict[str, float],
+    writes: Iterator[Dict], merchant_ids: List[str], rng: random.Random
+) -> Dict:
+    """Drive one open-loop step at `rate` requests/s and summarize it per endpoint."""
+    loop = asyncio.get_running_loop()
+    stats = {endpoint: EndpointStats() for endpoint in mix}
+    endpoints, weights = list(mix), list(mix.values())
+    total = int(rate * duration)
+    tasks, max_lag = [], 0.0
+
+    started = loop.time()
+    for i in range(total):
+        intended = started + i / rate
+        delay = intended - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            max_lag = max(max_lag, -delay)
+
+        endpoint = rng.choices(endpoints, weights)[0]
+        if endpoint == WRITE:
+            request = ("POST", "/api/transactions", next(writes))
+        elif endpoint == RISK_READ:
+            request = ("GET", f"/api/risks/{rng.choice(merchant_ids)}", None)
+        else:
+            request = ("GET", f"/api/transactions?merchant_id={rng.choice(merchant_ids)}&limit=100", None)
+        tasks.append(asyncio.create_task(_issue(client, endpoint, request, intended, stats)))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - started
+
+    completed = sum(stats[endpoint].requests - stats[endpoint].errors for endpoint in mix)
+    return {
+        "target_rps": rate,
+        "achieved_rps": completed / elapsed if elapsed else 0.0,
+        # How far the scheduler itself fell behind; large values mean the client is the bottleneck
+        "max_schedule_lag_ms": max_lag * 1000,
+        "endpoints": {endpoint: stats[endpoint].summary(elapsed) for endpoint in mix},
+    }
+
+
+def step_passed(step: Dict, slo_ms: float, max_error_rate: float) -> bool:
+    endpoints = [summary for summary in step["endpoints"].values() if summary["requests"]]
+    return (
+        step["achieved_rps"] >= 0.9 * step["target_rps"]
+        and all(summary["p99_ms"] <= slo_ms for summary in endpoints)
+        and all(summary["error_rate"] <= max_error_rate for summary in endpoints)
+    )
+
+
+def start_server(port: int, workers: int, log_path: Optional[str] = None) -> subprocess.Popen:
+    log = open(log_path, "w") if log_path else subprocess.DEVNULL
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "benchmarks.stand_in_app:app",
+            "--port", str(port), "--workers", str(workers),
+            "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stdout=log,
+        stderr=log,
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/openapi.json")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError("API did not become ready")
+        await asyncio.sleep(0.2)
+
+
+async def run_load_test(args) -> List[Dict]:
+    mix = {RISK_READ: args.risk_reads, LIST_READ: args.list_reads}
+    mix[WRITE] = 1.0 - sum(mix.values())
+    if mix[WRITE] < 0:
+        raise SystemExit("--risk-reads and --list-reads must sum to at most 1")
+
+    merchant_ids, bodies = build_workload(args.merchants, args.days, args.seed)
+    split = int(len(bodies) * args.seed_fraction)
+    history, replay = bodies[:split], bodies[split:] or bodies
+    print(f"Generated {len(bodies)} transactions for {len(merchant_ids)} merchants; seeding {len(history)}")
+
+    server = None if args.url else start_server(args.port, args.workers, args.server_log)
+    base_url = args.url or f"http://127.0.0.1:{args.port}"
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+            await wait_until_ready(client)
+            await seed_history(client, history)
+
+            writes = itertools.cycle(replay)
+            rng = random.Random(args.seed)
+            steps = []
+            for rate in args.rates:
+                step = await run_step(client, rate, args.duration, mix, writes, merchant_ids, rng)
+                step["passed"] = step_passed(step, args.slo_ms, args.max_error_rate)
+                print_step(step)
+                steps.append(step)
+                if not step["passed"] and args.stop_on_failure:
+                    break
+            return steps
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+def print_step(step: Dict) -> None:
+    verdict = "ok" if step["passed"] else "BREAKDOWN"
+    print(
+        f"\ntarget {step['target_rps']:.0f} rps -> achieved {step['achieved_rps']:.1f} rps "
+        f"(scheduler lag {step['max_schedule_lag_ms']:.1f} ms) [{verdict}]"
+    )
+    print(f"  {'endpoint':<32} {'requests':>9} {'rps':>9} {'errors':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for endpoint, summary in step["endpoints"].items():
+        print(
+            f"  {endpoint:<32} {summary['requests']:>9} {summary['throughput_rps']:>9.1f} "
+            f"{summary['error_rate']:>8.2%} {summary['p50_ms']:>9.1f} {summary['p95_ms']:>9.1f} {summary['p99_ms']:>9.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", type=float, nargs="+", default=[100.0],
+                        help="target requests/s; several values run a sweep")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per rate")
+    parser.add_argument("--risk-reads", type=float, default=0.1, help="fraction of GET /api/risks/{id}")
+    parser.add_argument("--list-reads", type=float, default=0.2, help="fraction of GET /api/transactions")
+    parser.add_argument("--merchants", type=int, default=20)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--seed-fraction", type=float, default=0.5,
+                        help="share of generated transactions bulk-loaded before the run")
+    parser.add_argument("--connections", type=int, default=100, help="client connection limit")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--slo-ms", type=float, default=500.0, help="p99 latency budget per endpoint")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--stop-on-failure", action="store_true", help="end the sweep at the first breakdown")
+    parser.add_argument("--url", help="target a running API instead of starting one on the stand-ins")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="uvicorn workers for the local server; each holds its own in-memory data")
+    parser.add_argument("--server-log", help="write the local server's output to this file")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    steps = asyncio.run(run_load_test(args))
+    passing = [step["target_rps"] for step in steps if step["passed"]]
+    if len(steps) > 1:
+        ceiling = f"{max(passing):.0f} rps" if passing else "below the lowest rate"
+        print(f"\nHighest rate within SLO: {ceiling}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(steps, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
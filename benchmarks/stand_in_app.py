@@ -0,0 +1,25 @@
+"""The API app backed by the in-memory stand-ins, for load tests.
+
+    uvicorn benchmarks.stand_in_app:app --port 8001
+
+Startup installs the stand-ins instead of opening MongoDB and Redis pools,
+so requests exercise routing, validation, caching and the risk pipeline
+without a database in the measurement.
+"""
+from benchmarks.stand_ins import install_stand_ins
+from src.config.connections import connection_manager
+from src.main import app
+
+
+async def _connect_stand_ins() -> None:
+    install_stand_ins()
+
+
+async def _close_stand_ins() -> None:
+    pass
+
+
+connection_manager.connect = _connect_stand_ins
+connection_manager.close = _close_stand_ins
+
+__all__ = ["app"]
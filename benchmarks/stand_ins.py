@@ -0,0 +1,333 @@
+"""In-memory stand-ins for the Motor collections and the asyncio Redis client.
+
+They implement only the calls the API and services make, with no network or
+serialisation cost, so benchmarks and load tests measure this codebase rather
+than a database. Transactions are indexed by merchant and kept in timestamp
+order so window fetches are a binary search, like the compound index.
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+import time
+
+from pymongo import ReplaceOne
+
+from src.config.database import db
+from src.config.redis_client import redis_client
+
+
+class _Result:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def _get_path(doc: Dict, path: str) -> Any:
+    """Read a dotted path; missing parents read as None."""
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def _set_path(doc: Dict, path: str, value: Any) -> None:
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[leaf] = value
+
+
+def _matches(doc: Dict, query: Dict) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(doc, sub) for sub in condition):
+                return False
+            continue
+        if key == "$and":
+            if not all(_matches(doc, sub) for sub in condition):
+                return False
+            continue
+        value = _get_path(doc, key)
+        if isinstance(condition, dict) and any(op.startswith("$") for op in condition):
+            for op, operand in condition.items():
+                if op == "$gte" and not (value is not None and value >= operand):
+                    return False
+                if op == "$gt" and not (value is not None and value > operand):
+                    return False
+                if op == "$lte" and not (value is not None and value <= operand):
+                    return False
+                if op == "$lt" and not (value is not None and value < operand):
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$ne" and value == operand:
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _project(doc: Dict, projection: Optional[Dict]) -> Dict:
+    if not projection:
+        return dict(doc)
+    included = [key for key, flag in projection.items() if flag and key != "_id"]
+    if included:
+        return {key: doc[key] for key in included if key in doc}
+    return {key: value for key, value in doc.items() if projection.get(key, 1)}
+
+
+class InMemoryCursor:
+    def __init__(self, docs: List[Dict], projection: Optional[Dict]):
+        self._docs = docs
+        self._projection = projection
+        self._limit = 0
+
+    def sort(self, key_or_list, direction: int = 1) -> "InMemoryCursor":
+        keys = [(key_or_list, direction)] if isinstance(key_or_list, str) else list(key_or_list)
+        for key, key_direction in reversed(keys):
+            self._docs.sort(key=lambda doc: doc.get(key), reverse=key_direction < 0)
+        return self
+
+    def limit(self, count: int) -> "InMemoryCursor":
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int) -> "InMemoryCursor":
+        return self
+
+    def _results(self) -> List[Dict]:
+        docs = self._docs[:self._limit] if self._limit else self._docs
+        return [_project(doc, self._projection) for doc in docs]
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict]:
+        results = self._results()
+        return results[:length] if length else results
+
+    def __aiter__(self):
+        self._iter = iter(self._results())
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class InMemoryCollection:
+    """Motor-like collection; documents with a merchant_id are indexed by merchant and timestamp."""
+    def __init__(self, name: str):
+        self.name = name
+        self._by_merchant: Dict[Any, List[Dict]] = defaultdict(list)
+        self._times: Dict[Any, List[datetime]] = {}
+        self._unsorted = set()
+        self._by_id: Dict[Any, Dict] = {}
+
+    def __len__(self) -> int:
+        return sum(len(docs) for docs in self._by_merchant.values())
+
+    def _all(self) -> Iterable[Dict]:
+        for docs in self._by_merchant.values():
+            yield from docs
+
+    def _merchant_docs(self, merchant_id) -> List[Dict]:
+        if merchant_id in self._unsorted:
+            docs = self._by_merchant[merchant_id]
+            docs.sort(key=lambda doc: doc.get("timestamp") or datetime.min)
+            self._times[merchant_id] = [doc.get("timestamp") or datetime.min for doc in docs]
+            self._unsorted.discard(merchant_id)
+        return self._by_merchant.get(merchant_id, [])
+
+    def _candidates(self, query: Dict) -> Iterable[Dict]:
+        merchant_id = query.get("merchant_id")
+        if merchant_id is None or isinstance(merchant_id, dict):
+            return self._all()
+        docs = self._merchant_docs(merchant_id)
+        window = query.get("timestamp")
+        if isinstance(window, dict) and docs:
+            times = self._times[merchant_id]
+            low = bisect_left(times, window["$gte"]) if "$gte" in window else 0
+            high = bisect_right(times, window["$lte"]) if "$lte" in window else len(docs)
+            return docs[low:high]
+        return docs
+
+    def _find(self, query: Optional[Dict]) -> List[Dict]:
+        query = query or {}
+        if set(query) == {"_id"} and not isinstance(query["_id"], dict):
+            doc = self._by_id.get(query["_id"])
+            return [doc] if doc else []
+        return [doc for doc in self._candidates(query) if _matches(doc, query)]
+
+    def find(self, query: Optional[Dict] = None, projection: Optional[Dict] = None) -> InMemoryCursor:
+        return InMemoryCursor(self._find(query), projection)
+
+    async def find_one(self, query: Optional[Dict] = None, projection: Optional[Dict] = None) -> Optional[Dict]:
+        docs = self._find(query)
+        return _project(docs[0], projection) if docs else None
+
+    async def count_documents(self, query: Optional[Dict] = None) -> int:
+        return len(self._find(query))
+
+    def _insert(self, doc: Dict) -> None:
+        doc.setdefault("_id", doc.get("transaction_id") or f"{self.name}-{len(self._by_id)}")
+        merchant_id = doc.get("merchant_id")
+        self._by_merchant[merchant_id].append(doc)
+        self._unsorted.add(merchant_id)
+        self._by_id[doc["_id"]] = doc
+
+    async def insert_one(self, doc: Dict):
+        self._insert(doc)
+        return _Result(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs: List[Dict], ordered: bool = True):
+        for doc in docs:
+            self._insert(doc)
+        return _Result(inserted_ids=[doc["_id"] for doc in docs])
+
+    def insert_bulk(self, docs: Iterable[Dict]) -> None:
+        """Synchronous bulk load for seeding."""
+        for doc in docs:
+            self._insert(doc)
+
+    async def update_one(self, query: Dict, update: Dict, upsert: bool = False):
+        docs = self._find(query)
+        if docs:
+            self._apply(docs[0], update)
+            return _Result(matched_count=1, upserted_id=None)
+        if upsert:
+            doc = {}
+            for key, value in query.items():
+                if not key.startswith("$"):
+                    _set_path(doc, key, value)
+            self._apply(doc, update, inserting=True)
+            self._insert(doc)
+            return _Result(matched_count=0, upserted_id=doc["_id"])
+        return _Result(matched_count=0, upserted_id=None)
+
+    async def update_many(self, query: Dict, update: Dict):
+        docs = self._find(query)
+        for doc in docs:
+            self._apply(doc, update)
+        return _Result(matched_count=len(docs), modified_count=len(docs))
+
+    def _apply(self, doc: Dict, update: Dict, inserting: bool = False) -> None:
+        fields = dict(update.get("$setOnInsert", {})) if inserting else {}
+        fields.update(update.get("$set", {}))
+        for path, value in fields.items():
+            _set_path(doc, path, value)
+        for path, amount in update.get("$inc", {}).items():
+            *parents, leaf = path.split(".")
+            target = doc
+            for part in parents:
+                target = target.setdefault(part, {})
+            target[leaf] = target.get(leaf, 0) + amount
+
+    async def bulk_write(self, requests: List, ordered: bool = True):
+        for request in requests:
+            if isinstance(request, ReplaceOne):
+                existing = self._find(request._filter)
+                target = existing[0] if existing else dict(request._filter)
+                for key in [key for key in target if key != "_id"]:
+                    del target[key]
+                target.update(request._doc)
+                if not existing:
+                    self._insert(target)
+            else:
+                await self.update_one(request._filter, request._doc, upsert=request._upsert)
+        return _Result(acknowledged=True)
+
+    async def create_index(self, *args, **kwargs) -> str:
+        return "in-memory"
+
+    def aggregate(self, pipeline: List[Dict], **kwargs):
+        raise NotImplementedError("Aggregation pipelines are not supported by the in-memory stand-in")
+
+
+class InMemoryPipeline:
+    def __init__(self, redis: "InMemoryRedis"):
+        self._redis = redis
+        self._commands = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [await getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+
+class InMemoryRedis:
+    """The subset of redis.asyncio.Redis used by the cache, with TTLs honoured on read."""
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._expiry: Dict[str, float] = {}
+
+    def _live(self, key: str) -> bool:
+        expiry = self._expiry.get(key)
+        if expiry is not None and expiry <= time.monotonic():
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+        return key in self._data
+
+    async def ping(self) -> bool:
+        return True
+
+    async def get(self, key: str):
+        return self._data.get(key) if self._live(key) else None
+
+    async def mget(self, keys: List[str]) -> List[Any]:
+        return [self._data.get(key) if self._live(key) else None for key in keys]
+
+    async def set(self, key: str, value: Any) -> bool:
+        self._data[key] = str(value)
+        self._expiry.pop(key, None)
+        return True
+
+    async def setex(self, key: str, ttl: int, value: Any) -> bool:
+        self._data[key] = str(value)
+        if ttl:
+            self._expiry[key] = time.monotonic() + ttl
+        return True
+
+    async def incr(self, key: str) -> int:
+        value = int(self._data.get(key, 0) if self._live(key) else 0) + 1
+        self._data[key] = str(value)
+        return value
+
+    async def delete(self, *keys: str) -> int:
+        removed = sum(1 for key in keys if self._data.pop(key, None) is not None)
+        for key in keys:
+            self._expiry.pop(key, None)
+        return removed
+
+    def pipeline(self, transaction: bool = True) -> InMemoryPipeline:
+        return InMemoryPipeline(self)
+
+    async def close(self) -> None:
+        pass
+
+
+def install_stand_ins() -> Dict[str, InMemoryCollection]:
+    """
+    Point the shared `db` and `redis_client` at in-memory stand-ins.
+
+    Returns:
+        The collections by name, for seeding.
+    """
+    collections = {
+        name: InMemoryCollection(name)
+        for name in ("merchants", "transactions", "risk_patterns", "risk_profiles",
+                     "timeline_events", "transaction_rollups")
+    }
+    db.merchant_collection = db.merchants = collections["merchants"]
+    db.transaction_collection = db.transactions = collections["transactions"]
+    db.risk_pattern_collection = db.risk_patterns = collections["risk_patterns"]
+    db.risk_profile_collection = db.risk_profiles = collections["risk_profiles"]
+    db.timeline_event_collection = db.timeline_events = collections["timeline_events"]
+    db.transaction_rollup_collection = collections["transaction_rollups"]
+    redis_client.client = InMemoryRedis()
+    return collections
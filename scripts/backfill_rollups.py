@@ -0,0 +1,24 @@
+"""Build the transaction rollup collection from existing transactions.
+
+Usage:
+    python -m scripts.backfill_rollups [merchant_id ...]
+"""
+import asyncio
+import sys
+
+from src.config.database import db
+from src.config.settings import get_settings
+from src.services.transaction_rollup import TransactionRollup
+
+
+async def main(merchant_ids):
+    await db.connect_to_mongodb(get_settings())
+    try:
+        written = await TransactionRollup().backfill(merchant_ids or None)
+        print(f"Wrote {written} rollup documents")
+    finally:
+        await db.close_mongodb_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
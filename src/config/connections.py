@@ -0,0 +1,78 @@
+from typing import Dict, Optional
+import asyncio
+import logging
+import time
+
+from src.config.database import Database, db
+from src.config.redis_client import RedisClient, redis_client
+from src.config.settings import Settings, get_settings
+
+logger = logging.getLogger("ConnectionManager")
+
+
+class ConnectionManager:
+    """
+    Owns the shared MongoDB and Redis connection pools.
+
+    Both pools are configured from `Settings`, opened and warmed at startup,
+    probed by the health endpoint and report their saturation counters.
+    """
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        database: Database = db,
+        redis: RedisClient = redis_client,
+        probe_timeout: float = 2.0
+    ):
+        self.settings = settings
+        self.database = database
+        self.redis = redis
+        self.probe_timeout = probe_timeout
+
+    async def connect(self) -> None:
+        """Open both pools, then warm them up."""
+        settings = self.settings or get_settings()
+        await self.database.connect_to_mongodb(settings)
+        await self.redis.connect_to_redis(settings)
+        await self.warm_up(settings.pool_warmup_connections)
+
+    async def warm_up(self, connections: int) -> None:
+        """
+        Open `connections` sockets per pool before traffic arrives.
+
+        Concurrent pings each check out their own connection, so the first
+        burst of requests does not pay for TCP/TLS handshakes and auth.
+        """
+        if connections <= 0:
+            return
+        started = time.perf_counter()
+        await asyncio.gather(*(self.database.ping() for _ in range(connections)))
+        await asyncio.gather(*(self.redis.ping() for _ in range(connections)))
+        logger.info(
+            f"Warmed {connections} connections per pool in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+
+    async def _probe(self, probe) -> Dict:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), timeout=self.probe_timeout)
+            return {"status": "ok", "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+        except Exception as e:
+            return {"status": "error", "error": str(e) or type(e).__name__}
+
+    async def health(self) -> Dict[str, Dict]:
+        """Probe MongoDB and Redis concurrently."""
+        mongodb, redis = await asyncio.gather(self._probe(self.database.ping), self._probe(self.redis.ping))
+        return {"mongodb": mongodb, "redis": redis}
+
+    def pool_stats(self) -> Dict[str, Dict]:
+        """Connection pool saturation counters for both pools."""
+        return {"mongodb": self.database.pool_monitor.stats(), "redis": self.redis.pool_stats()}
+
+    async def close(self) -> None:
+        await self.database.close_mongodb_connection()
+        await self.redis.close_redis_connection()
+
+
+# Shared connection manager for this worker
+connection_manager = ConnectionManager()
@@ -1,26 +1,165 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import IndexModel
-from typing import Optional
+from pymongo import IndexModel, monitoring
+from pymongo.errors import OperationFailure
+from typing import Dict, Iterable, Optional
+from src.config.settings import Settings, get_settings
+from src.utils.metrics import DB_COMMAND_SECONDS
+
+
+def projection(fields: Iterable[str]) -> Dict[str, int]:
+    """
+    Build a Mongo projection returning only `fields`.
+
+    `_id` is excluded so queries whose fields are all in an index can be
+    answered from the index alone (a covered query).
+    """
+    return {"_id": 0, **{field: 1 for field in fields}}
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    Connection pool counters for the Motor client, summed across servers.
+
+    Events arrive on Motor's worker threads; counts are best-effort gauges.
+    """
+    def __init__(self):
+        self.max_pool_size = 0
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.waiting = 0
+        self.check_out_failures = 0
+        self.wait_queue_timeouts = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_pool_size": self.max_pool_size,
+            "open": self.created - self.closed,
+            "checked_out": self.checked_out,
+            "peak_checked_out": self.peak_checked_out,
+            "waiting": self.waiting,
+            "check_out_failures": self.check_out_failures,
+            "wait_queue_timeouts": self.wait_queue_timeouts,
+        }
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.closed += 1
+
+    def connection_check_out_started(self, event):
+        self.waiting += 1
+
+    def connection_check_out_failed(self, event):
+        self.waiting -= 1
+        self.check_out_failures += 1
+        if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+            self.wait_queue_timeouts += 1
+
+    def connection_checked_out(self, event):
+        self.waiting -= 1
+        self.checked_out += 1
+        self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def connection_checked_in(self, event):
+        self.checked_out -= 1
+
+
+class CommandTimer(monitoring.CommandListener):
+    """
+    Records every MongoDB command's driver-side duration by collection and command.
+
+    The collection is only present on the started event, so it is held by
+    request id until the command finishes; getMore is labelled with the
+    collection of its cursor.
+    """
+    def __init__(self):
+        self._collections: Dict[int, str] = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        self._collections[event.request_id] = collection if isinstance(collection, str) else ""
+
+    def _finish(self, event, outcome: str):
+        collection = self._collections.pop(event.request_id, "")
+        DB_COMMAND_SECONDS.observe(event.duration_micros / 1e6, collection, event.command_name, outcome)
+
+    def succeeded(self, event):
+        self._finish(event, "success")
+
+    def failed(self, event):
+        self._finish(event, "failure")
+
 
 class Database:
     client: Optional[AsyncIOMotorClient] = None
     
     def __init__(self):
+        self.pool_monitor = PoolMonitor()
+        self.command_timer = CommandTimer()
         self.merchant_db = None
         self.merchant_collection = None
         self.transaction_collection = None
         self.risk_pattern_collection = None
+        self.transaction_rollup_collection = None
+        self.risk_profile_collection = None
+        self.timeline_event_collection = None
+        self.merchants = self.transactions = self.risk_patterns = None
+        self.risk_profiles = self.timeline_events = None
 
-    async def connect_to_mongodb(self):
-        """Connect to MongoDB."""
+    async def connect_to_mongodb(self, settings: Optional[Settings] = None):
+        """Connect to MongoDB with the pool, compression and timeouts from `settings`."""
+        settings = settings or get_settings()
         try:
-            self.client = AsyncIOMotorClient("mongodb://localhost:27017")
-            self.merchant_db = self.client.merchant_risk_db
+            self.client = AsyncIOMotorClient(
+                settings.mongo_connection_string,
+                maxPoolSize=settings.mongo_max_pool_size,
+                minPoolSize=settings.mongo_min_pool_size,
+                maxIdleTimeMS=settings.mongo_max_idle_time_ms,
+                waitQueueTimeoutMS=settings.mongo_wait_queue_timeout_ms,
+                compressors=settings.mongo_compressors,
+                zlibCompressionLevel=settings.mongo_zlib_compression_level,
+                serverSelectionTimeoutMS=settings.mongo_server_selection_timeout_ms,
+                connectTimeoutMS=settings.mongo_connect_timeout_ms,
+                socketTimeoutMS=settings.mongo_socket_timeout_ms,
+                event_listeners=[self.pool_monitor, self.command_timer]
+            )
+            self.pool_monitor.max_pool_size = settings.mongo_max_pool_size
+            self.merchant_db = self.client[settings.database_name]
             
             # Initialize collections
             self.merchant_collection = self.merchant_db.merchants
             self.transaction_collection = self.merchant_db.transactions
             self.risk_pattern_collection = self.merchant_db.risk_patterns
+            self.transaction_rollup_collection = self.merchant_db.transaction_rollups
+            self.risk_profile_collection = self.merchant_db.risk_profiles
+            self.timeline_event_collection = self.merchant_db.timeline_events
+
+            # Short names used by routes and services, as in scripts/initialize_db.py
+            self.merchants = self.merchant_collection
+            self.transactions = self.transaction_collection
+            self.risk_patterns = self.risk_pattern_collection
+            self.risk_profiles = self.risk_profile_collection
+            self.timeline_events = self.timeline_event_collection
             
             # Create indexes
             await self.create_indexes()
@@ -41,15 +180,54 @@ class Database:
         await self.transaction_collection.create_index("transaction_id", unique=True)
         await self.transaction_collection.create_index("merchant_id")
         await self.transaction_collection.create_index("timestamp")
+        # Keyset pagination on (timestamp, transaction_id) without a blocking sort;
+        # its (merchant_id, timestamp) prefix also serves merchant time-range queries
+        await self.transaction_collection.create_index([
+            ("merchant_id", 1),
+            ("timestamp", -1),
+            ("transaction_id", -1)
+        ])
+        await self._drop_index_if_exists(self.transaction_collection, "merchant_id_1_timestamp_-1")
+        # Covers risk analysis window fetches (WINDOW_FIELDS) and daily summaries
         await self.transaction_collection.create_index([
             ("merchant_id", 1),
-            ("timestamp", -1)
+            ("timestamp", 1),
+            ("amount", 1),
+            ("customer_id", 1)
+        ])
+
+        # Rollup indexes (one document per merchant per UTC day)
+        await self.transaction_rollup_collection.create_index([
+            ("merchant_id", 1),
+            ("date", 1)
+        ])
+
+        # Risk profile indexes (precomputed profiles are read by merchant_id)
+        await self.risk_profile_collection.create_index("merchant_id", unique=True)
+
+        # Timeline indexes (daily summaries are upserted on this key)
+        await self.timeline_event_collection.create_index([
+            ("merchant_id", 1),
+            ("event_type", 1),
+            ("timestamp", 1)
         ])
 
         # Risk pattern indexes
         await self.risk_pattern_collection.create_index("pattern_id", unique=True)
         await self.risk_pattern_collection.create_index("name", unique=True)
 
+    async def _drop_index_if_exists(self, collection, name: str) -> None:
+        """Drop an index superseded by another one; a no-op when it is already gone."""
+        try:
+            await collection.drop_index(name)
+        except OperationFailure as e:
+            if e.code != 27:  # IndexNotFound
+                raise
+
+    async def ping(self) -> None:
+        """Health probe: round trip to the server."""
+        await self.client.admin.command("ping")
+
     async def close_mongodb_connection(self):
         """Close MongoDB connection."""
         if self.client:
@@ -0,0 +1,66 @@
+from redis import asyncio as aioredis
+from typing import Dict, Optional
+from src.config.settings import Settings, get_settings
+
+class RedisClient:
+    client: Optional[aioredis.Redis] = None
+
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings
+        self.pool: Optional[aioredis.BlockingConnectionPool] = None
+
+    def configure(self, settings: Settings) -> None:
+        """Use `settings` for the pool created on next use."""
+        self.settings = settings
+
+    def get_client(self) -> aioredis.Redis:
+        """Return the shared asyncio Redis client, creating its connection pool on first use."""
+        if self.client is None:
+            settings = self.settings or get_settings()
+            # Blocking pool: a burst waits up to redis_pool_timeout for a free
+            # connection instead of failing with "Too many connections"
+            self.pool = aioredis.BlockingConnectionPool.from_url(
+                settings.redis_url,
+                max_connections=settings.redis_max_connections,
+                timeout=settings.redis_pool_timeout,
+                socket_timeout=settings.redis_socket_timeout,
+                socket_connect_timeout=settings.redis_socket_connect_timeout,
+                health_check_interval=settings.redis_health_check_interval,
+                decode_responses=True
+            )
+            self.client = aioredis.Redis(connection_pool=self.pool)
+        return self.client
+
+    async def connect_to_redis(self, settings: Optional[Settings] = None):
+        """Create the pool and verify the server is reachable."""
+        if settings is not None:
+            self.configure(settings)
+        await self.ping()
+        print("Successfully connected to Redis")
+
+    async def ping(self) -> None:
+        """Health probe: round trip to the server."""
+        await self.get_client().ping()
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Open, idle and in-use connection counts for the shared pool."""
+        if self.pool is None:
+            return {"max_connections": 0, "open": 0, "in_use": 0}
+        # The pool queue holds idle connections plus None placeholders for unopened slots
+        return {
+            "max_connections": self.pool.max_connections,
+            "open": len(self.pool._connections),
+            "in_use": self.pool.max_connections - self.pool.pool.qsize(),
+        }
+
+    async def close_redis_connection(self):
+        """Close the client and disconnect every pooled connection."""
+        if self.client:
+            await self.client.close()
+            await self.pool.disconnect()
+            self.client = None
+            self.pool = None
+            print("Redis connection closed")
+
+# Create a shared Redis instance
+redis_client = RedisClient()
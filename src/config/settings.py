@@ -1,12 +1,55 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
-    mongo_connection_string: str
-    database_name: str
-    api_port: int
-    environment: str
-    log_level: str
+    mongo_connection_string: str = "mongodb://localhost:27017"
+    database_name: str = "merchant_risk_db"
+    api_port: int = 8000
+    environment: str = "development"
+    log_level: str = "INFO"
+    log_json: bool = True
+    log_queue_size: int = 10000  # records buffered for the writer thread before dropping
+    log_rate_limit_per_second: float = 10.0  # per message template, below ERROR
+    log_rate_limit_burst: int = 50
+
+    # MongoDB connection pool
+    mongo_max_pool_size: int = 100
+    mongo_min_pool_size: int = 10
+    mongo_max_idle_time_ms: int = 300000
+    mongo_wait_queue_timeout_ms: int = 2000
+    mongo_compressors: str = "zlib"  # comma-separated; snappy/zstd need their client packages
+    mongo_zlib_compression_level: int = 1
+    mongo_server_selection_timeout_ms: int = 5000
+    mongo_connect_timeout_ms: int = 5000
+    mongo_socket_timeout_ms: int = 30000
+
+    # Redis connection pool, shared by every cache user
+    redis_url: str = "redis://localhost:6379/0"
+    redis_max_connections: int = 50
+    redis_pool_timeout: float = 2.0  # seconds to wait for a free connection
+    redis_socket_timeout: float = 5.0
+    redis_socket_connect_timeout: float = 2.0
+    redis_health_check_interval: int = 30
+
+    # Window analysis executor (see src/services/detector_executor.py)
+    detector_executor_mode: str = "auto"  # inline, thread, process or auto
+    detector_process_threshold: int = 50000  # transactions; auto mode uses processes at or above this
+    detector_max_thread_workers: Optional[int] = None  # None lets the executor pick
+    detector_max_process_workers: Optional[int] = None
+
+    # How risk analyses read a merchant's window: columnar, incremental or aggregation
+    risk_analysis_mode: str = "columnar"
+
+    # Limits for POST /transactions/bulk; larger requests get 413
+    bulk_max_items: int = 100000
+    bulk_max_bytes: int = 64 * 1024 * 1024
+
+    # Token for profiling and other admin endpoints; they are disabled when unset
+    admin_token: Optional[str] = None
+
+    # Connections opened per pool at startup
+    pool_warmup_connections: int = 10
 
     class Config:
         env_file = ".env"
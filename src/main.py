@@ -3,17 +3,30 @@ from fastapi.responses import JSONResponse
 from src.routes.merchant_routes import router as merchant_router
 from src.routes.risk_routes import router as risk_router
 from src.routes.transaction_routes import router as transaction_router
-from src.config.database import db
+from src.routes.health_routes import router as health_router
+from src.routes.metrics_routes import router as metrics_router
+from src.routes.admin_routes import router as admin_router
+from src.config.connections import connection_manager
+from src.config.settings import get_settings
+from src.services.detector_executor import detector_executor
+from src.services.risk_profile_worker import risk_profile_worker
 from src.middleware.validation import validation_middleware
+from src.middleware.metrics import metrics_middleware
+from src.middleware.request_context import request_context_middleware
 from src.middleware.exception_handler import custom_exception_handler, validation_exception_handler
 import logging
-from src.utils.exceptions import DatabaseConnectionError, MerchantNotFoundError, RiskProfileNotFoundError, InvalidTransactionError, GeneralAPIError
+from src.utils.logging import configure_logging, shutdown_logging
+from src.utils.exceptions import DatabaseConnectionError, MerchantNotFoundError, RiskProfileNotFoundError, InvalidTransactionError, GeneralAPIError, InvalidCursorError, AdminAuthError
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+settings = get_settings()
+configure_logging(
+    level=settings.log_level,
+    json_format=settings.log_json,
+    queue_size=settings.log_queue_size,
+    rate_limit_per_second=settings.log_rate_limit_per_second,
+    rate_limit_burst=settings.log_rate_limit_burst
 )
 logger = logging.getLogger("MainApp")
 
@@ -25,11 +38,18 @@ app = FastAPI(
 
 # Register Middleware
 app.middleware("http")(validation_middleware)
+# Wraps validation so it also times rejected requests
+app.middleware("http")(metrics_middleware)
+# Outermost, so every record of a request carries its id
+app.middleware("http")(request_context_middleware)
 
 # Register Routers
 app.include_router(merchant_router, prefix="/api")
 app.include_router(risk_router, prefix="/api")
 app.include_router(transaction_router, prefix="/api")
+app.include_router(health_router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
+app.include_router(metrics_router)
 
 # Exception Handlers
 app.add_exception_handler(ValidationError, validation_exception_handler)
@@ -39,21 +59,27 @@ app.add_exception_handler(MerchantNotFoundError, custom_exception_handler)
 app.add_exception_handler(RiskProfileNotFoundError, custom_exception_handler)
 app.add_exception_handler(InvalidTransactionError, custom_exception_handler)
 app.add_exception_handler(GeneralAPIError, custom_exception_handler)
+app.add_exception_handler(InvalidCursorError, custom_exception_handler)
+app.add_exception_handler(AdminAuthError, custom_exception_handler)
 
 @app.on_event("startup")
 async def startup_db_client():
     try:
-        await db.connect_to_mongodb()
-        logger.info("Connected to MongoDB successfully.")
+        await connection_manager.connect()
+        logger.info("Connected to MongoDB and Redis successfully.")
     except Exception as e:
-        logger.error(f"Failed to connect to MongoDB: {e}")
+        logger.error(f"Failed to connect to MongoDB/Redis: {e}")
         raise DatabaseConnectionError(detail=str(e))
+    risk_profile_worker.start()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await risk_profile_worker.stop()
     try:
-        await db.close_mongodb_connection()
-        logger.info("Disconnected from MongoDB successfully.")
+        await connection_manager.close()
+        logger.info("Disconnected from MongoDB and Redis successfully.")
     except Exception as e:
-        logger.error(f"Error disconnecting from MongoDB: {e}")
+        logger.error(f"Error disconnecting from MongoDB/Redis: {e}")
         # Not raising exception on shutdown
+    detector_executor.shutdown()
+    shutdown_logging()
@@ -15,7 +15,7 @@ async def custom_exception_handler(request: Request, exc: GeneralAPIError):
     )
 
 async def validation_exception_handler(request: Request, exc):
-    logger.warning(f"Validation error for request {request.url.path}: {exc}")
+    logger.warning("Validation error for request %s: %s", request.url.path, exc)
     return JSONResponse(
         status_code=400,
         content={"error": "Invalid input", "details": exc.errors()},
@@ -0,0 +1,22 @@
+from fastapi import Request
+import time
+
+from src.utils.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT
+
+async def metrics_middleware(request: Request, call_next):
+    """Time every request by its route template, so merchant ids do not explode the label set."""
+    started = time.perf_counter()
+    status = 500
+    with HTTP_REQUESTS_IN_FLIGHT.track_inflight(request.method):
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                request.method,
+                route.path if route is not None else "unmatched",
+                str(status)
+            )
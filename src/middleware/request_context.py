@@ -0,0 +1,14 @@
+from fastapi import Request
+import uuid
+
+from src.utils.logging import log_context
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+async def request_context_middleware(request: Request, call_next):
+    """Tag every log record of the request with its id, taken from X-Request-ID when the caller sends one."""
+    request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+    with log_context(request_id=request_id):
+        response = await call_next(request)
+    response.headers[REQUEST_ID_HEADER] = request_id
+    return response
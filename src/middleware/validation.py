@@ -0,0 +1,23 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+import logging
+
+logger = logging.getLogger("ValidationMiddleware")
+
+BODY_METHODS = {"POST", "PUT", "PATCH"}
+ACCEPTED_CONTENT_TYPES = ("application/json", "application/x-ndjson")
+
+async def validation_middleware(request: Request, call_next):
+    """Reject write requests whose body is not JSON or NDJSON before they reach a route."""
+    has_body = request.headers.get("content-length", "0") != "0" or "transfer-encoding" in request.headers
+    if request.method in BODY_METHODS and has_body:
+        content_type = request.headers.get("content-type", "")
+        if not content_type.startswith(ACCEPTED_CONTENT_TYPES):
+            logger.warning(
+                "Rejected %s %s with content type '%s'", request.method, request.url.path, content_type
+            )
+            return JSONResponse(
+                status_code=415,
+                content={"error": "Content-Type must be application/json or application/x-ndjson"},
+            )
+    return await call_next(request)
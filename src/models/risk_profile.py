@@ -10,6 +10,11 @@ class RiskPatternType(str, Enum):
     ROUND_AMOUNT = "round_amount_pattern"
     CUSTOMER_CONCENTRATION = "customer_concentration"
 
+class RiskStatus(str, Enum):
+    LOW = "low_risk"
+    MEDIUM = "medium_risk"
+    HIGH = "high_risk"
+
 class PatternCharacteristics(BaseModel):
     time_window: Optional[str]
     volume_percentage: Optional[float]
@@ -26,24 +31,6 @@ class PatternCharacteristics(BaseModel):
     regular_frequency: Optional[str]
     relationship: Optional[str]
 
-class RiskPattern(BaseModel):
-    name: RiskPatternType
-    characteristics: PatternCharacteristics
-    red_flags: List[str]
-    confidence_score: float = Field(0.0, ge=0.0, le=1.0)
-    detection_time: datetime = Field(default_factory=datetime.utcnow)
-    supporting_evidence: List[str] = []
-    transaction_ids: List[str] = []
-
-class RiskProfileResponse(BaseModel):
-    merchant_id: str
-    overall_risk_score: float = Field(..., ge=0.0, le=100.0)
-    detected_patterns: List[RiskPattern]
-    last_updated: datetime
-    risk_factors: List[str]
-    monitoring_status: RiskStatus
-    review_required: bool
-
 class RiskPattern(BaseModel):
     pattern_id: str = Field(..., description="Unique identifier for risk pattern")
     name: str
@@ -53,11 +40,6 @@ class RiskPattern(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
-class RiskStatus(str, Enum):
-    LOW = "low_risk"
-    MEDIUM = "medium_risk"
-    HIGH = "high_risk"
-
 class MerchantRiskProfile(BaseModel):
     merchant_id: str = Field(..., description="Unique identifier for merchant")
     overall_risk_score: float = Field(..., ge=0.0, le=100.0)
@@ -68,4 +50,14 @@ class MerchantRiskProfile(BaseModel):
     review_required: bool = False
 
 class RiskProfileResponse(BaseModel):
-    merchant_risk_profile: MerchantRiskProfile
+    merchant_id: str
+    overall_risk_score: float = Field(..., ge=0.0, le=100.0)
+    detected_patterns: List[RiskPattern]
+    last_updated: datetime
+    risk_factors: List[str]
+    monitoring_status: RiskStatus
+    review_required: bool
+
+class BatchRiskResponse(BaseModel):
+    profiles: List[RiskProfileResponse]
+    errors: Dict[str, str] = Field(default_factory=dict, description="Error message per failed merchant")
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Dict, Optional
+
+class TimelineEvent(BaseModel):
+    merchant_id: str = Field(..., description="Reference to merchant")
+    event_type: str
+    timestamp: datetime
+    description: str
+    severity: str
+    metadata: Optional[Dict] = Field(default_factory=dict)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class TransactionRequest(BaseModel):
     merchant_id: str = Field(..., description="Reference to merchant")
@@ -26,8 +26,19 @@ class TransactionResponse(BaseModel):
     status: str
     product_category: str
     platform: str
-    velocity_flag: bool
-    amount_flag: bool
-    time_flag: bool
-    device_flag: bool
+    velocity_flag: bool = False
+    amount_flag: bool = False
+    time_flag: bool = False
+    device_flag: bool = False
     created_at: datetime
+
+class BulkTransactionResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the request body")
+    status: str
+    transaction_id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkTransactionResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkTransactionResult]
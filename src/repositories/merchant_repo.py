@@ -1,7 +1,10 @@
 from src.config.database import db
+from src.utils.metrics import REPOSITORY_SECONDS, timed
 
+@timed(REPOSITORY_SECONDS, "merchant", "create_merchant")
 async def create_merchant(merchant_data: dict):
     return await db.merchant_collection.insert_one(merchant_data)
 
+@timed(REPOSITORY_SECONDS, "merchant", "get_merchant")
 async def get_merchant(merchant_id: str):
     return await db.merchant_collection.find_one({"merchant_id": merchant_id})
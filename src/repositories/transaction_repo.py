@@ -1,9 +1,12 @@
-from typing import Optional, List
+from typing import AsyncIterator, Dict, Optional, List, Tuple
 from src.config.database import db
 from src.models.transaction import TransactionResponse
+from src.utils.metrics import REPOSITORY_SECONDS, timed
+from src.utils.pagination import KEYSET_SORT, encode_cursor, keyset_filter
 
 
 class TransactionRepository:
+    @timed(REPOSITORY_SECONDS, "transaction", "get_transaction")
     async def get_transaction(self, transaction_id: str) -> Optional[TransactionResponse]:
         """Fetch a transaction by its ID."""
         transaction_data = await db.transactions.find_one({"transaction_id": transaction_id})
@@ -11,11 +14,44 @@ class TransactionRepository:
             return TransactionResponse(**transaction_data)
         return None
 
-    async def list_transactions(self, merchant_id: str) -> List[TransactionResponse]:
-        """List all transactions for a given merchant."""
-        transactions_data = await db.transactions.find({"merchant_id": merchant_id}).to_list(None)
-        return [TransactionResponse(**txn) for txn in transactions_data]
+    @timed(REPOSITORY_SECONDS, "transaction", "find_page")
+    async def find_page(
+        self, merchant_id: str, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Fetch one page of a merchant's transactions, newest first.
 
+        Returns:
+            The raw documents and the cursor for the next page, or None on the last page.
+        """
+        transactions_data = await db.transactions.find(
+            keyset_filter(merchant_id, cursor), {"_id": 0}
+        ).sort(KEYSET_SORT).limit(limit + 1).to_list(limit + 1)
+
+        next_cursor = None
+        if len(transactions_data) > limit:
+            transactions_data = transactions_data[:limit]
+            last = transactions_data[-1]
+            next_cursor = encode_cursor(last["timestamp"], last["transaction_id"])
+        return transactions_data, next_cursor
+
+    async def list_transactions(
+        self, merchant_id: str, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[TransactionResponse], Optional[str]]:
+        """List one page of transactions for a given merchant, with the next page's cursor."""
+        transactions_data, next_cursor = await self.find_page(merchant_id, limit, cursor)
+        return [TransactionResponse(**txn) for txn in transactions_data], next_cursor
+
+    async def stream_transactions(
+        self, merchant_id: str, cursor: Optional[str] = None, batch_size: int = 1000
+    ) -> AsyncIterator[Dict]:
+        """Yield a merchant's transactions, newest first, straight from the Motor cursor."""
+        async for txn in db.transactions.find(
+            keyset_filter(merchant_id, cursor), {"_id": 0}
+        ).sort(KEYSET_SORT).batch_size(batch_size):
+            yield txn
+
+    @timed(REPOSITORY_SECONDS, "transaction", "save_transaction")
     async def save_transaction(self, transaction: TransactionResponse) -> None:
         """Save a transaction to the database."""
         await db.transactions.insert_one(transaction.dict())
@@ -0,0 +1,88 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+from src.utils.memory_profiling import memory_profiler
+from src.utils.profiling import profile_store
+from src.utils.security import require_admin
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+@router.get("/profiles")
+async def list_profiles():
+    """Recently captured request profiles, newest first."""
+    return profile_store.list()
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, top_stacks: int = 50):
+    """
+    Stage timings and the sampled CPU profile of one request.
+
+    `cpu_profile.folded_stacks` uses the folded format, so joining each
+    "stack samples" pair by a space gives flamegraph.pl / speedscope input.
+    """
+    request_profile = profile_store.get(profile_id)
+    if request_profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found or expired")
+    return request_profile.to_dict(top_stacks)
+
+@router.get("/memory")
+async def memory_status():
+    """Whether tracemalloc is tracing, traced and peak bytes, and the stored snapshots."""
+    return memory_profiler.status()
+
+@router.post("/memory/start")
+async def start_memory_tracing(frames: int = Query(25, ge=1, le=100)):
+    """Start tracemalloc, keeping `frames` frames per allocation traceback."""
+    return memory_profiler.start(frames)
+
+@router.post("/memory/stop")
+async def stop_memory_tracing():
+    """Stop tracemalloc and discard snapshots and analysis peaks."""
+    return memory_profiler.stop()
+
+@router.post("/memory/snapshots")
+async def take_memory_snapshot(limit: int = Query(20, ge=1, le=200)):
+    """Snapshot traced allocations; returns its id and the top module groups."""
+    try:
+        # Snapshotting and grouping walk every traced block; keep them off the event loop
+        snapshot_id = await asyncio.to_thread(memory_profiler.take_snapshot)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    top = await asyncio.to_thread(memory_profiler.top, snapshot_id, "module", limit)
+    return {"snapshot_id": snapshot_id, "top": top}
+
+@router.get("/memory/snapshots/{snapshot_id}")
+async def get_memory_snapshot(
+    snapshot_id: str,
+    group_by: str = Query("module", pattern="^(module|site)$"),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """
+    Top allocations of a snapshot by module group or by source line.
+
+    Allocations are charged to the innermost frame in this codebase, so a
+    `to_list(None)` decoded inside the driver counts against its caller.
+    """
+    try:
+        top = await asyncio.to_thread(memory_profiler.top, snapshot_id, group_by, limit)
+        return {"snapshot_id": snapshot_id, "top": top}
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+@router.get("/memory/diff")
+async def diff_memory_snapshots(
+    base: str,
+    target: str,
+    group_by: str = Query("module", pattern="^(module|site)$"),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """Groups whose retained memory changed most from `base` to `target`."""
+    try:
+        changes = await asyncio.to_thread(memory_profiler.diff, base, target, group_by, limit)
+        return {"base": base, "target": target, "changes": changes}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Snapshot {e.args[0]} not found")
+
+@router.get("/memory/analyses")
+async def analysis_memory_peaks(limit: int = Query(50, ge=1, le=200)):
+    """Peak traced memory of recent analyses, recorded while tracing is on."""
+    return memory_profiler.analysis_peaks(limit)
@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from src.config.connections import connection_manager
+
+router = APIRouter()
+
+@router.get("/health")
+async def health():
+    """
+    Probe MongoDB and Redis and report connection pool saturation.
+
+    Returns 503 when either probe fails.
+    """
+    probes = await connection_manager.health()
+    healthy = all(probe["status"] == "ok" for probe in probes.values())
+    return JSONResponse(
+        status_code=200 if healthy else 503,
+        content={
+            "status": "ok" if healthy else "degraded",
+            "checks": probes,
+            "pools": connection_manager.pool_stats()
+        }
+    )
+
+@router.get("/health/pools")
+async def pool_stats():
+    """Connection pool counters without probing the servers."""
+    return connection_manager.pool_stats()
@@ -6,24 +6,21 @@ from motor.motor_asyncio import AsyncIOMotorClient
 import asyncio
 import os
 import logging
-from src.utils.exceptions import MerchantNotFoundError, GeneralAPIError
+from src.utils.exceptions import MerchantNotFoundError, GeneralAPIError, RiskProfileNotFoundError
 from src.models.risk_profile import RiskProfileResponse
 from src.repositories.risk_profile_repo import RiskProfileRepository
+from src.services.risk_profile_worker import risk_profile_worker
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger("InitializeDB")
 
 router = APIRouter()
-risk_calculator = RiskCalculatorService()
+risk_calculator = RiskCalculatorService.from_settings()
 
 def get_risk_calculator():
-    return RiskCalculatorService()
+    return RiskCalculatorService.from_settings()
 
 class MerchantIDPathParams(BaseModel):
-    merchant_id: str = Field(..., regex="^merchant_[0-9a-fA-F]{24}$")  # Example regex
+    merchant_id: str = Field(..., pattern="^merchant_[0-9a-fA-F]{24}$")  # Example regex
 
 @router.get("/merchants/{merchant_id}/risk-profile", response_model=RiskProfileResponse)
 async def get_merchant_risk_profile(merchant: MerchantIDPathParams = Depends()):
@@ -32,15 +29,27 @@ async def get_merchant_risk_profile(merchant: MerchantIDPathParams = Depends()):
 
     - **merchant_id**: Unique identifier for the merchant.
 
+    Profiles are precomputed by the background worker; a merchant that has
+    none yet is analysed once, saved, and served from then on.
+
     **Possible Errors:**
     - 404: Merchant not found.
     - 500: Internal server error.
     """
     try:
-        risk_profile = await RiskProfileRepository().get_risk_profile(merchant.merchant_id)
-        return risk_profile
-    except MerchantNotFoundError as e:
-        raise e
+        return await RiskProfileRepository().get_risk_profile(merchant.merchant_id)
+    except RiskProfileNotFoundError as e:
+        if not await db.merchants.find_one({"merchant_id": merchant.merchant_id}, {"_id": 1}):
+            raise e
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise GeneralAPIError(detail=str(e))
+
+    try:
+        return await risk_profile_worker.compute_now(merchant.merchant_id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise GeneralAPIError(detail=str(e))
 
@@ -0,0 +1,53 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from typing import List
+from src.config.connections import connection_manager
+from src.utils.cache import cache
+from src.utils.logging import logging_stats
+from src.utils.metrics import CONTENT_TYPE, Counter, Gauge, metrics
+
+router = APIRouter()
+
+def _cache_metrics() -> List:
+    """Hit counters and ratios per cache namespace, read from the cache at scrape time."""
+    requests = Counter("cache_requests_total", "Cache lookups by tier outcome.", ("namespace", "result"))
+    hit_ratio = Gauge("cache_hit_ratio", "Share of lookups served from either tier.", ("namespace",))
+    entries = Gauge("cache_local_entries", "Entries held in the in-process tier.", ("namespace",))
+    evictions = Counter("cache_local_evictions_total", "Size-bound evictions from the in-process tier.", ("namespace",))
+    for namespace, stats in cache.stats().items():
+        hits = stats["local_hits"] + stats["remote_hits"]
+        lookups = hits + stats["misses"]
+        requests.inc(namespace, "local_hit", amount=stats["local_hits"])
+        requests.inc(namespace, "remote_hit", amount=stats["remote_hits"])
+        requests.inc(namespace, "miss", amount=stats["misses"])
+        hit_ratio.set(hits / lookups if lookups else 0.0, namespace)
+        entries.set(stats["local_size"], namespace)
+        evictions.inc(namespace, amount=stats["evictions"])
+    return [requests, hit_ratio, entries, evictions]
+
+def _pool_metrics() -> List:
+    """MongoDB and Redis connection pool gauges."""
+    pools = Gauge("connection_pool", "Connection pool counters.", ("pool", "stat"))
+    for pool, counters in connection_manager.pool_stats().items():
+        for stat, value in counters.items():
+            if isinstance(value, (int, float)):
+                pools.set(value, pool, stat)
+    return [pools]
+
+def _logging_metrics() -> List:
+    """Log queue depth and records dropped because the queue was full."""
+    stats = logging_stats()
+    queued = Gauge("log_queue_depth", "Log records waiting for the writer thread.")
+    dropped = Counter("log_records_dropped_total", "Log records dropped on a full queue.")
+    queued.set(stats["queued"])
+    dropped.inc(amount=stats["dropped"])
+    return [queued, dropped]
+
+metrics.add_collector(_cache_metrics)
+metrics.add_collector(_pool_metrics)
+metrics.add_collector(_logging_metrics)
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition of this worker's metrics."""
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
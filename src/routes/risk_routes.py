@@ -1,13 +1,76 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from src.services.risk_calculator import RiskCalculatorService
-from src.models.risk_profile import RiskProfileResponse
+from src.models.risk_profile import RiskProfileResponse, BatchRiskResponse
+from src.schemas.request_schemas import BatchRiskRequest
+from src.utils.profiling import profile_request, profile_stage
+from src.utils.security import verify_admin_token
+from typing import Optional
+import json
 
 router = APIRouter()
-risk_calculator = RiskCalculatorService()
+risk_calculator = RiskCalculatorService.from_settings()
+
+@router.post("/risks/batch", response_model=BatchRiskResponse)
+async def get_batch_risk_profiles(request: BatchRiskRequest, stream: bool = False):
+    """
+    Analyze many merchants in one call.
+
+    With `stream=true` the response is NDJSON, one profile (or
+    {"merchant_id", "error"} object) per line in completion order.
+    """
+    results = risk_calculator.analyze_merchants_risk(request.merchant_ids, request.days)
+
+    if stream:
+        async def ndjson_lines():
+            async for merchant_id, result in results:
+                if isinstance(result, Exception):
+                    yield json.dumps({"merchant_id": merchant_id, "error": str(result)}) + "\n"
+                else:
+                    yield result.json() + "\n"
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    profiles, errors = [], {}
+    async for merchant_id, result in results:
+        if isinstance(result, Exception):
+            errors[merchant_id] = str(result)
+        else:
+            profiles.append(result)
+    return BatchRiskResponse(profiles=profiles, errors=errors)
+
+async def _profiled_risk_profile(merchant_id: str) -> Response:
+    """Analyze with stage timing and CPU sampling; the profile id is returned in X-Profile-Id."""
+    with profile_request(f"GET /api/risks/{merchant_id}") as request_profile:
+        with profile_stage("analyze_merchant_risk"):
+            risk_profile = await risk_calculator.analyze_merchant_risk(merchant_id)
+        with profile_stage("serialize"):
+            body = risk_profile.json()
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"X-Profile-Id": request_profile.profile_id}
+    )
 
 @router.get("/risks/{merchant_id}", response_model=RiskProfileResponse)
-async def get_risk_profile(merchant_id: str):
+async def get_risk_profile(
+    merchant_id: str,
+    profile: bool = False,
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Analyze a merchant's risk.
+
+    With `profile=true` or an `X-Profile: 1` header, and a valid
+    X-Admin-Token, the analysis is profiled and the report can be fetched
+    from /api/admin/profiles/{X-Profile-Id}.
+    """
+    profiling = profile or x_profile in ("1", "true")
+    if profiling:
+        verify_admin_token(x_admin_token)
     try:
+        if profiling:
+            return await _profiled_risk_profile(merchant_id)
         risk_profile = await risk_calculator.analyze_merchant_risk(merchant_id)
         return risk_profile
     except Exception as e:
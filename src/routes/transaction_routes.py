@@ -1,19 +1,176 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
 from src.config.database import db
-from src.models.transaction import TransactionRequest, TransactionResponse
+from src.models.transaction import (
+    TransactionRequest, TransactionResponse, BulkTransactionResult, BulkTransactionResponse
+)
+from src.repositories.transaction_repo import TransactionRepository
+from src.config.settings import get_settings
+from src.utils.exceptions import InvalidTransactionError, PayloadTooLargeError
+from src.utils.cache import cache
+from src.utils.pagination import decode_cursor
+from src.services.pattern_engine import to_epoch_seconds
+from src.services.rolling_risk_state import rolling_state_store
+from src.services.velocity_monitor import velocity_monitor
+from src.services.timeline_generator import TimelineGenerator
+from src.services.transaction_rollup import TransactionRollup
+from src.services.risk_profile_worker import risk_profile_worker
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import json
 import uuid
 from datetime import datetime
 
 router = APIRouter()
 
-@router.post("/transactions", response_model=TransactionResponse)
-async def create_transaction(transaction: TransactionRequest):
+BULK_CHUNK_SIZE = 1000
+
+async def _after_ingest(transactions: List[Dict]):
+    """Update caches and streaming detectors for newly stored transactions."""
+    # Orphan these merchants' cached pattern, risk metric and timeline entries
+    data_versions = await cache.bump_data_version(*(txn["merchant_id"] for txn in transactions))
+    await TransactionRollup().apply(transactions)
+    risk_profile_worker.mark_dirty(*{txn["merchant_id"] for txn in transactions})
+    # Rolling state and the velocity monitor expect timestamp order
+    for txn in sorted(transactions, key=lambda t: t["timestamp"]):
+        epoch_seconds = to_epoch_seconds(txn["timestamp"])
+        rolling_state_store.record(
+            txn["merchant_id"], epoch_seconds, txn["amount"], txn["customer_id"],
+            txn["transaction_id"], data_versions[txn["merchant_id"]]
+        )
+        if velocity_monitor.observe(txn["merchant_id"], epoch_seconds):
+            await TimelineGenerator().record_velocity_spike(
+                txn["merchant_id"],
+                txn["timestamp"],
+                velocity_monitor.threshold,
+                velocity_monitor.window_seconds
+            )
+
+def _prepare_transaction(transaction: TransactionRequest) -> Dict:
     transaction_data = transaction.dict()
     transaction_data["transaction_id"] = f"TXN-{uuid.uuid4().hex}"
     transaction_data["created_at"] = datetime.utcnow()
+    return transaction_data
+
+@router.post("/transactions", response_model=TransactionResponse)
+async def create_transaction(transaction: TransactionRequest):
+    transaction_data = _prepare_transaction(transaction)
     await db.transactions.insert_one(transaction_data)
+    await _after_ingest([transaction_data])
     return transaction_data
 
+async def _limited_stream(request: Request, max_bytes: int) -> AsyncIterator[bytes]:
+    """Stream the body, rejecting it with 413 once it exceeds `max_bytes`."""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise PayloadTooLargeError(detail=f"Bulk body exceeds {max_bytes} bytes")
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise PayloadTooLargeError(detail=f"Bulk body exceeds {max_bytes} bytes")
+        yield chunk
+
+async def _iter_ndjson(request: Request, max_bytes: int) -> AsyncIterator[Any]:
+    """Yield decoded NDJSON lines as the body streams in; undecodable lines yield the error."""
+    buffer = b""
+    async for chunk in _limited_stream(request, max_bytes):
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _decode_line(line)
+    if buffer.strip():
+        yield _decode_line(buffer)
+
+def _decode_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:  # JSONDecodeError or UnicodeDecodeError
+        return e
+
+async def _iter_json_array(request: Request, max_bytes: int, max_items: int) -> AsyncIterator[Any]:
+    body = b"".join([chunk async for chunk in _limited_stream(request, max_bytes)])
+    try:
+        items = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise InvalidTransactionError(detail=f"Malformed JSON body: {e}")
+    if not isinstance(items, list):
+        raise InvalidTransactionError(detail="Bulk body must be a JSON array or NDJSON stream")
+    if len(items) > max_items:
+        raise PayloadTooLargeError(detail=f"Bulk body has more than {max_items} transactions")
+    for item in items:
+        yield item
+
+async def _insert_chunk(chunk: List[Tuple[int, Dict]], results: List[BulkTransactionResult]):
+    """Insert validated transactions with one unordered insert_many and record per-item outcomes."""
+    documents = [transaction_data for _, transaction_data in chunk]
+    failed = {}
+    try:
+        await db.transactions.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        failed = {error["index"]: error.get("errmsg", "Write failed") for error in e.details.get("writeErrors", [])}
+
+    inserted = []
+    for position, (index, transaction_data) in enumerate(chunk):
+        if position in failed:
+            results.append(BulkTransactionResult(index=index, status="error", error=failed[position]))
+        else:
+            inserted.append(transaction_data)
+            results.append(BulkTransactionResult(
+                index=index, status="created", transaction_id=transaction_data["transaction_id"]
+            ))
+    if inserted:
+        await _after_ingest(inserted)
+
+@router.post("/transactions/bulk", response_model=BulkTransactionResponse)
+async def create_transactions_bulk(request: Request):
+    """
+    Ingest many transactions in one request.
+
+    Accepts a JSON array, or an NDJSON stream when the Content-Type is
+    application/x-ndjson. Items are validated and written in chunks of
+    BULK_CHUNK_SIZE with unordered insert_many; invalid items are reported
+    per index and do not stop the rest.
+
+    Bodies over bulk_max_bytes or with more than bulk_max_items items are
+    rejected with 413. JSON arrays and bodies with a Content-Length are
+    checked before anything is written; for an NDJSON stream of unknown
+    length, chunks written before the limit was reached are kept.
+    """
+    settings = get_settings()
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type:
+        items = _iter_ndjson(request, settings.bulk_max_bytes)
+    else:
+        items = _iter_json_array(request, settings.bulk_max_bytes, settings.bulk_max_items)
+
+    results: List[BulkTransactionResult] = []
+    chunk: List[Tuple[int, Dict]] = []
+    index = 0
+    async for item in items:
+        if index >= settings.bulk_max_items:
+            raise PayloadTooLargeError(detail=f"Bulk body has more than {settings.bulk_max_items} transactions")
+        try:
+            if isinstance(item, Exception):
+                raise item
+            if not isinstance(item, dict):
+                raise ValueError("Transaction must be a JSON object")
+            chunk.append((index, _prepare_transaction(TransactionRequest(**item))))
+        except (ValidationError, ValueError) as e:
+            results.append(BulkTransactionResult(index=index, status="error", error=str(e)))
+        index += 1
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            await _insert_chunk(chunk, results)
+            chunk = []
+    if chunk:
+        await _insert_chunk(chunk, results)
+
+    results.sort(key=lambda result: result.index)
+    created = sum(1 for result in results if result.status == "created")
+    return BulkTransactionResponse(created=created, failed=len(results) - created, results=results)
+
 @router.get("/transactions/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(transaction_id: str):
     transaction = await db.transactions.find_one({"transaction_id": transaction_id})
@@ -22,8 +179,34 @@ async def get_transaction(transaction_id: str):
     return transaction
 
 @router.get("/transactions")
-async def list_transactions(merchant_id: str):
-    transactions = await db.transactions.find({"merchant_id": merchant_id}).to_list(None)
-    if not transactions:
+async def list_transactions(
+    merchant_id: str,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    stream: bool = False
+):
+    """
+    List a merchant's transactions, newest first.
+
+    Pages are keyset-paginated on (timestamp, transaction_id); pass the
+    X-Next-Cursor header of one page as `cursor` to get the next. With
+    `stream=true` every remaining transaction is streamed as NDJSON.
+    """
+    repository = TransactionRepository()
+    if stream:
+        if cursor:
+            # Reject a bad cursor before the response starts
+            decode_cursor(cursor)
+
+        async def ndjson_lines():
+            async for txn in repository.stream_transactions(merchant_id, cursor):
+                yield json.dumps(txn, default=str) + "\n"
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    transactions, next_cursor = await repository.find_page(merchant_id, limit, cursor)
+    if not transactions and not cursor:
         raise HTTPException(status_code=404, detail="No transactions found for this merchant")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return transactions
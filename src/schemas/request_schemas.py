@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class TransactionRequest(BaseModel):
     merchant_id: str = Field(..., description="Reference to merchant")
@@ -13,3 +13,7 @@ class TransactionRequest(BaseModel):
     status: str
     product_category: str
     platform: str
+
+class BatchRiskRequest(BaseModel):
+    merchant_ids: List[str] = Field(..., min_length=1, max_length=1000, description="Merchants to analyze")
+    days: int = Field(30, gt=0, le=365, description="Analysis window in days")
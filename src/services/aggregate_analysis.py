@@ -0,0 +1,132 @@
+from datetime import datetime
+from typing import Dict, List
+import logging
+
+import numpy as np
+
+from src.services.pattern_engine import (
+    AnalysisParams, WindowAnalysis, count_velocity_spikes_bucketed, find_split_clusters,
+    split_candidate_ranges, to_epoch_seconds
+)
+
+logger = logging.getLogger("AggregateAnalysis")
+
+
+def build_window_pipeline(
+    merchant_id: str, start_date: datetime, end_date: datetime, params: AnalysisParams
+) -> List[Dict]:
+    """
+    Aggregation pipeline returning the window's detector aggregates.
+
+    One `$facet` produces per-minute transaction counts, round-amount counts
+    and amount totals (hour histogram, velocity and split candidates are all
+    derived from them) and the top customers by transaction count.
+    """
+    return [
+        {
+            "$match": {
+                "merchant_id": merchant_id,
+                "timestamp": {"$gte": start_date, "$lte": end_date}
+            }
+        },
+        {
+            "$facet": {
+                "minutes": [
+                    {
+                        "$group": {
+                            "_id": {"$floor": {"$divide": [{"$toLong": "$timestamp"}, 60000]}},
+                            "count": {"$sum": 1},
+                            "amount": {"$sum": "$amount"},
+                            "round_count": {
+                                "$sum": {
+                                    "$cond": [{"$eq": [{"$mod": ["$amount", params.round_factor]}, 0]}, 1, 0]
+                                }
+                            }
+                        }
+                    },
+                    {"$sort": {"_id": 1}}
+                ],
+                "customers": [
+                    {"$group": {"_id": "$customer_id", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}},
+                    {"$limit": params.top_customers}
+                ]
+            }
+        }
+    ]
+
+
+async def fetch_split_clusters(collection, merchant_id: str, ranges, params: AnalysisParams):
+    """Fetch raw (timestamp, amount) rows inside the candidate ranges and cluster them."""
+    if not ranges:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    rows = await collection.find(
+        {
+            "merchant_id": merchant_id,
+            "$or": [
+                {"timestamp": {"$gte": datetime.utcfromtimestamp(start), "$lt": datetime.utcfromtimestamp(end)}}
+                for start, end in ranges
+            ]
+        },
+        {"_id": 0, "timestamp": 1, "amount": 1}
+    ).sort("timestamp", 1).to_list(None)
+
+    # Ranges are separated by more than the split window, so clustering them together is exact
+    times = np.array([to_epoch_seconds(row['timestamp']) for row in rows], dtype=np.int64)
+    amounts = np.array([row['amount'] for row in rows], dtype=np.float64)
+    return find_split_clusters(times, amounts, params.split_window_minutes, params.split_min_transactions)
+
+
+async def load_aggregated_analysis(
+    collection, merchant_id: str, start_date: datetime, end_date: datetime, params: AnalysisParams
+) -> WindowAnalysis:
+    """
+    Build the detector input from server-side aggregates.
+
+    Transfer is O(active minutes + top customers) rather than O(transactions);
+    only split clustering reads raw rows, and only for candidate ranges that
+    can reach `params.split_amount_threshold` (at most `params.max_split_ranges`
+    of them). Velocity is evaluated at minute resolution, customer counts
+    are limited to `params.top_customers`, and clusters in ranges below the
+    amount threshold are left out; the split detector's score does not
+    depend on them.
+
+    Args:
+        collection: Motor transactions collection.
+        merchant_id: Merchant to analyse.
+        start_date: Window start.
+        end_date: Window end.
+        params: Detector parameters.
+
+    Returns:
+        WindowAnalysis consumed by the pattern detectors.
+    """
+    pipeline = build_window_pipeline(merchant_id, start_date, end_date, params)
+    facets = (await collection.aggregate(pipeline).to_list(1))[0]
+
+    minute_buckets = facets["minutes"]
+    minutes = np.array([int(bucket["_id"]) for bucket in minute_buckets], dtype=np.int64)
+    counts = np.array([bucket["count"] for bucket in minute_buckets], dtype=np.int64)
+    amounts = np.array([bucket["amount"] for bucket in minute_buckets], dtype=np.float64)
+    round_count = sum(bucket["round_count"] for bucket in minute_buckets)
+
+    ranges = split_candidate_ranges(
+        minutes, counts, params.split_window_minutes, params.split_min_transactions,
+        amounts, params.split_amount_threshold, params.max_split_ranges
+    )
+    cluster_sizes, cluster_totals = await fetch_split_clusters(collection, merchant_id, ranges, params)
+
+    return WindowAnalysis(
+        merchant_id=merchant_id,
+        transaction_count=int(counts.sum()),
+        hour_histogram=np.bincount((minutes // 60) % 24, weights=counts, minlength=24).astype(np.int64),
+        round_count=int(round_count),
+        customer_ids=np.array([customer["_id"] for customer in facets["customers"]], dtype=object),
+        customer_counts=np.array([customer["count"] for customer in facets["customers"]], dtype=np.int64),
+        velocity_spike_count=count_velocity_spikes_bucketed(
+            minutes, counts, params.velocity_window_seconds, params.velocity_threshold
+        ),
+        cluster_sizes=cluster_sizes,
+        cluster_totals=cluster_totals,
+    )
@@ -1,17 +1,38 @@
 from typing import List, Tuple, Dict, Optional, Generator
-import random
+from collections import deque
+import bisect
+import heapq
+import multiprocessing
+import os
 import string
 from datetime import datetime, timedelta
-import uuid
 from faker import Faker
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 import pandas as pd
 from scipy import stats
 
-# Initialize Faker with multiple locales for more diverse data
-fake = Faker(['en_US', 'en_GB', 'en_IN'])
+
+FAKER_LOCALES = ['en_US', 'en_GB', 'en_IN']
+
+# Longest lookbacks of the per-transaction risk factors; older history is evicted
+VELOCITY_LOOKBACK = timedelta(minutes=60)
+CUSTOMER_HISTORY_LOOKBACK = timedelta(days=30)
+# Rows within a generated day are not recorded in time order, so eviction
+# trails the newest timestamp by a day on top of the lookback
+OUT_OF_ORDER_SLACK = timedelta(days=1)
+# Returning customers are drawn from the most recently created ones; older
+# customers are forgotten so long runs keep a bounded pool
+CUSTOMER_POOL_SIZE = 100_000
+
+# Size of each pre-generated Faker pool the vectorized path samples from
+FAKER_POOL_SIZE = 4096
+FAKER_POOLS = {
+    "ipv4": lambda fake: fake.ipv4(),
+    "location": lambda fake: {"latitude": float(fake.latitude()), "longitude": float(fake.longitude())},
+}
+
 
 class FraudPattern(Enum):
     LATE_NIGHT = "late_night_trading"
@@ -46,7 +67,7 @@ class FraudConfig:
     """Advanced ML data generation configuration for complex fraud pattern simulation"""
     
     # Temporal dynamics and seasonality
-    temporal_dynamics: Dict = {
+    temporal_dynamics: Dict = field(default_factory=lambda: {
         "time_windows": {
             "intraday": [(0, 6), (6, 12), (12, 18), (18, 24)],  # Multiple daily windows
             "weekly": {"weekday": (0.6, 1.2), "weekend": (1.3, 2.5)},  # Weekly patterns
@@ -64,10 +85,10 @@ class FraudConfig:
             "decay_rate": (0.1, 0.5),  # Pattern decay over time
             "adaptation_rate": (0.2, 0.8)  # Pattern learning rate
         }
-    }
+    })
 
     # Behavioral anomalies and pattern evolution
-    behavioral_dynamics: Dict = {
+    behavioral_dynamics: Dict = field(default_factory=lambda: {
         "pattern_evolution": {
             "complexity": (1, 10),  # Pattern complexity level
             "mutation_rate": (0.05, 0.3),  # Rate of pattern changes
@@ -88,10 +109,10 @@ class FraudConfig:
             "risk_tolerance": (0.2, 0.8),  # Risk-taking behavior
             "learning_rate": (0.1, 0.5)  # Adaptation to detection
         }
-    }
+    })
 
     # Network and entity relationships
-    network_dynamics: Dict = {
+    network_dynamics: Dict = field(default_factory=lambda: {
         "graph_properties": {
             "centrality_measures": ["degree", "betweenness", "eigenvector"],
             "community_structure": {
@@ -110,10 +131,10 @@ class FraudConfig:
             "interaction_frequency": (1, 100),
             "relationship_types": ["direct", "indirect", "hierarchical"]
         }
-    }
+    })
 
     # Advanced feature engineering
-    feature_composition: Dict = {
+    feature_composition: Dict = field(default_factory=lambda: {
         "base_features": [
             "transaction_velocity",
             "amount_distribution",
@@ -133,10 +154,10 @@ class FraudConfig:
             "temporal": 0.25,
             "transactional": 0.15
         }
-    }
+    })
 
     # Model-specific configurations
-    model_parameters: Dict = {
+    model_parameters: Dict = field(default_factory=lambda: {
         "label_distribution": {
             "fraud_ratio": (0.001, 0.1),
             "uncertainty_range": (0.05, 0.2),
@@ -151,10 +172,10 @@ class FraudConfig:
             "precision", "recall", "f1",
             "auc_roc", "auc_pr", "ks_statistic"
         ]
-    }
+    })
 
     # Environmental and external factors
-    context_factors: Dict = {
+    context_factors: Dict = field(default_factory=lambda: {
         "market_conditions": {
             "volatility": (0.1, 0.5),
             "trend": [-1.0, 1.0],
@@ -169,43 +190,92 @@ class FraudConfig:
             "economic": (0.5, 1.5),
             "technological": (0.8, 1.2)
         }
-    }
+    })
 
 class DataGenerator:
     """Enhanced data generator with sophisticated fraud patterns"""
     
-    def __init__(self, business_config: BusinessConfig, transaction_config: TransactionConfig):
+    def __init__(
+        self,
+        business_config: BusinessConfig,
+        transaction_config: TransactionConfig,
+        seed: Optional[int] = None,
+        reference_time: Optional[datetime] = None,
+        fake: Optional[Faker] = None
+    ):
+        """
+        Args:
+            business_config: Merchant categories, tickets and hours.
+            transaction_config: Volumes and categorical weights.
+            seed: Seed for `rng` and Faker; unseeded runs differ every time.
+            reference_time: "Now" for dataset end dates and ages; defaults to
+                the wall clock. Fix it, with `seed`, to rebuild a dataset exactly.
+            fake: Faker to use instead of building one, so many generators can
+                share it; it is not reseeded.
+        """
         self.business_config = business_config
         self.transaction_config = transaction_config
         self.fraud_config = FraudConfig()
         self._merchant_cache = {}
         self._customer_cache = {}
-        self._transaction_history = []
-        self.rng = np.random.default_rng()
+        # Ring of the latest `CUSTOMER_POOL_SIZE` customer ids, so a returning
+        # customer is one index draw
+        self._customer_ids: List[str] = []
+        self._customers_created = 0
+        self._faker_pools: Dict[str, list] = {}
+        # Time-ordered history per merchant and per customer, trimmed to the lookbacks
+        self._merchant_history: Dict[str, deque] = {}
+        self._customer_history: Dict[str, deque] = {}
+        # (timestamp, customer_id) per recorded row in arrival order, so customers
+        # who stop transacting are evicted too
+        self._customer_expiry: deque = deque()
+        self._customer_cutoff = ""
+        self.seed = seed
+        self.reference_time = reference_time
+        self.rng = np.random.default_rng(seed)
+        if fake is None:
+            # Multiple locales for more diverse data; seeded with the generator
+            fake = Faker(FAKER_LOCALES)
+            if seed is not None:
+                fake.seed_instance(seed)
+        self.fake = fake
+
+    def _now(self) -> datetime:
+        return self.reference_time or datetime.now()
         
     def generate_dataset(
         self,
         merchant_count: int,
         days: int,
         fraud_percentage: float = 0.2,
-        batch_size: int = 1000
+        batch_size: int = 1000,
+        vectorized: bool = False
     ) -> Generator[Tuple[List[Dict], List[Dict]], None, None]:
-        """Generate dataset in batches with fraud patterns"""
+        """
+        Generate dataset in batches with fraud patterns.
+
+        With `vectorized`, each merchant-day is drawn in one pass of `rng`
+        arrays (see `_generate_day_vectorized`), which is what makes datasets
+        of tens of millions of rows practical.
+        """
         merchants = self.generate_merchant_profiles(merchant_count)
-        fraud_merchants = set(random.sample(merchants, int(merchant_count * fraud_percentage)))
+        fraud_merchants = {
+            merchant["merchant_id"]
+            for merchant in self._sample_fraud_merchants(merchants, fraud_percentage)
+        }
         
-        start_date = datetime.now() - timedelta(days=days)
+        end_date = self._now()
+        start_date = end_date - timedelta(days=days)
         current_date = start_date
-        end_date = datetime.now()
         
         while current_date <= end_date:
             batch_transactions = []
             
             for merchant in merchants:
                 daily_transactions = (
-                    self._generate_fraud_transactions(merchant, current_date)
-                    if merchant in fraud_merchants
-                    else self._generate_normal_transactions(merchant, current_date)
+                    self._generate_fraud_transactions(merchant, current_date, vectorized)
+                    if merchant["merchant_id"] in fraud_merchants
+                    else self._generate_normal_transactions(merchant, current_date, vectorized)
                 )
                 batch_transactions.extend(daily_transactions)
                 
@@ -218,10 +288,94 @@ class DataGenerator:
             
             current_date += timedelta(days=1)
 
-    def _generate_normal_transactions(self, merchant: Dict, date: datetime) -> List[Dict]:
+    def generate_dataset_parallel(
+        self,
+        merchant_count: int,
+        days: int,
+        fraud_percentage: float = 0.2,
+        batch_size: int = 1000,
+        vectorized: bool = True,
+        workers: Optional[int] = None
+    ) -> Generator[Tuple[List[Dict], List[Dict]], None, None]:
+        """
+        Generate a dataset with merchants sharded across worker processes.
+
+        Every merchant gets its own generator, seeded from a child of
+        `SeedSequence(seed)`, with its own returning customers and history;
+        profiles and the fraud merchants come from another child. Workers
+        produce a day at a time and the parent merges the days in
+        (timestamp, merchant, row) order, so for a fixed `seed` and
+        `reference_time` the stream of rows is identical for any `workers`.
+        `reference_time` defaults to today's midnight.
+
+        Unlike `generate_dataset`, customers are never shared between merchants.
+
+        Args:
+            merchant_count: Number of merchants.
+            days: Days of history before the reference time.
+            fraud_percentage: Share of merchants with a fraud pattern.
+            batch_size: Transactions per yielded batch.
+            vectorized: Draw normal days with `_generate_day_vectorized`.
+            workers: Worker processes; defaults to the CPU count, and 1 runs inline.
+
+        Yields:
+            Tuples of (merchants, transactions) with transactions in timestamp order.
+        """
+        end_date = self.reference_time or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        profile_seed, pool_seed, *merchant_seeds = [
+            int(child.generate_state(1, np.uint64)[0])
+            for child in np.random.SeedSequence(self.seed).spawn(merchant_count + 2)
+        ]
+        profiles = DataGenerator(self.business_config, self.transaction_config, profile_seed, end_date)
+        merchants = profiles.generate_merchant_profiles(merchant_count)
+        fraud_merchants = {
+            merchant["merchant_id"] for merchant in profiles._sample_fraud_merchants(merchants, fraud_percentage)
+        }
+        specs = [
+            (index, merchant, merchant["merchant_id"] in fraud_merchants, merchant_seed)
+            for index, (merchant, merchant_seed) in enumerate(zip(merchants, merchant_seeds))
+        ]
+        start_date = end_date - timedelta(days=days)
+        dates = [start_date + timedelta(days=day) for day in range(days + 1)]
+
+        workers = max(1, min(workers or os.cpu_count() or 1, merchant_count))
+        shard_args = [
+            (self.business_config, self.transaction_config, specs[shard::workers], pool_seed, end_date, vectorized)
+            for shard in range(workers)
+        ]
+        if workers == 1:
+            shard = _MerchantShard(*shard_args[0])
+            days_rows = ([shard.generate_day(date)] for date in dates)
+            yield from _merged_batches(merchants, dates, days_rows, batch_size)
+            return
+
+        context = multiprocessing.get_context()
+        queues = [context.Queue(maxsize=2) for _ in range(workers)]
+        processes = [
+            context.Process(target=_run_shard, args=(args, dates, out), daemon=True)
+            for args, out in zip(shard_args, queues)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            days_rows = ([_receive(out) for out in queues] for _ in dates)
+            yield from _merged_batches(merchants, dates, days_rows, batch_size)
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+    def _sample_fraud_merchants(self, merchants: List[Dict], fraud_percentage: float) -> List[Dict]:
+        picks = self.rng.choice(len(merchants), size=int(len(merchants) * fraud_percentage), replace=False)
+        return [merchants[i] for i in sorted(picks.tolist())]
+
+    def _generate_normal_transactions(self, merchant: Dict, date: datetime, vectorized: bool = False) -> List[Dict]:
         """Generate normal transaction patterns"""
         base_volume = self._get_base_daily_volume(merchant)
         daily_pattern = self._apply_temporal_factors(merchant, date, base_volume)
+        if vectorized:
+            return self._generate_day_vectorized(merchant, date, daily_pattern)
         
         transactions = []
         for hour in range(24):
@@ -230,8 +384,8 @@ class DataGenerator:
             for _ in range(hourly_volume):
                 txn_time = date.replace(
                     hour=hour,
-                    minute=random.randint(0, 59),
-                    second=random.randint(0, 59)
+                    minute=int(self.rng.integers(60)),
+                    second=int(self.rng.integers(60))
                 )
                 
                 amount = self._generate_transaction_amount(
@@ -249,6 +403,150 @@ class DataGenerator:
         
         return transactions
 
+    def _generate_day_vectorized(self, merchant: Dict, date: datetime, daily_pattern: Dict) -> List[Dict]:
+        """
+        Draw a merchant-day of normal transactions in bulk.
+
+        Hours follow the same per-hour volumes as the per-row path; minutes,
+        seconds, amounts, customers, statuses, payment methods and platforms
+        are each one `rng` call for the whole day, ids are cut from one
+        `rng.bytes` draw and IPs and locations come from pre-generated Faker
+        pools. Risk scores use the same factors as `_calculate_transaction_risk`,
+        computed per column, so the only Python work left per row is building
+        its dict. Rows are returned in timestamp order.
+        """
+        counts = (daily_pattern["hourly_distribution"] * daily_pattern["volume"]).astype(int)
+        n = int(counts.sum())
+        if n == 0:
+            return []
+
+        day_start = date.replace(hour=0, minute=0, second=0)
+        hours = np.repeat(np.arange(24), counts)
+        offsets = hours * 3600 + self.rng.integers(0, 60, n) * 60 + self.rng.integers(0, 60, n)
+        order = np.argsort(offsets, kind="stable")
+        offsets = offsets[order]
+        hours = hours[order]
+
+        amounts = np.round(
+            self.rng.lognormal(
+                np.log(merchant["avg_ticket"]), daily_pattern["amount_distribution"]["shape"], n
+            ) * self._get_seasonal_factor(date),
+            2
+        )
+        customer_ids = self._get_or_create_customers(n)
+        statuses = self._weighted_choices(self.transaction_config.status_weights, n)
+        payment_methods = self._weighted_choices(self.transaction_config.payment_methods, n)
+        platforms = self._weighted_choices(self.transaction_config.platform_weights, n)
+        ip_pool = self._faker_pool("ipv4")
+        location_pool = self._faker_pool("location")
+        ip_codes = self.rng.integers(0, len(ip_pool), n)
+        location_codes = self.rng.integers(0, len(location_pool), n)
+        transaction_ids = self.rng.bytes(16 * n).hex()
+        device_ids = self.rng.bytes(4 * n).hex()
+
+        risk_scores = self._vectorized_risk_scores(merchant, day_start, offsets, hours, amounts, customer_ids)
+        merchant_age = self._get_merchant_age(merchant["merchant_id"])
+        now = self._now()
+        customer_ages = {}
+        for customer_id in set(customer_ids):
+            # A customer already replaced in the pool has no known age, as in `_get_customer_age`
+            customer = self._customer_cache.get(customer_id)
+            customer_ages[customer_id] = (now - customer["created_at"]).days if customer else 0
+
+        transactions = []
+        for i, (offset, amount, customer_id, ip_code, location_code, risk_score) in enumerate(zip(
+            offsets.tolist(), amounts.tolist(), customer_ids, ip_codes.tolist(),
+            location_codes.tolist(), risk_scores.tolist()
+        )):
+            transactions.append({
+                "transaction_id": f"TXN-{transaction_ids[32 * i:32 * i + 32]}",
+                "merchant_id": merchant["merchant_id"],
+                "customer_id": customer_id,
+                "timestamp": (day_start + timedelta(seconds=offset)).isoformat(),
+                "amount": amount,
+                "currency": "USD",
+                "status": statuses[i],
+                "payment_method": payment_methods[i],
+                "platform": platforms[i],
+                "device_id": f"DEV-{device_ids[8 * i:8 * i + 8]}",
+                "ip_address": ip_pool[ip_code],
+                "location": dict(location_pool[location_code]),
+                "is_fraudulent": False,
+                "fraud_flags": {},
+                "metadata": {
+                    "customer_age_days": customer_ages[customer_id],
+                    "merchant_age_days": merchant_age,
+                    "risk_score": risk_score,
+                },
+            })
+
+        for transaction in transactions:
+            self._record_transaction(transaction)
+        return transactions
+
+    def _vectorized_risk_scores(
+        self,
+        merchant: Dict,
+        day_start: datetime,
+        offsets: np.ndarray,
+        hours: np.ndarray,
+        amounts: np.ndarray,
+        customer_ids: List[str]
+    ) -> np.ndarray:
+        """
+        `_calculate_transaction_risk` for a day of time-ordered rows at once.
+
+        Velocity counts earlier rows of the day within the hour plus the
+        merchant's rows from the hour before midnight. A customer counts as
+        having history if their latest transaction is within 30 days of their
+        first one that day.
+        """
+        amount_factor = np.minimum(amounts / merchant["avg_ticket"], 5.0) * 0.2
+        time_factor = np.where((hours >= 23) | (hours <= 4), 0.3, 0.1)
+
+        seen = set()
+        history_factor = np.empty(len(customer_ids))
+        for i, (customer_id, offset) in enumerate(zip(customer_ids, offsets.tolist())):
+            if customer_id in seen:
+                history_factor[i] = 0.1
+                continue
+            seen.add(customer_id)
+            history_factor[i] = 0.1 if self._has_recent_history(
+                customer_id, day_start + timedelta(seconds=offset)
+            ) else 0.3
+
+        previous_hour = np.array([
+            (datetime.fromisoformat(txn["timestamp"]) - day_start).total_seconds()
+            for txn in self._get_recent_transactions(merchant["merchant_id"], minutes=60, now=day_start)
+        ])
+        window_starts = offsets - 3600
+        recent = (
+            np.arange(len(offsets)) - np.searchsorted(offsets, window_starts, side="left")
+            + len(previous_hour) - np.searchsorted(previous_hour, window_starts, side="left")
+        )
+        velocity_factor = np.minimum(recent / 10, 1.0) * 0.2
+
+        risk = merchant.get("risk_score", 0.5) + amount_factor + time_factor + history_factor + velocity_factor
+        return np.clip(risk, 0.0, 1.0)
+
+    def _locale_faker(self):
+        """
+        One locale's Faker, picked with `rng`.
+
+        Calling the multi-locale proxy directly picks the locale with the
+        global `random` module, which a seed cannot reach.
+        """
+        locales = self.fake.locales
+        return self.fake[locales[int(self.rng.integers(len(locales)))]]
+
+    def _faker_pool(self, name: str, size: int = FAKER_POOL_SIZE) -> list:
+        """Pre-generated Faker values of a `FAKER_POOLS` kind, built on first use"""
+        pool = self._faker_pools.get(name)
+        if pool is None:
+            factory = FAKER_POOLS[name]
+            pool = self._faker_pools[name] = [factory(self._locale_faker()) for _ in range(size)]
+        return pool
+
     def _generate_transaction_amount(self, merchant: Dict, distribution: Dict) -> float:
         """Generate realistic transaction amounts"""
         base_amount = stats.lognorm.rvs(
@@ -258,7 +556,7 @@ class DataGenerator:
         )
         
         # Apply seasonal and time-based factors
-        amount = base_amount * self._get_seasonal_factor(datetime.now())
+        amount = base_amount * self._get_seasonal_factor(self._now())
         
         # Round to 2 decimal places
         return round(amount, 2)
@@ -275,9 +573,10 @@ class DataGenerator:
         """Create a detailed transaction record"""
         if not customer_id:
             customer_id = self._get_or_create_customer()
+        fake = self._locale_faker()
             
         transaction = {
-            "transaction_id": f"TXN-{uuid.uuid4().hex}",
+            "transaction_id": f"TXN-{self.rng.bytes(16).hex()}",
             "merchant_id": merchant["merchant_id"],
             "customer_id": customer_id,
             "timestamp": timestamp.isoformat(),
@@ -286,7 +585,7 @@ class DataGenerator:
             "status": self._get_transaction_status(),
             "payment_method": self._get_payment_method(),
             "platform": self._get_transaction_platform(),
-            "device_id": f"DEV-{uuid.uuid4().hex[:8]}",
+            "device_id": f"DEV-{self.rng.bytes(4).hex()}",
             "ip_address": fake.ipv4(),
             "location": {
                 "latitude": float(fake.latitude()),
@@ -303,9 +602,43 @@ class DataGenerator:
             }
         }
         
-        self._transaction_history.append(transaction)
+        self._record_transaction(transaction)
         return transaction
 
+    def _record_transaction(self, transaction: Dict) -> None:
+        """
+        Add a generated transaction to the history the risk factors look back on.
+
+        Each row enters its merchant's and its customer's deque and leaves
+        once it is older than the lookback plus `OUT_OF_ORDER_SLACK`, so
+        memory stays bounded and each row costs amortized O(1).
+        """
+        timestamp = transaction["timestamp"]
+        merchant_history = self._merchant_history.setdefault(transaction["merchant_id"], deque())
+        _insert_in_time_order(merchant_history, transaction)
+        newest = datetime.fromisoformat(merchant_history[-1]["timestamp"])
+        _evict_before(merchant_history, (newest - VELOCITY_LOOKBACK - OUT_OF_ORDER_SLACK).isoformat())
+
+        customer_id = transaction["customer_id"]
+        _insert_in_time_order(self._customer_history.setdefault(customer_id, deque()), transaction)
+        self._customer_expiry.append((timestamp, customer_id))
+        cutoff = (datetime.fromisoformat(timestamp) - CUSTOMER_HISTORY_LOOKBACK - OUT_OF_ORDER_SLACK).isoformat()
+        if cutoff > self._customer_cutoff:
+            self._customer_cutoff = cutoff
+            self._evict_customers(cutoff)
+
+    def _evict_customers(self, cutoff: str) -> None:
+        """Drop customer history older than `cutoff`, and customers left with none"""
+        expiry = self._customer_expiry
+        while expiry and expiry[0][0] < cutoff:
+            _, customer_id = expiry.popleft()
+            history = self._customer_history.get(customer_id)
+            if history is None:
+                continue
+            _evict_before(history, cutoff)
+            if not history:
+                del self._customer_history[customer_id]
+
     def _calculate_transaction_risk(
         self,
         amount: float,
@@ -342,11 +675,10 @@ class DataGenerator:
         time_factor = 0.3 if hour >= 23 or hour <= 4 else 0.1
         
         # Customer history factor
-        customer_history = self._get_customer_history(customer_id, days=30)
-        history_factor = 0.3 if not customer_history else 0.1
+        history_factor = 0.1 if self._has_recent_history(customer_id, timestamp) else 0.3
         
         # Velocity factor
-        recent_txns = self._get_recent_transactions(merchant["merchant_id"], minutes=60)
+        recent_txns = self._get_recent_transactions(merchant["merchant_id"], minutes=60, now=timestamp)
         velocity_factor = min(len(recent_txns) / 10, 1.0) * 0.2
         
         risk_score = base_risk + amount_factor + time_factor + history_factor + velocity_factor
@@ -358,14 +690,264 @@ class DataGenerator:
         day_of_week = date.weekday()
         
         season_factor = self.fraud_config.temporal_dynamics["time_windows"]["seasonal"][f"q{(month-1)//3 + 1}"]
-        week_factor = (
+        week_low, week_high = (
             self.fraud_config.temporal_dynamics["time_windows"]["weekly"]["weekend"]
             if day_of_week >= 5
             else self.fraud_config.temporal_dynamics["time_windows"]["weekly"]["weekday"]
         )
+        week_factor = (week_low + week_high) / 2
         
         return season_factor * week_factor
 
+    def generate_merchant_profiles(self, count: int) -> List[Dict]:
+        """Generate merchant profiles drawn from the business configuration"""
+        categories = list(self.business_config.category_weights)
+        weights = np.array([self.business_config.category_weights[c] for c in categories])
+        merchants = []
+        for category in self.rng.choice(categories, size=count, p=weights / weights.sum()):
+            category = str(category)
+            ticket_low, ticket_high = self.business_config.ticket_ranges[category]
+            revenue_low, revenue_high = self.business_config.revenue_ranges[category]
+            merchant = {
+                "merchant_id": f"merchant_{self.rng.bytes(12).hex()}",
+                "business_name": self._locale_faker().company(),
+                "category": category,
+                "avg_ticket": round(float(self.rng.uniform(ticket_low, ticket_high)), 2),
+                "reported_revenue": round(float(self.rng.uniform(revenue_low, revenue_high)), 2),
+                "operating_hours": self.business_config.operating_hours[category],
+                "risk_score": self.business_config.risk_factors.get(category, 0.5),
+                "registration_date": self._now() - timedelta(days=int(self.rng.integers(30, 3650))),
+                "fraud_pattern": str(self.rng.choice([pattern.value for pattern in FraudPattern][:5])),
+            }
+            self._merchant_cache[merchant["merchant_id"]] = merchant
+            merchants.append(merchant)
+        return merchants
+
+    def _get_base_daily_volume(self, merchant: Dict) -> int:
+        low, high = self.transaction_config.volume_ranges[merchant["category"]]
+        return int(self.rng.integers(low, high + 1))
+
+    def _hourly_distribution(self, merchant: Dict) -> np.ndarray:
+        """Share of a day's transactions in each hour, concentrated in operating hours"""
+        weights = np.full(24, 0.05)
+        for start, end in merchant["operating_hours"]:
+            weights[start:end] = 1.0
+        return weights / weights.sum()
+
+    def _apply_temporal_factors(self, merchant: Dict, date: datetime, base_volume: int) -> Dict:
+        """Scale the day's volume by seasonality and spread it over the day"""
+        return {
+            "volume": base_volume * self._get_seasonal_factor(date),
+            "hourly_distribution": self._hourly_distribution(merchant),
+            "amount_distribution": {"shape": 0.5},
+        }
+
+    def _generate_fraud_transactions(self, merchant: Dict, date: datetime, vectorized: bool = False) -> List[Dict]:
+        """Generate a normal day plus the merchant's fraud pattern"""
+        transactions = self._generate_normal_transactions(merchant, date, vectorized)
+        pattern = merchant.get("fraud_pattern", FraudPattern.VELOCITY_SPIKE.value)
+        flags = {"pattern": pattern}
+
+        if pattern == FraudPattern.LATE_NIGHT.value:
+            for _ in range(int(self.rng.integers(20, 60))):
+                hour = int(self.rng.choice([23, 0, 1, 2, 3]))
+                txn_time = date.replace(hour=hour, minute=int(self.rng.integers(60)), second=int(self.rng.integers(60)))
+                transactions.append(self._create_transaction(
+                    merchant, txn_time, round(float(self.rng.lognormal(np.log(merchant["avg_ticket"]), 0.5)), 2),
+                    is_fraudulent=True, fraud_flags=flags
+                ))
+        elif pattern == FraudPattern.VELOCITY_SPIKE.value:
+            spike_start = date.replace(hour=int(self.rng.integers(24)), minute=0, second=0)
+            for _ in range(int(self.rng.integers(100, 200))):
+                transactions.append(self._create_transaction(
+                    merchant, spike_start + timedelta(seconds=int(self.rng.integers(3600))),
+                    round(float(self.rng.lognormal(np.log(merchant["avg_ticket"]), 0.5)), 2),
+                    is_fraudulent=True, fraud_flags=flags
+                ))
+        elif pattern == FraudPattern.SPLIT_TXN.value:
+            customer_id = self._get_or_create_customer()
+            cluster_start = date.replace(hour=int(self.rng.integers(24)), minute=0, second=0)
+            total = merchant["avg_ticket"] * 50
+            parts = int(self.rng.integers(3, 6))
+            for part in range(parts):
+                transactions.append(self._create_transaction(
+                    merchant, cluster_start + timedelta(minutes=5 * part), round(total / parts, 2),
+                    is_fraudulent=True, customer_id=customer_id, fraud_flags=flags
+                ))
+        elif pattern == FraudPattern.ROUND_AMOUNT.value:
+            for txn in transactions:
+                txn["amount"] = float(max(100, round(txn["amount"], -2)))
+                txn["is_fraudulent"] = True
+                txn["fraud_flags"] = flags
+        elif pattern == FraudPattern.CUSTOMER_CONCENTRATION.value:
+            regulars = [self._get_or_create_customer() for _ in range(3)]
+            for txn in transactions:
+                if self.rng.random() < 0.6:
+                    txn["customer_id"] = regulars[int(self.rng.integers(len(regulars)))]
+                    txn["is_fraudulent"] = True
+                    txn["fraud_flags"] = flags
+        return transactions
+
+    def _get_or_create_customer(self, reuse_probability: float = 0.3) -> str:
+        """Return a returning customer some of the time, otherwise a new one"""
+        if self._customer_ids and self.rng.random() < reuse_probability:
+            return self._customer_ids[int(self.rng.integers(len(self._customer_ids)))]
+        customer_id = f"CUST-{self.rng.bytes(6).hex()}"
+        self._add_customer(customer_id, self._now() - timedelta(days=int(self.rng.integers(0, 1000))))
+        return customer_id
+
+    def _get_or_create_customers(self, count: int, reuse_probability: float = 0.3) -> List[str]:
+        """`_get_or_create_customer` for `count` rows with one draw per column"""
+        existing = len(self._customer_ids)
+        reuse = self.rng.random(count) < reuse_probability if existing else np.zeros(count, dtype=bool)
+        reused = self.rng.integers(0, max(existing, 1), count)
+        new_count = int(count - reuse.sum())
+        new_ids = self.rng.bytes(6 * new_count).hex()
+        ages = self.rng.integers(0, 1000, new_count).tolist()
+        now = self._now()
+
+        customer_ids, created = [], 0
+        for reuse_row, index in zip(reuse.tolist(), reused.tolist()):
+            if reuse_row:
+                customer_ids.append(self._customer_ids[index])
+                continue
+            customer_id = f"CUST-{new_ids[12 * created:12 * created + 12]}"
+            self._add_customer(customer_id, now - timedelta(days=ages[created]))
+            customer_ids.append(customer_id)
+            created += 1
+        return customer_ids
+
+    def _add_customer(self, customer_id: str, created_at: datetime) -> None:
+        """Add a customer to the returning pool, replacing the oldest once it is full"""
+        slot = self._customers_created % CUSTOMER_POOL_SIZE
+        if slot < len(self._customer_ids):
+            self._customer_cache.pop(self._customer_ids[slot], None)
+            self._customer_ids[slot] = customer_id
+        else:
+            self._customer_ids.append(customer_id)
+        self._customer_cache[customer_id] = {"created_at": created_at}
+        self._customers_created += 1
+
+    def _weighted_choice(self, weights: Dict[str, float]) -> str:
+        options = list(weights)
+        probabilities = np.array([weights[option] for option in options])
+        return options[int(self.rng.choice(len(options), p=probabilities / probabilities.sum()))]
+
+    def _weighted_choices(self, weights: Dict[str, float], count: int) -> List[str]:
+        """`count` independent weighted draws in one `rng` call"""
+        options = list(weights)
+        probabilities = np.array([weights[option] for option in options])
+        codes = self.rng.choice(len(options), size=count, p=probabilities / probabilities.sum())
+        return [options[code] for code in codes.tolist()]
+
+    def _get_transaction_status(self) -> str:
+        return self._weighted_choice(self.transaction_config.status_weights)
+
+    def _get_payment_method(self) -> str:
+        return self._weighted_choice(self.transaction_config.payment_methods)
+
+    def _get_transaction_platform(self) -> str:
+        return self._weighted_choice(self.transaction_config.platform_weights)
+
+    def _get_customer_age(self, customer_id: str) -> int:
+        customer = self._customer_cache.get(customer_id)
+        return (self._now() - customer["created_at"]).days if customer else 0
+
+    def _get_merchant_age(self, merchant_id: str) -> int:
+        merchant = self._merchant_cache.get(merchant_id)
+        return (self._now() - merchant["registration_date"]).days if merchant else 0
+
+    def _has_recent_history(self, customer_id: str, now: datetime, days: int = 30) -> bool:
+        """Whether `_get_customer_history` would return anything, from its newest entry alone"""
+        history = self._customer_history.get(customer_id)
+        return bool(history) and history[-1]["timestamp"] >= (now - timedelta(days=days)).isoformat()
+
+    def _get_customer_history(self, customer_id: str, days: int = 30, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Transactions by the customer in the `days` before `now`.
+
+        History is kept for `CUSTOMER_HISTORY_LOOKBACK`; longer lookbacks are truncated.
+        """
+        since = ((now or self._now()) - timedelta(days=days)).isoformat()
+        recent = []
+        for txn in reversed(self._customer_history.get(customer_id, ())):
+            if txn["timestamp"] < since:
+                break
+            recent.append(txn)
+        return recent[::-1]
+
+    def _get_recent_transactions(self, merchant_id: str, minutes: int = 60, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Transactions for the merchant in the `minutes` before `now`.
+
+        Walks the merchant's deque back from its newest entry, so the cost is
+        the rows after `now - minutes` rather than the whole history. History
+        is kept for `VELOCITY_LOOKBACK`; longer lookbacks are truncated.
+        """
+        now = now or self._now()
+        since, until = (now - timedelta(minutes=minutes)).isoformat(), now.isoformat()
+        recent = []
+        for txn in reversed(self._merchant_history.get(merchant_id, ())):
+            if txn["timestamp"] > until:
+                continue
+            if txn["timestamp"] < since:
+                break
+            recent.append(txn)
+        return recent[::-1]
+
+    def generate_benchmark_window(
+        self,
+        transaction_count: int,
+        days: int = 30,
+        end_date: Optional[datetime] = None,
+        merchant: Optional[Dict] = None
+    ) -> Tuple[Dict, List[Dict]]:
+        """
+        Draw one merchant's transaction window in bulk for benchmarks.
+
+        Only the fields the risk pipeline reads are produced, with every column
+        drawn from `rng` in one call, so a seeded generator rebuilds the same
+        window and a million rows take seconds rather than the per-row path's
+        hours. Hours follow the merchant's operating hours, amounts are
+        lognormal around its average ticket and customers are Zipf-distributed.
+
+        Args:
+            transaction_count: Number of transactions in the window.
+            days: Window length in days.
+            end_date: Window end; defaults to now.
+            merchant: Merchant profile; a new one is generated when omitted.
+
+        Returns:
+            Tuple of (merchant, transactions) with transactions in timestamp order.
+        """
+        merchant = merchant or self.generate_merchant_profiles(1)[0]
+        end_date = end_date or datetime.utcnow()
+        start_date = end_date - timedelta(days=days)
+
+        day_offsets = self.rng.integers(0, days, transaction_count)
+        hours = self.rng.choice(24, size=transaction_count, p=self._hourly_distribution(merchant))
+        seconds_in_hour = self.rng.integers(0, 3600, transaction_count)
+        offsets = np.sort(day_offsets * 86400 + hours * 3600 + seconds_in_hour)
+        amounts = np.round(self.rng.lognormal(np.log(merchant["avg_ticket"]), 0.5, transaction_count), 2)
+
+        customer_pool = [f"CUST-{i:08d}" for i in range(max(1, transaction_count // 5))]
+        customer_codes = (self.rng.zipf(1.5, transaction_count) - 1) % len(customer_pool)
+
+        transactions = [
+            {
+                "transaction_id": f"TXN-{merchant['merchant_id'][-8:]}-{i:09d}",
+                "merchant_id": merchant["merchant_id"],
+                "customer_id": customer_pool[code],
+                "timestamp": start_date + timedelta(seconds=offset),
+                "amount": amount,
+                "product_category": merchant["category"],
+            }
+            for i, (offset, amount, code) in enumerate(
+                zip(offsets.tolist(), amounts.tolist(), customer_codes.tolist())
+            )
+        ]
+        return merchant, transactions
+
     # Add test method
     def test_generator(self, merchant_count: int = 10, days: int = 7) -> None:
         """Test the data generator and print summary statistics"""
@@ -404,6 +986,121 @@ class DataGenerator:
         df['hour'] = pd.to_datetime(df['timestamp']).dt.hour
         print(df.groupby('hour').size())
 
+def _insert_in_time_order(history: deque, transaction: Dict) -> None:
+    """Append, or insert from the right for a row older than the newest"""
+    timestamp = transaction["timestamp"]
+    if not history or history[-1]["timestamp"] <= timestamp:
+        history.append(transaction)
+        return
+    index = len(history) - 1
+    while index > 0 and history[index - 1]["timestamp"] > timestamp:
+        index -= 1
+    history.insert(index, transaction)
+
+
+def _evict_before(history: deque, cutoff: str) -> None:
+    while history and history[0]["timestamp"] < cutoff:
+        history.popleft()
+
+
+class _MerchantShard:
+    """
+    One worker's merchants, each with its own seeded generator.
+
+    The generators share one Faker, reseeded from the merchant's `rng`
+    before each of its days, and one set of Faker pools built from the
+    pool seed, so no merchant's output depends on which shard it is in.
+    """
+    def __init__(
+        self,
+        business_config: BusinessConfig,
+        transaction_config: TransactionConfig,
+        specs: List[Tuple[int, Dict, bool, int]],
+        pool_seed: int,
+        reference_time: datetime,
+        vectorized: bool
+    ):
+        fake = Faker(FAKER_LOCALES)
+        fake.seed_instance(pool_seed)
+        pool_source = DataGenerator(business_config, transaction_config, pool_seed, reference_time, fake=fake)
+        pools = {name: pool_source._faker_pool(name) for name in FAKER_POOLS}
+        self.specs = specs
+        self.vectorized = vectorized
+        self.generators = []
+        for _, merchant, _, merchant_seed in specs:
+            generator = DataGenerator(
+                business_config, transaction_config, merchant_seed, reference_time, fake=fake
+            )
+            generator._faker_pools = pools
+            generator._merchant_cache[merchant["merchant_id"]] = merchant
+            self.generators.append(generator)
+
+    def generate_day(self, date: datetime) -> List[Tuple[str, int, int, Dict]]:
+        """The shard's transactions for `date` as sorted (timestamp, merchant index, row, transaction)"""
+        rows = []
+        for (index, merchant, is_fraud, _), generator in zip(self.specs, self.generators):
+            generator.fake.seed_instance(int(generator.rng.integers(2 ** 63)))
+            transactions = (
+                generator._generate_fraud_transactions(merchant, date, self.vectorized)
+                if is_fraud
+                else generator._generate_normal_transactions(merchant, date, self.vectorized)
+            )
+            rows.extend((txn["timestamp"], index, row, txn) for row, txn in enumerate(transactions))
+        rows.sort(key=_row_key)
+        return rows
+
+
+def _row_key(row: Tuple[str, int, int, Dict]) -> Tuple[str, int, int]:
+    return row[0], row[1], row[2]
+
+
+def _run_shard(shard_args: Tuple, dates: List[datetime], out: "multiprocessing.Queue") -> None:
+    """Worker process body: send each day's sorted rows, or the exception that stopped it"""
+    try:
+        shard = _MerchantShard(*shard_args)
+        for date in dates:
+            out.put(shard.generate_day(date))
+    except Exception as e:
+        out.put(e)
+
+
+def _receive(out: "multiprocessing.Queue") -> List[Tuple[str, int, int, Dict]]:
+    rows = out.get()
+    if isinstance(rows, Exception):
+        raise rows
+    return rows
+
+
+def _merged_batches(
+    merchants: List[Dict],
+    dates: List[datetime],
+    days_rows,
+    batch_size: int
+) -> Generator[Tuple[List[Dict], List[Dict]], None, None]:
+    """
+    Merge each day's per-shard rows and yield them in batches.
+
+    Rows stamped after the day, e.g. a velocity spike that runs past
+    midnight, are held back and merged into the next day.
+    """
+    carried: List[Tuple[str, int, int, Dict]] = []
+    batch: List[Dict] = []
+    for day, shard_rows in enumerate(days_rows):
+        merged = list(heapq.merge(carried, *shard_rows, key=_row_key))
+        split = len(merged)
+        if day + 1 < len(dates):
+            next_day = dates[day + 1].replace(hour=0, minute=0, second=0).isoformat()
+            split = bisect.bisect_left(merged, next_day, key=lambda row: row[0])
+        carried = merged[split:]
+        for row in merged[:split]:
+            batch.append(row[3])
+            if len(batch) >= batch_size:
+                yield merchants, batch
+                batch = []
+    if batch:
+        yield merchants, batch
+
+
 # Example usage and test
 if __name__ == "__main__":
     # Sample configurations
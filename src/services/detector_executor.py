@@ -0,0 +1,159 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import asyncio
+import logging
+
+from src.config.settings import Settings, get_settings
+from src.services.pattern_engine import (
+    STAGE_DETECTORS, TransactionWindow, AnalysisParams, WindowAnalysis, analyze_window_timed,
+    analysis_stages, assemble_analysis, run_timed, sort_window
+)
+from src.utils.memory_profiling import memory_profiler, traced_call
+from src.utils.metrics import DETECTOR_SECONDS
+
+logger = logging.getLogger("DetectorExecutor")
+
+
+class ExecutorMode:
+    INLINE = "inline"    # run on the event loop (tests, tiny windows)
+    THREAD = "thread"    # always use the thread pool
+    PROCESS = "process"  # always use the process pool
+    AUTO = "auto"        # thread pool below process_threshold, process pool above
+
+
+class DetectorExecutor:
+    """
+    Runs the CPU-bound analysis stage off the event loop.
+
+    Small windows go to a thread pool where the independent kernels run
+    concurrently (NumPy releases the GIL for sorts and reductions). Windows
+    above `process_threshold` transactions are shipped to a process pool as a
+    single fused task so the arrays are pickled once.
+    """
+    def __init__(
+        self,
+        mode: str = ExecutorMode.AUTO,
+        process_threshold: int = 50000,
+        max_thread_workers: Optional[int] = None,
+        max_process_workers: Optional[int] = None,
+    ):
+        if mode not in (ExecutorMode.INLINE, ExecutorMode.THREAD, ExecutorMode.PROCESS, ExecutorMode.AUTO):
+            raise ValueError(f"Unknown executor mode: {mode}")
+        self.mode = mode
+        self.process_threshold = process_threshold
+        self.max_thread_workers = max_thread_workers
+        self.max_process_workers = max_process_workers
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Settings] = None) -> "DetectorExecutor":
+        """Build an executor from the detector_* settings."""
+        settings = settings or get_settings()
+        return cls(
+            mode=settings.detector_executor_mode,
+            process_threshold=settings.detector_process_threshold,
+            max_thread_workers=settings.detector_max_thread_workers,
+            max_process_workers=settings.detector_max_process_workers,
+        )
+
+    def _use_process_pool(self, size: int) -> bool:
+        if self.mode == ExecutorMode.PROCESS:
+            return True
+        return self.mode == ExecutorMode.AUTO and size >= self.process_threshold
+
+    def _get_thread_pool(self) -> Executor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.max_thread_workers, thread_name_prefix="detector"
+            )
+        return self._thread_pool
+
+    def _get_process_pool(self) -> Executor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.max_process_workers)
+        return self._process_pool
+
+    async def run(self, size: int, func: Callable, *args):
+        """
+        Run a picklable callable in the pool appropriate for an input of `size` rows.
+
+        Args:
+            size: Number of transactions the call processes.
+            func: Module-level function to execute.
+            *args: Positional arguments for `func`.
+
+        Returns:
+            The function's result.
+        """
+        if self.mode == ExecutorMode.INLINE:
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        if not self._use_process_pool(size):
+            return await loop.run_in_executor(self._get_thread_pool(), func, *args)
+        if not memory_profiler.tracing:
+            return await loop.run_in_executor(self._get_process_pool(), func, *args)
+        # The worker's allocations are invisible to this process's tracer; measure them there
+        result, peak_bytes = await loop.run_in_executor(self._get_process_pool(), traced_call, func, *args)
+        memory_profiler.record_worker_peak(peak_bytes)
+        return result
+
+    async def build_window(self, merchant_id: str, transactions: List[Dict]) -> TransactionWindow:
+        """
+        Convert fetched documents to a columnar window on the thread pool.
+
+        The conversion walks Python dicts, so it always stays in-process rather
+        than pickling the documents to a worker process.
+        """
+        if self.mode == ExecutorMode.INLINE:
+            return TransactionWindow.from_documents(merchant_id, transactions)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._get_thread_pool(), TransactionWindow.from_documents, merchant_id, transactions
+        )
+
+    async def analyze(self, window: TransactionWindow, params: AnalysisParams) -> WindowAnalysis:
+        """
+        Run the fused window analysis without blocking the event loop.
+
+        The sort and every analysis stage are timed where they run and
+        observed in DETECTOR_SECONDS under the detector they feed.
+
+        Args:
+            window: Columnar transaction window.
+            params: Detector parameters.
+
+        Returns:
+            WindowAnalysis for the detectors.
+        """
+        size = len(window)
+        if self.mode == ExecutorMode.INLINE or self._use_process_pool(size):
+            analysis, timings = await self.run(size, analyze_window_timed, window, params)
+        else:
+            ordered, sort_seconds = await self.run(size, run_timed, sort_window, window)
+            stages = analysis_stages(ordered, params)
+            timed_results = await asyncio.gather(*(
+                self.run(size, run_timed, func, *args) for func, args in stages.values()
+            ))
+            analysis = assemble_analysis(
+                ordered, {name: result for name, (result, _) in zip(stages, timed_results)}
+            )
+            timings = {name: seconds for name, (_, seconds) in zip(stages, timed_results)}
+            timings["sort_window"] = sort_seconds
+
+        for stage, seconds in timings.items():
+            DETECTOR_SECONDS.observe(seconds, STAGE_DETECTORS[stage], stage)
+        return analysis
+
+    def shutdown(self) -> None:
+        """Shut down any pools that were started."""
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        logger.info("Detector executor pools shut down")
+
+
+# Shared executor for all RiskCalculatorService instances in this worker
+detector_executor = DetectorExecutor.from_settings()
@@ -0,0 +1,355 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import calendar
+import logging
+import time
+
+import numpy as np
+
+logger = logging.getLogger("PatternEngine")
+
+
+def parse_hour_window(time_window: str) -> Tuple[int, int]:
+    """
+    Parse an "HH:MM-HH:MM" window into start and end hours.
+
+    Args:
+        time_window: Window string such as "23:00-04:00".
+
+    Returns:
+        Tuple of (start_hour, end_hour).
+    """
+    start, end = time_window.split("-")
+    return int(start.split(":")[0]), int(end.split(":")[0])
+
+
+def to_epoch_seconds(timestamp: datetime) -> int:
+    """Convert a datetime to epoch seconds, treating naive values as UTC like Mongo does."""
+    return calendar.timegm(timestamp.utctimetuple())
+
+
+# Transaction fields a TransactionWindow is built from; fetches project to these
+WINDOW_FIELDS = ("timestamp", "amount", "customer_id")
+
+
+@dataclass
+class TransactionWindow:
+    """
+    Columnar view of a merchant's transaction window.
+
+    Built once per analysis from the Motor documents so every detector works on
+    contiguous NumPy arrays instead of walking dicts key by key.
+    """
+    merchant_id: str
+    timestamps: np.ndarray      # int64 epoch seconds
+    amounts: np.ndarray         # float64
+    customer_codes: np.ndarray  # int64 index into customer_ids
+    customer_ids: np.ndarray    # unique customer identifiers
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_documents(cls, merchant_id: str, transactions: List[Dict]) -> "TransactionWindow":
+        """
+        Convert transaction documents into columnar arrays.
+
+        Args:
+            merchant_id: Merchant the window belongs to.
+            transactions: Transaction documents with timestamp, amount and customer_id.
+
+        Returns:
+            TransactionWindow holding one array per field.
+        """
+        return cls.from_columns(
+            merchant_id,
+            [txn['timestamp'] for txn in transactions],
+            [txn['amount'] for txn in transactions],
+            [txn['customer_id'] for txn in transactions],
+        )
+
+    @classmethod
+    def from_columns(
+        cls, merchant_id: str, timestamps: List, amounts: List[float], customer_ids: List[str]
+    ) -> "TransactionWindow":
+        """Build a window from parallel lists of timestamps, amounts and customer ids."""
+        unique_customers, customer_codes = np.unique(np.array(customer_ids, dtype=object), return_inverse=True)
+        return cls(
+            merchant_id=merchant_id,
+            timestamps=np.array(timestamps, dtype="datetime64[s]").astype(np.int64),
+            amounts=np.array(amounts, dtype=np.float64),
+            customer_codes=customer_codes.astype(np.int64),
+            customer_ids=unique_customers,
+        )
+
+
+@dataclass
+class AnalysisParams:
+    """Detector parameters the fused analysis stage needs up front."""
+    velocity_window_seconds: int = 3600
+    velocity_threshold: int = 100
+    split_window_minutes: float = 30
+    split_min_transactions: int = 3
+    round_factor: float = 10
+    split_amount_threshold: float = 0.0  # cluster total the split detector flags
+    top_customers: int = 100  # customers returned by server-side aggregation
+    max_split_ranges: int = 100  # split candidate ranges fetched by server-side aggregation
+
+
+@dataclass
+class WindowAnalysis:
+    """
+    Shared aggregates for one merchant window.
+
+    Produced by a single sort and scan in `analyze_window`; detectors only read
+    these results and never touch the transactions again.
+    """
+    merchant_id: str
+    transaction_count: int
+    hour_histogram: np.ndarray   # transactions per hour of day, length 24
+    round_count: int
+    customer_ids: np.ndarray
+    customer_counts: np.ndarray  # aligned with customer_ids
+    velocity_spike_count: int
+    cluster_sizes: np.ndarray    # split clusters with at least split_min_transactions members
+    cluster_totals: np.ndarray
+
+
+def sort_window(window: TransactionWindow) -> TransactionWindow:
+    """Return a copy of the window in timestamp order (the one shared sort)."""
+    order = np.argsort(window.timestamps, kind="stable")
+    return TransactionWindow(
+        merchant_id=window.merchant_id,
+        timestamps=window.timestamps[order],
+        amounts=window.amounts[order],
+        customer_codes=window.customer_codes[order],
+        customer_ids=window.customer_ids,
+    )
+
+
+# Detector (RiskPatternType value) each analysis stage feeds, for per-stage metrics
+STAGE_DETECTORS = {
+    "sort_window": "shared",
+    "hour_histogram": "late_night_trading",
+    "round_count": "round_amount_pattern",
+    "customer_counts": "customer_concentration",
+    "velocity_spike_count": "sudden_activity_spike",
+    "split_clusters": "split_transactions",
+}
+
+
+def analysis_stages(window: TransactionWindow, params: AnalysisParams) -> Dict[str, Tuple[Callable, tuple]]:
+    """
+    Describe the independent kernels of the fused analysis.
+
+    Args:
+        window: Time-ordered window (see `sort_window`).
+        params: Detector parameters.
+
+    Returns:
+        Mapping of stage name to (function, args); stages share no state and can
+        run in any order or concurrently.
+    """
+    return {
+        "hour_histogram": (build_hour_histogram, (window.timestamps,)),
+        "round_count": (count_round_amounts, (window.amounts, params.round_factor)),
+        "customer_counts": (count_by_customer, (window.customer_codes, len(window.customer_ids))),
+        "velocity_spike_count": (
+            count_velocity_spikes,
+            (window.timestamps, params.velocity_window_seconds, params.velocity_threshold),
+        ),
+        "split_clusters": (
+            find_split_clusters,
+            (window.timestamps, window.amounts, params.split_window_minutes, params.split_min_transactions),
+        ),
+    }
+
+
+def assemble_analysis(window: TransactionWindow, results: Dict) -> WindowAnalysis:
+    """Combine stage results from `analysis_stages` into a WindowAnalysis."""
+    cluster_sizes, cluster_totals = results["split_clusters"]
+    return WindowAnalysis(
+        merchant_id=window.merchant_id,
+        transaction_count=len(window),
+        hour_histogram=results["hour_histogram"],
+        round_count=results["round_count"],
+        customer_ids=window.customer_ids,
+        customer_counts=results["customer_counts"],
+        velocity_spike_count=results["velocity_spike_count"],
+        cluster_sizes=cluster_sizes,
+        cluster_totals=cluster_totals,
+    )
+
+
+def analyze_window(window: TransactionWindow, params: AnalysisParams) -> WindowAnalysis:
+    """
+    Build every detector aggregate with one shared sort of the window.
+
+    Args:
+        window: Columnar transaction window, in any order.
+        params: Detector parameters.
+
+    Returns:
+        WindowAnalysis consumed by the pattern detectors.
+    """
+    ordered = sort_window(window)
+    results = {
+        name: func(*args) for name, (func, args) in analysis_stages(ordered, params).items()
+    }
+    return assemble_analysis(ordered, results)
+
+
+def run_timed(func: Callable, *args) -> Tuple[Any, float]:
+    """Call `func` and return (result, wall seconds); module-level so pool workers can report timings."""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def analyze_window_timed(
+    window: TransactionWindow, params: AnalysisParams
+) -> Tuple[WindowAnalysis, Dict[str, float]]:
+    """
+    `analyze_window`, also returning the wall time of the sort and each stage.
+
+    Timings come back with the result so they survive a process pool hop.
+    """
+    timings: Dict[str, float] = {}
+    ordered, timings["sort_window"] = run_timed(sort_window, window)
+    results = {}
+    for name, (func, args) in analysis_stages(ordered, params).items():
+        results[name], timings[name] = run_timed(func, *args)
+    return assemble_analysis(ordered, results), timings
+
+
+def build_hour_histogram(times: np.ndarray) -> np.ndarray:
+    """Count transactions per hour of day."""
+    return np.bincount((times // 3600) % 24, minlength=24)
+
+
+def count_round_amounts(amounts: np.ndarray, round_factor: float) -> int:
+    """Count amounts that are exact multiples of `round_factor`."""
+    return int(np.count_nonzero(amounts % round_factor == 0))
+
+
+def count_by_customer(customer_codes: np.ndarray, customer_count: int) -> np.ndarray:
+    """Count transactions per customer code."""
+    return np.bincount(customer_codes, minlength=customer_count)
+
+
+def count_hours(hour_histogram: np.ndarray, start_hour: int, end_hour: int) -> int:
+    """Sum an hour-of-day histogram over [start_hour, end_hour), wrapping midnight."""
+    if start_hour > end_hour:
+        return int(hour_histogram[start_hour:].sum() + hour_histogram[:end_hour].sum())
+    return int(hour_histogram[start_hour:end_hour].sum())
+
+
+def count_velocity_spikes(times: np.ndarray, time_window_seconds: int, threshold: int) -> int:
+    """
+    Count transactions that close a trailing window holding at least `threshold` transactions.
+
+    Equivalent to the two-pointer scan over time-ordered timestamps, with the
+    window start for every transaction found by binary search.
+    """
+    window_starts = np.searchsorted(times, times - time_window_seconds, side="left")
+    window_sizes = np.arange(len(times)) - window_starts + 1
+    return int(np.count_nonzero(window_sizes >= threshold))
+
+
+def find_split_clusters(
+    times: np.ndarray, amounts: np.ndarray, time_window_minutes: float, min_transactions: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Group time-ordered transactions into clusters separated by gaps longer than the time window.
+
+    Returns:
+        Tuple of (cluster_sizes, cluster_totals) for clusters with at least
+        `min_transactions` members.
+    """
+    if len(times) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    breaks = np.flatnonzero(np.diff(times) > time_window_minutes * 60) + 1
+    starts = np.concatenate(([0], breaks))
+    sizes = np.diff(np.concatenate((starts, [len(times)])))
+    totals = np.add.reduceat(amounts, starts)
+
+    keep = sizes >= min_transactions
+    return sizes[keep], totals[keep]
+
+
+def count_velocity_spikes_bucketed(
+    minutes: np.ndarray, counts: np.ndarray, time_window_seconds: int, threshold: int
+) -> int:
+    """
+    Minute-resolution `count_velocity_spikes` over per-minute transaction counts.
+
+    Transactions inside a minute are treated as arriving in order, so the
+    k-th one closes a window of (earlier minutes in the window) + k. The window
+    is widened to whole minutes, so it can over-count by up to one minute of
+    traffic; for minute-aligned timestamps the result is exact.
+
+    Args:
+        minutes: Sorted epoch minutes that have transactions.
+        counts: Transactions per minute, aligned with `minutes`.
+    """
+    if len(minutes) == 0:
+        return 0
+    cumulative = np.concatenate(([0], np.cumsum(counts)))
+    window_starts = np.searchsorted(minutes, minutes - time_window_seconds // 60, side="left")
+    earlier = cumulative[:-1] - cumulative[window_starts]
+    return int(np.clip(earlier + counts - threshold + 1, 0, counts).sum())
+
+
+def split_candidate_ranges(
+    minutes: np.ndarray,
+    counts: np.ndarray,
+    time_window_minutes: float,
+    min_transactions: int,
+    amounts: Optional[np.ndarray] = None,
+    amount_threshold: float = 0.0,
+    max_ranges: Optional[int] = None
+) -> List[Tuple[int, int]]:
+    """
+    Find the time ranges that can contain split clusters, from per-minute counts.
+
+    Minutes are merged whenever the transactions in them could be within the
+    split window of each other, so every cluster `find_split_clusters` would
+    find lies inside one range, and ranges are separated by gaps longer than
+    the window.
+
+    Args:
+        minutes: Sorted epoch minutes with at least one transaction.
+        counts: Transactions per minute.
+        time_window_minutes: Split window.
+        min_transactions: Smallest cluster size.
+        amounts: Amount total per minute; with `amount_threshold`, ranges whose
+            total is below the threshold are dropped, as no cluster inside
+            them can reach it.
+        amount_threshold: Cluster total the split detector flags.
+        max_ranges: Merge the ranges separated by the shortest gaps until at
+            most this many remain. Merged ranges may hold extra clusters, but
+            still split none.
+
+    Returns:
+        [start, end) epoch-second ranges holding at least `min_transactions`.
+    """
+    if len(minutes) == 0:
+        return []
+    breaks = np.flatnonzero((np.diff(minutes) - 1) * 60 > time_window_minutes * 60) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(minutes)])) - 1
+    keep = np.add.reduceat(counts, starts) >= min_transactions
+    if amounts is not None and amount_threshold > 0:
+        keep &= np.add.reduceat(amounts, starts) >= amount_threshold
+    range_starts, range_ends = minutes[starts[keep]] * 60, (minutes[ends[keep]] + 1) * 60
+
+    if max_ranges is not None and len(range_starts) > max_ranges:
+        # Close the shortest gaps: keep only the max_ranges - 1 longest as boundaries
+        gaps = range_starts[1:] - range_ends[:-1]
+        boundaries = np.sort(np.argsort(gaps, kind="stable")[len(gaps) - (max_ranges - 1):])
+        range_starts = range_starts[np.concatenate(([0], boundaries + 1))]
+        range_ends = range_ends[np.concatenate((boundaries, [len(range_ends) - 1]))]
+
+    return [(int(start), int(end)) for start, end in zip(range_starts, range_ends)]
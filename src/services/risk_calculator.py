@@ -1,25 +1,37 @@
 from datetime import datetime, time, timedelta
-from typing import List, Dict, Optional, Callable
+from typing import AsyncIterator, List, Dict, Optional, Callable, Tuple, Union
 from collections import defaultdict, Counter
 import logging
 import math
-import json
-from functools import lru_cache
-import redis
+import asyncio
 import uuid
+import numpy as np
 
 from src.models.risk_profile import (
     RiskPattern, RiskPatternType, RiskProfileResponse, PatternCharacteristics,
     RiskStatus
 )
-from src.config.database import db
+from src.config.database import db, projection
+from src.config.settings import Settings, get_settings
+from src.utils.cache import cache, cached, window_key
+from src.utils.logging import HOT_PATH, log_context
+from src.utils.memory_profiling import memory_profiler
+from src.utils.profiling import profile_stage
+from src.utils.metrics import ANALYSES_IN_FLIGHT, ANALYSIS_SECONDS, TRANSACTIONS_SCANNED
+from src.services.pattern_engine import (
+    AnalysisParams, TransactionWindow, WindowAnalysis, WINDOW_FIELDS,
+    parse_hour_window, count_hours, to_epoch_seconds
+)
+from src.services.detector_executor import DetectorExecutor, detector_executor
+from src.services.rolling_risk_state import MerchantRollingState, rolling_state_store
+from src.services.aggregate_analysis import load_aggregated_analysis
+from src.services.timeline_generator import TimelineGenerator
 
 from enum import Enum, auto
 from dataclasses import dataclass, field
 
 # Setup logging
 logger = logging.getLogger("RiskCalculatorService")
-logging.basicConfig(level=logging.INFO)
 
 # Define Strategy Classes
 
@@ -150,7 +162,7 @@ class AdvancedRiskCalculator:
             return 0.0
 
         average_correlation = sum(correlation_matrix) / len(correlation_matrix)
-        self.logger.info(f"Average pattern correlation: {average_correlation}")
+        self.logger.debug("Average pattern correlation: %s", average_correlation, extra=HOT_PATH)
         return average_correlation
     
     def _assess_external_risk_signals(self) -> float:
@@ -179,6 +191,12 @@ class AdvancedRiskCalculator:
         return weight_map.get(pattern_name, 0.1)
 
 
+class AnalysisMode:
+    COLUMNAR = "columnar"        # fetch the window and analyse it on every call
+    INCREMENTAL = "incremental"  # read rolling per-merchant state kept current at ingest
+    AGGREGATION = "aggregation"  # let MongoDB compute the aggregates and return only those
+
+
 class RiskCalculatorService:
     """
     RiskCalculatorService: Core service for merchant risk analysis and pattern detection.
@@ -200,20 +218,24 @@ class RiskCalculatorService:
     Author: [Your Name]
     Last Modified: [Date]
     """
-    def __init__(self, db_client):
-        self.db = db_client
+    @classmethod
+    def from_settings(cls, settings: Optional[Settings] = None, **kwargs) -> "RiskCalculatorService":
+        """Build a calculator using the configured risk_analysis_mode."""
+        settings = settings or get_settings()
+        return cls(analysis_mode=settings.risk_analysis_mode, **kwargs)
+
+    def __init__(
+        self,
+        db_client=None,
+        executor: Optional[DetectorExecutor] = None,
+        analysis_mode: str = AnalysisMode.COLUMNAR
+    ):
+        self.db = db_client or db
+        if analysis_mode not in (AnalysisMode.COLUMNAR, AnalysisMode.INCREMENTAL, AnalysisMode.AGGREGATION):
+            raise ValueError(f"Unknown analysis mode: {analysis_mode}")
+        self.executor = executor or detector_executor
+        self.analysis_mode = analysis_mode
         self.pattern_configs = self._load_pattern_configs()
-        self.redis_client = redis.Redis(
-            host='localhost', 
-            port=6379, 
-            db=0,
-            decode_responses=True
-        )
-        self.cache_ttl = {
-            'merchant_profile': 3600,  # 1 hour
-            'risk_metrics': 1800,      # 30 minutes
-            'pattern_results': 900     # 15 minutes
-        }
         self.pattern_weights = {
             'late_night': 0.2,
             'velocity_spike': 0.25,
@@ -222,58 +244,72 @@ class RiskCalculatorService:
             'customer_concentration': 0.2
         }
 
-    async def get_cached_pattern_results(self, merchant_id: str, pattern_type: str) -> Optional[Dict]:
-        """Get cached pattern detection results."""
-        cache_key = f"pattern:{merchant_id}:{pattern_type}"
-        cached_result = self.redis_client.get(cache_key)
-        return json.loads(cached_result) if cached_result else None
-
-    async def cache_pattern_results(self, merchant_id: str, pattern_type: str, results: Dict):
-        """Cache pattern detection results."""
-        cache_key = f"pattern:{merchant_id}:{pattern_type}"
-        self.redis_client.setex(
-            cache_key,
-            self.cache_ttl['pattern_results'],
-            json.dumps(results)
+    async def get_cached_pattern_results(
+        self, merchant_id: str, pattern_types: List[str], data_version: int, days: int
+    ) -> Dict[str, Dict]:
+        """Get cached pattern detection results for several patterns in one lookup."""
+        prefix = window_key(merchant_id, data_version, days)
+        keys = {pattern_type: f"{prefix}:{pattern_type}" for pattern_type in pattern_types}
+        cached_results = await cache.get_many("pattern", keys.values())
+        return {
+            pattern_type: cached_results[key]
+            for pattern_type, key in keys.items()
+            if key in cached_results
+        }
+
+    async def cache_pattern_results(
+        self, merchant_id: str, results: Dict[str, Dict], data_version: int, days: int
+    ):
+        """Cache several pattern detection results in one pipelined round trip."""
+        prefix = window_key(merchant_id, data_version, days)
+        await cache.set_many(
+            "pattern",
+            {f"{prefix}:{pattern_type}": result for pattern_type, result in results.items()}
         )
 
-    async def _detect_pattern_with_cache(
-        self, 
-        transactions: List[Dict], 
-        pattern_type: RiskPatternType, 
-        config: Dict
-    ) -> Optional[RiskPattern]:
-        merchant_id = transactions[0]['merchant_id']
-        cached_result = await self.get_cached_pattern_results(merchant_id, pattern_type.value)
-        
-        if cached_result:
-            return RiskPattern(**cached_result)
+    async def _detect_patterns_with_cache(
+        self, analysis: WindowAnalysis, data_version: int, days: int
+    ) -> List[RiskPattern]:
+        """Detect all configured patterns, reading and writing the cache in one batch each."""
+        merchant_id = analysis.merchant_id
+        pattern_types = [pattern_type.value for pattern_type in self.pattern_configs]
+        with profile_stage("cache_read"):
+            cached_results = await self.get_cached_pattern_results(merchant_id, pattern_types, data_version, days)
+
+        missing = [
+            (pattern_type, config)
+            for pattern_type, config in self.pattern_configs.items()
+            if pattern_type.value not in cached_results
+        ]
+        detected = await asyncio.gather(*(
+            self._detect_pattern(analysis, pattern_type, config) for pattern_type, config in missing
+        ))
+        new_results = {
+            pattern_type.value: pattern
+            for (pattern_type, _), pattern in zip(missing, detected)
+            if pattern
+        }
+        with profile_stage("cache_write"):
+            await self.cache_pattern_results(
+                merchant_id,
+                {pattern_type: pattern.dict() for pattern_type, pattern in new_results.items()},
+                data_version,
+                days
+            )
 
-        pattern = await self._detect_pattern(transactions, pattern_type, config)
-        if pattern:
-            await self.cache_pattern_results(merchant_id, pattern_type.value, pattern.dict())
-        
-        return pattern
+        # Keep pattern_configs order in the response
+        patterns = []
+        for pattern_type in pattern_types:
+            if pattern_type in cached_results:
+                patterns.append(RiskPattern(**cached_results[pattern_type]))
+            elif pattern_type in new_results:
+                patterns.append(new_results[pattern_type])
+        return patterns
 
-    @lru_cache(maxsize=1000)
+    @cached("merchant_profile")
     async def get_cached_merchant_profile(self, merchant_id: str):
-        """Cache merchant profiles in memory."""
-        cache_key = f"merchant_profile:{merchant_id}"
-        
-        # Try to get from Redis first
-        cached_profile = self.redis_client.get(cache_key)
-        if cached_profile:
-            return json.loads(cached_profile)
-            
-        # If not in cache, get from database
-        profile = await self.db.merchants.find_one({"merchant_id": merchant_id})
-        if profile:
-            # Store in Redis
-            self.redis_client.setex(
-                cache_key,
-                self.cache_ttl['merchant_profile'],
-                json.dumps(profile)
-            )
+        """Cache merchant profiles in process memory and Redis."""
+        profile = await self.db.merchants.find_one({"merchant_id": merchant_id}, {"_id": 0})
         return profile
 
     async def process_rule_based_patterns(self, transactions: List[Dict]) -> List[Dict]:
@@ -303,14 +339,10 @@ class RiskCalculatorService:
 
         return events
 
-    async def cache_risk_metrics(self, merchant_id: str, risk_metrics: Dict):
-        """Cache risk metrics in Redis."""
-        cache_key = f"risk_metrics:{merchant_id}"
-        self.redis_client.setex(
-            cache_key,
-            self.cache_ttl['risk_metrics'],
-            json.dumps(risk_metrics)
-        )
+    async def cache_risk_metrics(self, merchant_id: str, risk_metrics: Dict, days: int = 30):
+        """Cache risk metrics in process memory and Redis, keyed by data version and window."""
+        data_version = await cache.data_version(merchant_id)
+        await cache.set("risk_metrics", window_key(merchant_id, data_version, days), risk_metrics)
 
     def _load_pattern_configs(self) -> Dict:
         """Dynamically load risk pattern configurations."""
@@ -342,69 +374,249 @@ class RiskCalculatorService:
             },
         }
 
+    def _analysis_params(self) -> AnalysisParams:
+        """Collect the detector parameters the fused analysis stage needs."""
+        velocity = self.pattern_configs[RiskPatternType.VELOCITY_SPIKE]
+        split = self.pattern_configs[RiskPatternType.SPLIT_TRANSACTIONS]
+        round_amount = self.pattern_configs[RiskPatternType.ROUND_AMOUNT]
+        return AnalysisParams(
+            velocity_window_seconds=velocity.get("time_window_seconds", 3600),
+            velocity_threshold=velocity.get("threshold", 100),
+            split_window_minutes=split.get("time_window_minutes", 30),
+            split_min_transactions=split.get("min_transactions", 3),
+            split_amount_threshold=split.get("amount_threshold", 10000),
+            round_factor=round_amount.get("round_factor", 10),
+        )
+
     async def analyze_merchant_risk(
         self, merchant_id: str, days: int = 30
     ) -> RiskProfileResponse:
-        logger.info(f"Analyzing risk for merchant: {merchant_id}")
         try:
-            end_date = datetime.utcnow()
-            start_date = end_date - timedelta(days=days)
-
-            # Fetch transactions
-            transactions = await self._fetch_transactions(merchant_id, start_date, end_date)
-            if not transactions:
-                logger.warning("No transactions found for merchant.")
-                return self._create_empty_risk_profile(merchant_id)
+            with log_context(merchant_id=merchant_id), ANALYSES_IN_FLIGHT.track_inflight(), \
+                    ANALYSIS_SECONDS.time(self.analysis_mode), memory_profiler.track_analysis(merchant_id):
+                logger.info("Analyzing merchant risk")
+                end_date = datetime.utcnow()
+                start_date = end_date - timedelta(days=days)
+
+                # Read the data version before fetching so results are never cached under a newer one
+                with profile_stage("data_version"):
+                    data_version = await cache.data_version(merchant_id)
+
+                with profile_stage("load_analysis"):
+                    analysis = await self._load_analysis(merchant_id, start_date, end_date, data_version)
+                if analysis is None:
+                    logger.warning("No transactions found for merchant.")
+                    return self._create_empty_risk_profile(merchant_id)
+
+                TRANSACTIONS_SCANNED.observe(analysis.transaction_count)
+                with profile_stage("build_profile"):
+                    return await self._build_risk_profile(merchant_id, analysis, data_version, days)
+        except Exception as e:
+            logger.error("Error analyzing merchant risk: %s", e, exc_info=True, extra={"merchant_id": merchant_id})
+            raise
 
-            detected_patterns, risk_factors = [], []
+    async def _build_risk_profile(
+        self, merchant_id: str, analysis: WindowAnalysis, data_version: int, days: int
+    ) -> RiskProfileResponse:
+        """Run the detectors on a window analysis and score the merchant."""
+        detected_patterns, risk_factors = [], []
 
-            # Create RiskAnalysisContext
-            context = RiskAnalysisContext(
-                merchant_id=merchant_id,
-                analysis_window=timedelta(days=days),
-                # Add more context if needed
-            )
-            advanced_calculator = AdvancedRiskCalculator(context)
-
-            # Analyze patterns
-            for pattern_type, config in self.pattern_configs.items():
-                logger.info(f"Detecting pattern: {pattern_type}")
-                pattern = await self._detect_pattern_with_cache(transactions, pattern_type, config)
-                if pattern:
-                    detected_patterns.append(pattern)
-                    risk_factors.append(pattern.name)
-
-            # Calculate comprehensive risk
-            risk_score = await self.calculate_comprehensive_risk(detected_patterns)
-            logger.info(f"Overall risk score for merchant {merchant_id}: {risk_score*100}")
-
-            # Generate timeline events
-            timeline_generator = TimelineGenerator()
+        # Create RiskAnalysisContext
+        context = RiskAnalysisContext(
+            merchant_id=merchant_id,
+            analysis_window=timedelta(days=days),
+            # Add more context if needed
+        )
+        advanced_calculator = AdvancedRiskCalculator(context)
+
+        # Analyze patterns concurrently with one batched cache read and write
+        with profile_stage("detect_patterns"):
+            for pattern in await self._detect_patterns_with_cache(analysis, data_version, days):
+                detected_patterns.append(pattern)
+                risk_factors.append(pattern.name)
+
+        # Calculate comprehensive risk
+        with profile_stage("risk_score"):
+            risk_score = await advanced_calculator.calculate_comprehensive_risk(detected_patterns)
+        logger.info("Overall risk score %.2f", risk_score * 100, extra={"merchant_id": merchant_id})
+
+        # Generate timeline events
+        timeline_generator = TimelineGenerator()
+        with profile_stage("timeline"):
             timeline_events = await timeline_generator.generate_events(
                 merchant_id,
                 {"risk_score": risk_score * 100, "risk_factors": risk_factors},
-                daily_summaries
+                days=days
             )
 
-            return RiskProfileResponse(
-                merchant_id=merchant_id,
-                overall_risk_score=risk_score * 100,  # Scaling to 0-100
-                detected_patterns=detected_patterns,
-                last_updated=datetime.utcnow(),
-                risk_factors=risk_factors,
-                monitoring_status=self.categorize_risk(risk_score),
-                review_required=risk_score * 100 > 70,
+        return RiskProfileResponse(
+            merchant_id=merchant_id,
+            overall_risk_score=risk_score * 100,  # Scaling to 0-100
+            detected_patterns=detected_patterns,
+            last_updated=datetime.utcnow(),
+            risk_factors=risk_factors,
+            monitoring_status=self.categorize_risk(risk_score),
+            review_required=risk_score * 100 > 70,
+        )
+
+    async def analyze_merchants_risk(
+        self, merchant_ids: List[str], days: int = 30, concurrency: int = 8
+    ) -> AsyncIterator[Tuple[str, Union[RiskProfileResponse, Exception]]]:
+        """
+        Analyze many merchants with a single streamed database query.
+
+        In columnar mode windows are fetched with one `$in` query sorted by
+        merchant, so each merchant's analysis starts as soon as its rows have
+        streamed past while the rest are still arriving. The incremental and
+        aggregation modes read each merchant through the same path as
+        analyze_merchant_risk. At most `concurrency` analyses run at once.
+
+        Args:
+            merchant_ids: Merchants to analyze; duplicates are ignored.
+            days: Analysis window in days.
+            concurrency: Maximum number of concurrent analyses.
+
+        Yields:
+            (merchant_id, profile) in completion order, or (merchant_id, exception)
+            for merchants whose analysis failed.
+        """
+        merchant_ids = list(dict.fromkeys(merchant_ids))
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(days=days)
+        data_versions = await cache.data_versions(merchant_ids)
+        params = self._analysis_params()
+        semaphore = asyncio.Semaphore(concurrency)
+        results: asyncio.Queue = asyncio.Queue()
+        tasks = []
+
+        async def analyze_one(merchant_id: str, columns: Optional[Tuple[List, List, List]]):
+            async with semaphore:
+                try:
+                    if self.analysis_mode != AnalysisMode.COLUMNAR:
+                        analysis = await self._load_analysis(
+                            merchant_id, start_date, end_date, data_versions[merchant_id]
+                        )
+                    elif columns:
+                        window = TransactionWindow.from_columns(merchant_id, *columns)
+                        analysis = await self.executor.analyze(window, params)
+                    else:
+                        analysis = None
+
+                    if analysis is None:
+                        result = self._create_empty_risk_profile(merchant_id)
+                    else:
+                        TRANSACTIONS_SCANNED.observe(analysis.transaction_count)
+                        result = await self._build_risk_profile(
+                            merchant_id, analysis, data_versions[merchant_id], days
+                        )
+                except Exception as e:
+                    logger.error(
+                        "Error analyzing merchant risk: %s", e, exc_info=True, extra={"merchant_id": merchant_id}
+                    )
+                    result = e
+            await results.put((merchant_id, result))
+
+        async def fetch_windows():
+            dispatched = set()
+            if self.analysis_mode != AnalysisMode.COLUMNAR:
+                # These modes load each merchant themselves; nothing to stream
+                for merchant_id in merchant_ids:
+                    tasks.append(asyncio.create_task(analyze_one(merchant_id, None)))
+                return
+            try:
+                cursor = db.transaction_collection.find(
+                    {"merchant_id": {"$in": merchant_ids}, "timestamp": {"$gte": start_date, "$lte": end_date}},
+                    projection(("merchant_id",) + WINDOW_FIELDS)
+                ).sort([("merchant_id", 1), ("timestamp", 1)])
+                current, columns = None, None
+                async for txn in cursor:
+                    if txn['merchant_id'] != current:
+                        if current is not None:
+                            tasks.append(asyncio.create_task(analyze_one(current, columns)))
+                            dispatched.add(current)
+                        current, columns = txn['merchant_id'], ([], [], [])
+                    columns[0].append(txn['timestamp'])
+                    columns[1].append(txn['amount'])
+                    columns[2].append(txn['customer_id'])
+                if current is not None:
+                    tasks.append(asyncio.create_task(analyze_one(current, columns)))
+                    dispatched.add(current)
+                for merchant_id in merchant_ids:
+                    if merchant_id not in dispatched:
+                        tasks.append(asyncio.create_task(analyze_one(merchant_id, None)))
+                        dispatched.add(merchant_id)
+            except Exception as e:
+                logger.error("Error fetching batch transaction windows: %s", e, exc_info=True)
+                for merchant_id in merchant_ids:
+                    if merchant_id not in dispatched:
+                        await results.put((merchant_id, e))
+
+        fetch_task = asyncio.create_task(fetch_windows())
+        try:
+            for _ in range(len(merchant_ids)):
+                yield await results.get()
+        finally:
+            fetch_task.cancel()
+            for task in tasks:
+                task.cancel()
+
+    async def _load_analysis(
+        self, merchant_id: str, start_date: datetime, end_date: datetime, data_version: int
+    ) -> Optional[WindowAnalysis]:
+        """Produce the shared detector input for the window, or None if it has no transactions."""
+        if self.analysis_mode == AnalysisMode.INCREMENTAL:
+            return await self._load_incremental_analysis(merchant_id, start_date, end_date, data_version)
+        if self.analysis_mode == AnalysisMode.AGGREGATION:
+            analysis = await load_aggregated_analysis(
+                db.transaction_collection, merchant_id, start_date, end_date, self._analysis_params()
             )
-        except Exception as e:
-            logger.error(f"Error analyzing risk for merchant {merchant_id}: {e}", exc_info=True)
-            raise
+            return analysis if analysis.transaction_count else None
+
+        with profile_stage("fetch"):
+            transactions = await self._fetch_transactions(merchant_id, start_date, end_date)
+        if not transactions:
+            return None
+
+        # Sort and scan the window once, off the event loop; detectors only read the shared analysis
+        with profile_stage("build_window"):
+            window = await self.executor.build_window(merchant_id, transactions)
+        with profile_stage("analyze_window"):
+            return await self.executor.analyze(window, self._analysis_params())
+
+    async def _load_incremental_analysis(
+        self, merchant_id: str, start_date: datetime, end_date: datetime, data_version: int
+    ) -> Optional[WindowAnalysis]:
+        """Read the merchant's rolling state, seeding it from one window fetch when missing or stale."""
+        window_seconds = int((end_date - start_date).total_seconds())
+        state = rolling_state_store.get(merchant_id, window_seconds, data_version)
+        if state is None:
+            logger.info("Seeding rolling risk state", extra={"merchant_id": merchant_id})
+            # Transactions ingested while the window is fetched are buffered and replayed
+            buffer = rolling_state_store.begin_seed(merchant_id)
+            try:
+                transactions = await self._fetch_transactions(
+                    merchant_id, start_date, end_date, WINDOW_FIELDS + ("transaction_id",)
+                )
+                window = await self.executor.build_window(merchant_id, transactions)
+                state = await self.executor.run(
+                    len(window), MerchantRollingState.from_window,
+                    window, self._analysis_params(), window_seconds, data_version
+                )
+            except BaseException:
+                rolling_state_store.abandon_seed(merchant_id, buffer)
+                raise
+            rolling_state_store.finish_seed(state, buffer, (txn.get("transaction_id") for txn in transactions))
+
+        analysis = state.to_analysis(to_epoch_seconds(end_date))
+        return analysis if analysis.transaction_count else None
 
     async def _fetch_transactions(
-        self, merchant_id: str, start_date: datetime, end_date: datetime
+        self, merchant_id: str, start_date: datetime, end_date: datetime, fields: Tuple[str, ...] = WINDOW_FIELDS
     ) -> List[Dict]:
-        """Fetch transactions from the database."""
+        """Fetch the window's transactions, projected to the fields the detectors read."""
         return await db.transaction_collection.find(
-            {"merchant_id": merchant_id, "timestamp": {"$gte": start_date, "$lte": end_date}}
+            {"merchant_id": merchant_id, "timestamp": {"$gte": start_date, "$lte": end_date}},
+            projection(fields)
         ).to_list(None)
 
     def _create_empty_risk_profile(self, merchant_id: str) -> RiskProfileResponse:
@@ -419,22 +631,22 @@ class RiskCalculatorService:
             review_required=False,
         )
 
-    def categorize_risk(self, risk_score: float) -> str:
+    def categorize_risk(self, risk_score: float) -> RiskStatus:
         """Categorize merchant based on risk score."""
         if risk_score > 0.7:
-            return "HIGH_RISK"
+            return RiskStatus.HIGH
         elif risk_score > 0.4:
-            return "MEDIUM_RISK"
-        return "LOW_RISK"
+            return RiskStatus.MEDIUM
+        return RiskStatus.LOW
 
     async def _detect_pattern(
-        self, transactions: List[Dict], pattern_type: RiskPatternType, config: Dict
+        self, analysis: WindowAnalysis, pattern_type: RiskPatternType, config: Dict
     ) -> Optional[RiskPattern]:
         """Detect a specific risk pattern."""
-        if not transactions:
+        if not analysis.transaction_count:
             return None
 
-        pattern_detectors: Dict[RiskPatternType, Callable[[List[Dict], Dict], Optional[RiskPattern]]] = {
+        pattern_detectors: Dict[RiskPatternType, Callable[[WindowAnalysis, Dict], Optional[RiskPattern]]] = {
             RiskPatternType.LATE_NIGHT: self._detect_late_night_pattern,
             RiskPatternType.VELOCITY_SPIKE: self._detect_velocity_spike,
             RiskPatternType.SPLIT_TRANSACTIONS: self._detect_split_transactions,
@@ -444,21 +656,22 @@ class RiskCalculatorService:
 
         detector = pattern_detectors.get(pattern_type)
         if detector:
-            return await detector(transactions, config)
+            with profile_stage(pattern_type.value):
+                return await detector(analysis, config)
         return None
 
     # Example pattern detection methods
-    async def _detect_late_night_pattern(self, transactions: List[Dict], config: Dict) -> Optional[RiskPattern]:
+    async def _detect_late_night_pattern(self, analysis: WindowAnalysis, config: Dict) -> Optional[RiskPattern]:
         """Detect late-night trading patterns."""
-        logger.info("Detecting Late Night pattern.")
-        time_window = config.get("time_window", "23:00-04:00")
-        start_hour, end_hour = map(int, time_window.replace(":", "").split("-"))
-        count = sum(1 for txn in transactions if start_hour <= txn['timestamp'].hour or txn['timestamp'].hour < end_hour)
-        if count >= config.get("threshold", 50):
+        logger.debug("Detecting Late Night pattern.", extra=HOT_PATH)
+        threshold = config.get("threshold", 50)
+        start_hour, end_hour = parse_hour_window(config.get("time_window", "23:00-04:00"))
+        count = count_hours(analysis.hour_histogram, start_hour, end_hour)
+        if count >= threshold:
             return RiskPattern(
-                pattern_id=f"pattern_{pattern_type.value}",
-                name=pattern_type.value,
-                confidence_score=count / config["threshold"],
+                pattern_id=f"pattern_{RiskPatternType.LATE_NIGHT.value}",
+                name=RiskPatternType.LATE_NIGHT.value,
+                confidence_score=min(1.0, count / threshold),
                 characteristics=config,
                 red_flags=[f"{count} transactions during late-night hours."],
                 created_at=datetime.utcnow(),
@@ -466,25 +679,16 @@ class RiskCalculatorService:
             )
         return None
 
-    async def _detect_velocity_spike(self, transactions: List[Dict], config: Dict) -> Optional[RiskPattern]:
+    async def _detect_velocity_spike(self, analysis: WindowAnalysis, config: Dict) -> Optional[RiskPattern]:
         """Detect velocity spike patterns."""
-        logger.info("Detecting Velocity Spike pattern.")
+        logger.debug("Detecting Velocity Spike pattern.", extra=HOT_PATH)
         threshold = config.get("threshold", 100)
-        time_window_seconds = config.get("time_window_seconds", 3600)
-        transaction_times = sorted(txn['timestamp'] for txn in transactions)
-        spike_count = 0
-        window_start = 0
-        for window_end in range(len(transaction_times)):
-            while (transaction_times[window_end] - transaction_times[window_start]).total_seconds() > time_window_seconds:
-                window_start += 1
-            window_size = window_end - window_start + 1
-            if window_size >= threshold:
-                spike_count += 1
+        spike_count = analysis.velocity_spike_count
         if spike_count > 0:
             return RiskPattern(
                 pattern_id="pattern_velocity_spike",
                 name=RiskPatternType.VELOCITY_SPIKE.value,
-                confidence_score=spike_count / threshold,
+                confidence_score=min(1.0, spike_count / threshold),
                 characteristics=config,
                 red_flags=[f"{spike_count} velocity spikes detected."],
                 created_at=datetime.utcnow(),
@@ -492,86 +696,70 @@ class RiskCalculatorService:
             )
         return None
 
-    async def _detect_split_transactions(self, transactions: List[Dict], config: Dict) -> Optional[RiskPattern]:
-        """Enhanced split transaction detection with temporal clustering."""
-        time_window = config.get('time_window_minutes', 30)
+    async def _detect_split_transactions(self, analysis: WindowAnalysis, config: Dict) -> Optional[RiskPattern]:
+        """
+        Enhanced split transaction detection with temporal clustering.
+
+        Confidence is the share of the window's transactions that sit in
+        suspicious clusters. It ignores clusters below the amount threshold,
+        which aggregation mode never materialises, so every analysis mode
+        scores the same data the same way.
+        """
         amount_threshold = config.get('amount_threshold', 10000)
-        min_transactions = config.get('min_transactions', 3)
-        
-        # Sort transactions by timestamp
-        sorted_txns = sorted(transactions, key=lambda x: x['timestamp'])
-        clusters = []
-        current_cluster = []
-        
-        for txn in sorted_txns:
-            if not current_cluster:
-                current_cluster.append(txn)
-            else:
-                time_diff = (txn['timestamp'] - current_cluster[-1]['timestamp']).total_seconds() / 60
-                if time_diff <= time_window:
-                    current_cluster.append(txn)
-                else:
-                    if len(current_cluster) >= min_transactions:
-                        clusters.append(current_cluster)
-                    current_cluster = [txn]
-        
-        if len(current_cluster) >= min_transactions:
-            clusters.append(current_cluster)
-        
-        suspicious_clusters = []
-        for cluster in clusters:
-            total_amount = sum(t['amount'] for t in cluster)
-            if total_amount >= amount_threshold:
-                suspicious_clusters.append(cluster)
-        
-        if suspicious_clusters:
+        cluster_sizes, cluster_totals = analysis.cluster_sizes, analysis.cluster_totals
+        suspicious = cluster_totals >= amount_threshold
+        suspicious_count = int(np.count_nonzero(suspicious))
+
+        if suspicious_count:
+            average_cluster_size = float(cluster_sizes[suspicious].mean())
+            clustered = int(cluster_sizes[suspicious].sum())
             return RiskPattern(
                 pattern_id=f"pattern_split_transactions_{uuid.uuid4().hex[:8]}",
                 name=RiskPatternType.SPLIT_TRANSACTIONS.value,
-                confidence_score=len(suspicious_clusters) / len(clusters),
+                confidence_score=min(1.0, clustered / max(analysis.transaction_count, 1)),
                 characteristics={
-                    "cluster_count": len(suspicious_clusters),
-                    "average_cluster_size": sum(len(c) for c in suspicious_clusters) / len(suspicious_clusters),
-                    "total_amount": sum(sum(t['amount'] for t in c) for c in suspicious_clusters)
+                    "cluster_count": suspicious_count,
+                    "average_cluster_size": average_cluster_size,
+                    "total_amount": float(cluster_totals[suspicious].sum())
                 },
                 red_flags=[
-                    f"Found {len(suspicious_clusters)} suspicious transaction clusters",
-                    f"Average cluster size: {sum(len(c) for c in suspicious_clusters) / len(suspicious_clusters):.1f} transactions"
+                    f"Found {suspicious_count} suspicious transaction clusters",
+                    f"Average cluster size: {average_cluster_size:.1f} transactions"
                 ]
             )
         return None
 
-    async def _detect_round_amount_pattern(self, transactions: List[Dict], config: Dict) -> Optional[RiskPattern]:
+    async def _detect_round_amount_pattern(self, analysis: WindowAnalysis, config: Dict) -> Optional[RiskPattern]:
         """Detect Round Amount patterns."""
-        logger.info("Detecting Round Amount pattern.")
+        logger.debug("Detecting Round Amount pattern.", extra=HOT_PATH)
         round_factor = config.get("round_factor", 10)
         min_round_transactions = config.get("min_round_transactions", 5)
-        round_transactions = [txn for txn in transactions if txn['amount'] % round_factor == 0]
-        if len(round_transactions) >= min_round_transactions:
-            confidence = len(round_transactions) / min_round_transactions
+        round_count = analysis.round_count
+        if round_count >= min_round_transactions:
+            confidence = min(1.0, round_count / min_round_transactions)
             return RiskPattern(
                 pattern_id="pattern_round_amount",
                 name=RiskPatternType.ROUND_AMOUNT.value,
                 confidence_score=confidence,
                 characteristics=config,
-                red_flags=[f"{len(round_transactions)} transactions with amounts divisible by {round_factor}."],
+                red_flags=[f"{round_count} transactions with amounts divisible by {round_factor}."],
                 created_at=datetime.utcnow(),
                 updated_at=datetime.utcnow(),
             )
         return None
 
-    async def _detect_customer_concentration(self, transactions: List[Dict], config: Dict) -> Optional[RiskPattern]:
+    async def _detect_customer_concentration(self, analysis: WindowAnalysis, config: Dict) -> Optional[RiskPattern]:
         """Detect Customer Concentration patterns."""
-        logger.info("Detecting Customer Concentration pattern.")
+        logger.debug("Detecting Customer Concentration pattern.", extra=HOT_PATH)
         customer_threshold = config.get("customer_threshold", 50)
-        customer_counts = Counter(txn['customer_id'] for txn in transactions)
-        concentrated_customers = [customer for customer, count in customer_counts.items() if count >= customer_threshold]
-        if concentrated_customers:
+        customer_counts = analysis.customer_counts
+        concentrated = np.flatnonzero(customer_counts >= customer_threshold)
+        if len(concentrated):
             red_flags = [
-                f"Customer {customer} has {customer_counts[customer]} transactions."
-                for customer in concentrated_customers
+                f"Customer {analysis.customer_ids[code]} has {customer_counts[code]} transactions."
+                for code in concentrated
             ]
-            confidence = len(concentrated_customers) / customer_threshold
+            confidence = min(1.0, len(concentrated) / customer_threshold)
             return RiskPattern(
                 pattern_id="pattern_customer_concentration",
                 name=RiskPatternType.CUSTOMER_CONCENTRATION.value,
@@ -0,0 +1,166 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import asyncio
+import heapq
+import logging
+import time
+
+from src.models.risk_profile import RiskProfileResponse
+from src.repositories.risk_profile_repo import RiskProfileRepository
+from src.services.risk_calculator import RiskCalculatorService
+
+logger = logging.getLogger("RiskProfileWorker")
+
+
+@dataclass
+class _DirtyMerchant:
+    dirty_since: float  # monotonic time of the first unprocessed transaction
+    attempts: int = 0
+
+
+class RiskProfileWorker:
+    """
+    Recomputes risk profiles in the background for merchants with new transactions.
+
+    Ingest marks merchants dirty; the worker waits `debounce_seconds` so a burst
+    of transactions costs one recomputation, then analyses up to `concurrency`
+    merchants at a time and persists the profiles through
+    `RiskProfileRepository.save_risk_profile`. Risk profile reads are then a
+    single indexed document fetch.
+
+    Dirty merchants are taken in order of `staleness * (1 + risk / 100)`: the
+    longest-waiting first, with merchants last scored as risky ageing up to
+    twice as fast. The dirty set lives in this process, so each API worker
+    refreshes the merchants whose transactions it ingested.
+    """
+    def __init__(
+        self,
+        calculator: Optional[RiskCalculatorService] = None,
+        repository: Optional[RiskProfileRepository] = None,
+        concurrency: int = 4,
+        debounce_seconds: float = 5.0,
+        max_attempts: int = 3,
+        max_scored_merchants: int = 50000
+    ):
+        self.calculator = calculator or RiskCalculatorService.from_settings()
+        self.repository = repository or RiskProfileRepository()
+        self.concurrency = concurrency
+        self.debounce_seconds = debounce_seconds
+        self.max_attempts = max_attempts
+        self._dirty: Dict[str, _DirtyMerchant] = {}
+        self.max_scored_merchants = max_scored_merchants
+        # Last risk score per merchant, bounded by least-recently-refreshed eviction
+        self._risk_scores: "OrderedDict[str, float]" = OrderedDict()
+        self._computing: Dict[str, asyncio.Future] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def mark_dirty(self, *merchant_ids: str) -> None:
+        """Queue merchants for recomputation; already-queued merchants keep their place."""
+        now = time.monotonic()
+        for merchant_id in merchant_ids:
+            if merchant_id not in self._dirty:
+                self._dirty[merchant_id] = _DirtyMerchant(dirty_since=now)
+        if merchant_ids:
+            self._wakeup.set()
+
+    def priority(self, merchant_id: str, now: float) -> float:
+        staleness = now - self._dirty[merchant_id].dirty_since
+        return staleness * (1 + self._risk_scores.get(merchant_id, 0.0) / 100)
+
+    def next_batch(self, size: int) -> List[str]:
+        """Pick the `size` highest-priority dirty merchants."""
+        now = time.monotonic()
+        return heapq.nlargest(size, self._dirty, key=lambda merchant_id: self.priority(merchant_id, now))
+
+    async def refresh(self, merchant_id: str) -> bool:
+        """Recompute and persist one merchant's profile; failures are requeued up to `max_attempts`."""
+        entry = self._dirty.pop(merchant_id)
+        try:
+            await self._compute(merchant_id)
+            return True
+        except Exception as e:
+            entry.attempts += 1
+            if entry.attempts < self.max_attempts:
+                logger.warning(
+                    "Risk profile refresh failed, will retry: %s", e, extra={"merchant_id": merchant_id}
+                )
+                # Keep the original dirty time, unless new transactions already requeued it
+                self._dirty.setdefault(merchant_id, entry)
+                self._wakeup.set()
+            else:
+                logger.error("Giving up on risk profile refresh: %s", e, extra={"merchant_id": merchant_id})
+            return False
+
+    async def compute_now(self, merchant_id: str) -> RiskProfileResponse:
+        """
+        Compute, persist and return a merchant's profile without waiting for the queue.
+
+        Used when a read finds no precomputed profile, e.g. for merchants with
+        history from before the worker ran. Concurrent calls for the same
+        merchant share one computation.
+        """
+        future = self._computing.get(merchant_id)
+        if future is None:
+            future = self._computing[merchant_id] = asyncio.ensure_future(self._compute(merchant_id))
+            future.add_done_callback(lambda _: self._computing.pop(merchant_id, None))
+        return await asyncio.shield(future)
+
+    async def _compute(self, merchant_id: str) -> RiskProfileResponse:
+        profile = await self.calculator.analyze_merchant_risk(merchant_id)
+        await self.repository.save_risk_profile(profile)
+        self._risk_scores[merchant_id] = profile.overall_risk_score
+        self._risk_scores.move_to_end(merchant_id)
+        if len(self._risk_scores) > self.max_scored_merchants:
+            self._risk_scores.popitem(last=False)
+        return profile
+
+    async def drain(self) -> int:
+        """
+        Refresh the currently dirty merchants, `concurrency` at a time.
+
+        Failed merchants are retried on the next wakeup rather than within
+        this pass.
+
+        Returns:
+            Number of profiles refreshed.
+        """
+        refreshed, remaining = 0, len(self._dirty)
+        while self._dirty and remaining > 0:
+            batch = self.next_batch(min(self.concurrency, remaining))
+            remaining -= len(batch)
+            refreshed += sum(await asyncio.gather(*(self.refresh(merchant_id) for merchant_id in batch)))
+        return refreshed
+
+    async def run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            # Let ingest bursts coalesce before recomputing
+            await asyncio.sleep(self.debounce_seconds)
+            self._wakeup.clear()
+            try:
+                refreshed = await self.drain()
+                logger.info("Refreshed %d risk profiles", refreshed)
+            except Exception as e:
+                logger.error(f"Risk profile worker iteration failed: {e}", exc_info=True)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def __len__(self) -> int:
+        return len(self._dirty)
+
+
+# Shared worker for this API process
+risk_profile_worker = RiskProfileWorker()
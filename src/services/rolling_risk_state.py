@@ -0,0 +1,249 @@
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from src.services.pattern_engine import AnalysisParams, TransactionWindow, WindowAnalysis, sort_window
+
+logger = logging.getLogger("RollingRiskState")
+
+
+@dataclass
+class HourBucket:
+    """Aggregates for one clock hour of a merchant's transactions."""
+    count: int = 0
+    round_count: int = 0
+    velocity_hits: int = 0
+    customers: Counter = field(default_factory=Counter)
+    clusters: List[Tuple[int, float]] = field(default_factory=list)  # closed split clusters (size, total)
+
+
+class MerchantRollingState:
+    """
+    Rolling detector aggregates for one merchant, updated per transaction.
+
+    Transactions must arrive in timestamp order. A transaction older than the
+    newest one seen marks the state stale so the next evaluation rebuilds it
+    from the database. Velocity hits and split clusters are attributed to the
+    hour of the transaction that completed them, so at the trailing edge of
+    the window they can differ slightly from a full rescan.
+
+    `data_version` is the merchant's cache data version the state reflects;
+    a different current version means another worker ingested transactions
+    this state never saw.
+    """
+    def __init__(self, merchant_id: str, params: AnalysisParams, window_seconds: int, data_version: int = 0):
+        self.merchant_id = merchant_id
+        self.params = params
+        self.window_seconds = window_seconds
+        self.data_version = data_version
+        self.buckets: "OrderedDict[int, HourBucket]" = OrderedDict()
+        self.recent: deque = deque()  # timestamps inside the velocity window
+        self.open_cluster: Optional[List] = None  # [last_timestamp, size, total]
+        self.latest: Optional[int] = None
+        self.stale = False
+
+    def add(self, timestamp: int, amount: float, customer_id: str) -> None:
+        """Fold one transaction (epoch seconds) into the rolling aggregates."""
+        if self.latest is not None and timestamp < self.latest:
+            self.stale = True
+            return
+        self.latest = timestamp
+
+        bucket_key = timestamp // 3600
+        bucket = self.buckets.get(bucket_key)
+        if bucket is None:
+            bucket = self.buckets[bucket_key] = HourBucket()
+        bucket.count += 1
+        bucket.customers[customer_id] += 1
+        if amount % self.params.round_factor == 0:
+            bucket.round_count += 1
+
+        # Trailing velocity window, same rule as the two-pointer scan
+        self.recent.append(timestamp)
+        while self.recent[0] < timestamp - self.params.velocity_window_seconds:
+            self.recent.popleft()
+        if len(self.recent) >= self.params.velocity_threshold:
+            bucket.velocity_hits += 1
+
+        # Split clusters close when the gap exceeds the split window
+        cluster = self.open_cluster
+        if cluster and timestamp - cluster[0] <= self.params.split_window_minutes * 60:
+            cluster[0], cluster[1], cluster[2] = timestamp, cluster[1] + 1, cluster[2] + amount
+        else:
+            self._close_cluster()
+            self.open_cluster = [timestamp, 1, amount]
+
+        self.evict(timestamp)
+
+    def _close_cluster(self) -> None:
+        cluster = self.open_cluster
+        if cluster and cluster[1] >= self.params.split_min_transactions:
+            bucket = self.buckets.get(cluster[0] // 3600)
+            if bucket is not None:
+                bucket.clusters.append((cluster[1], cluster[2]))
+        self.open_cluster = None
+
+    def evict(self, now: int) -> None:
+        """Drop hour buckets that have slid out of the window."""
+        oldest_key = (now - self.window_seconds) // 3600
+        while self.buckets and next(iter(self.buckets)) < oldest_key:
+            self.buckets.popitem(last=False)
+
+    def to_analysis(self, now: int) -> WindowAnalysis:
+        """
+        Build the detector input from the buckets in O(buckets).
+
+        Args:
+            now: Current time in epoch seconds, used to slide the window.
+
+        Returns:
+            WindowAnalysis equivalent to analysing the raw window.
+        """
+        self.evict(now)
+        hour_histogram = np.zeros(24, dtype=np.int64)
+        customers: Counter = Counter()
+        round_count = velocity_hits = 0
+        clusters: List[Tuple[int, float]] = []
+        for bucket_key, bucket in self.buckets.items():
+            hour_histogram[bucket_key % 24] += bucket.count
+            round_count += bucket.round_count
+            velocity_hits += bucket.velocity_hits
+            customers.update(bucket.customers)
+            clusters.extend(bucket.clusters)
+
+        cluster = self.open_cluster
+        if cluster and cluster[1] >= self.params.split_min_transactions and cluster[0] // 3600 in self.buckets:
+            clusters.append((cluster[1], cluster[2]))
+
+        return WindowAnalysis(
+            merchant_id=self.merchant_id,
+            transaction_count=int(hour_histogram.sum()),
+            hour_histogram=hour_histogram,
+            round_count=round_count,
+            customer_ids=np.array(list(customers.keys()), dtype=object),
+            customer_counts=np.array(list(customers.values()), dtype=np.int64),
+            velocity_spike_count=velocity_hits,
+            cluster_sizes=np.array([size for size, _ in clusters], dtype=np.int64),
+            cluster_totals=np.array([total for _, total in clusters], dtype=np.float64),
+        )
+
+    @classmethod
+    def from_window(
+        cls, window: TransactionWindow, params: AnalysisParams, window_seconds: int, data_version: int = 0
+    ) -> "MerchantRollingState":
+        """Seed the rolling state from a fetched window (one pass, in timestamp order)."""
+        state = cls(window.merchant_id, params, window_seconds, data_version)
+        ordered = sort_window(window)
+        customer_ids = ordered.customer_ids
+        for timestamp, amount, code in zip(
+            ordered.timestamps.tolist(), ordered.amounts.tolist(), ordered.customer_codes.tolist()
+        ):
+            state.add(timestamp, amount, customer_ids[code])
+        return state
+
+
+class RollingStateStore:
+    """
+    Per-merchant rolling states, bounded by least-recently-used eviction.
+
+    Only merchants that have been evaluated in incremental mode hold state;
+    ingest for any other merchant is a dictionary miss. While a merchant's
+    state is being seeded, ingested transactions are buffered and replayed
+    onto the seeded state, skipping those the seed fetch already returned.
+    """
+    def __init__(self, max_merchants: int = 10000):
+        self.max_merchants = max_merchants
+        self._states: "OrderedDict[str, MerchantRollingState]" = OrderedDict()
+        self._seeding: Dict[str, List[List[Tuple]]] = {}
+
+    def get(self, merchant_id: str, window_seconds: int, data_version: int) -> Optional[MerchantRollingState]:
+        """Return a usable state for the merchant, window and data version, or None if it must be (re)built."""
+        state = self._states.get(merchant_id)
+        if state is None or state.stale or state.window_seconds != window_seconds:
+            return None
+        if state.data_version != data_version:
+            # Transactions were ingested by another worker since the state was seeded
+            state.stale = True
+            return None
+        self._states.move_to_end(merchant_id)
+        return state
+
+    def put(self, state: MerchantRollingState) -> None:
+        self._states[state.merchant_id] = state
+        self._states.move_to_end(state.merchant_id)
+        while len(self._states) > self.max_merchants:
+            self._states.popitem(last=False)
+
+    def begin_seed(self, merchant_id: str) -> List[Tuple]:
+        """
+        Start buffering the merchant's ingested transactions; call before the seed fetch.
+
+        Returns:
+            The buffer to hand to finish_seed or abandon_seed.
+        """
+        buffer: List[Tuple] = []
+        self._seeding.setdefault(merchant_id, []).append(buffer)
+        return buffer
+
+    def _stop_buffering(self, merchant_id: str, buffer: List[Tuple]) -> None:
+        buffers = [pending for pending in self._seeding.get(merchant_id, ()) if pending is not buffer]
+        if buffers:
+            self._seeding[merchant_id] = buffers
+        else:
+            self._seeding.pop(merchant_id, None)
+
+    def finish_seed(
+        self, state: MerchantRollingState, buffer: List[Tuple], seeded_ids: Iterable[str]
+    ) -> None:
+        """
+        Replay transactions buffered during the seed onto the state and store it.
+
+        Args:
+            state: State seeded from the fetched window.
+            buffer: Buffer returned by begin_seed.
+            seeded_ids: transaction_ids the seed fetch returned; these are not applied twice.
+        """
+        self._stop_buffering(state.merchant_id, buffer)
+        applied = set(seeded_ids)
+        for timestamp, amount, customer_id, transaction_id, data_version in sorted(buffer, key=lambda entry: entry[0]):
+            if transaction_id not in applied:
+                applied.add(transaction_id)
+                state.add(timestamp, amount, customer_id)
+            state.data_version = max(state.data_version, data_version)
+        self.put(state)
+
+    def abandon_seed(self, merchant_id: str, buffer: List[Tuple]) -> None:
+        """Stop buffering for a seed that failed."""
+        self._stop_buffering(merchant_id, buffer)
+
+    def record(
+        self,
+        merchant_id: str,
+        timestamp: int,
+        amount: float,
+        customer_id: str,
+        transaction_id: str,
+        data_version: int
+    ) -> None:
+        """
+        Apply an ingested transaction to the merchant's state, if one is being kept.
+
+        Args:
+            data_version: The merchant's data version after this transaction's ingest.
+        """
+        for buffer in self._seeding.get(merchant_id, ()):
+            buffer.append((timestamp, amount, customer_id, transaction_id, data_version))
+        state = self._states.get(merchant_id)
+        if state is not None:
+            state.add(timestamp, amount, customer_id)
+            state.data_version = max(state.data_version, data_version)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+# Shared rolling state for this worker
+rolling_state_store = RollingStateStore()
@@ -1,27 +1,40 @@
-from datetime import datetime
-from typing import List, Dict
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional
+from pymongo import UpdateOne
 from src.models.timeline_event import TimelineEvent
+from src.models.risk_profile import RiskPatternType
 from src.config.database import db
+from src.utils.cache import cache, window_key
+from src.utils.metrics import TIMELINE_SECONDS, timed
+from src.services.transaction_rollup import TransactionRollup
 import logging
-import redis
-import json
 
 logger = logging.getLogger("TimelineGenerator")
 
 class TimelineGenerator:
-    def __init__(self):
-        self.redis_client = redis.Redis(host='localhost', port=6379, db=0)
-        self.event_cache_ttl = 3600  # 1 hour
+    @timed(TIMELINE_SECONDS, "generate_events")
+    async def generate_events(
+        self, merchant_id: str, risk_profile: Dict, summaries: Optional[Dict] = None, days: int = 30
+    ) -> List[TimelineEvent]:
+        """
+        Generate timeline events based on risk profile and transaction summaries.
 
-    async def generate_events(self, merchant_id: str, risk_profile: Dict, summaries: Dict) -> List[TimelineEvent]:
-        """Generate timeline events based on risk profile and transaction summaries."""
+        Daily summaries for the last `days` days are read from the rollup
+        collection unless `summaries` is given.
+        """
         events = []
-        cache_key = f"timeline_events:{merchant_id}"
+        cache_key = window_key(merchant_id, await cache.data_version(merchant_id), days)
         
         # Check cache first
-        cached_events = self.redis_client.get(cache_key)
+        cached_events = await cache.get("timeline_events", cache_key)
         if cached_events:
-            return [TimelineEvent(**event) for event in json.loads(cached_events)]
+            return [TimelineEvent(**event) for event in cached_events]
+
+        if summaries is None:
+            end_date = datetime.utcnow()
+            summaries = await TransactionRollup().daily_summary(
+                merchant_id, end_date - timedelta(days=days), end_date
+            )
         
         # Generate daily summary events
         for date, summary in summaries.items():
@@ -43,21 +56,78 @@ class TimelineGenerator:
                 timestamp=datetime.utcnow(),
                 description=f"High risk score detected: {risk_profile['risk_score']}",
                 severity="HIGH",
-                metadata={"risk_factors": risk_profile["risk_factors"]}
+                metadata={"risk_factors": risk_profile["risk_factors"], "open": True}
             )
             events.append(event)
         
-        # Cache the events
-        if events:
-            await db.timeline_events.insert_many([event.dict() for event in events])
-            self.redis_client.setex(
-                cache_key,
-                self.event_cache_ttl,
-                json.dumps([event.dict() for event in events])
+        # Persist and cache the events. Every recompute regenerates the daily
+        # summaries, so they are upserted per day rather than inserted again
+        summary_updates = [
+            UpdateOne(
+                {"merchant_id": merchant_id, "event_type": event.event_type, "timestamp": event.timestamp},
+                {"$set": event.dict()},
+                upsert=True
             )
+            for event in events if event.event_type == "DAILY_SUMMARY"
+        ]
+        if summary_updates:
+            await db.timeline_events.bulk_write(summary_updates, ordered=False)
+        await self._record_high_risk_alert(
+            merchant_id, next((event for event in events if event.event_type == "HIGH_RISK_ALERT"), None)
+        )
+        if events:
+            await cache.set("timeline_events", cache_key, [event.dict() for event in events])
         
         return events
 
+    async def _record_high_risk_alert(self, merchant_id: str, alert: Optional[TimelineEvent]) -> None:
+        """
+        Keep one open HIGH_RISK_ALERT per merchant while it stays high risk.
+
+        An alert is inserted when the merchant crosses the threshold; later
+        recomputes leave it alone, and the first recompute below the
+        threshold closes it, so the next crossing raises a new one.
+        """
+        open_alert = {"merchant_id": merchant_id, "event_type": "HIGH_RISK_ALERT", "metadata.open": True}
+        if alert is None:
+            await db.timeline_events.update_many(
+                open_alert, {"$set": {"metadata.open": False, "metadata.resolved_at": datetime.utcnow()}}
+            )
+            return
+        await db.timeline_events.update_one(
+            open_alert,
+            {"$setOnInsert": {
+                "timestamp": alert.timestamp,
+                "description": alert.description,
+                "severity": alert.severity,
+                "metadata.risk_factors": alert.metadata["risk_factors"],
+            }},
+            upsert=True
+        )
+
+    @timed(TIMELINE_SECONDS, "record_velocity_spike")
+    async def record_velocity_spike(
+        self, merchant_id: str, timestamp: datetime, transaction_count: int, window_seconds: int
+    ) -> TimelineEvent:
+        """Record a velocity spike at the moment ingest crosses the threshold."""
+        event = TimelineEvent(
+            merchant_id=merchant_id,
+            event_type="VELOCITY_SPIKE",
+            timestamp=timestamp,
+            description=f"Velocity spike: {transaction_count} transactions within "
+                      f"{window_seconds // 60} minutes",
+            severity="HIGH",
+            metadata={
+                "pattern": RiskPatternType.VELOCITY_SPIKE.value,
+                "transaction_count": transaction_count,
+                "window_seconds": window_seconds
+            }
+        )
+        await db.timeline_events.insert_one(event.dict())
+        logger.info("Velocity spike detected at ingest", extra={"merchant_id": merchant_id})
+        return event
+
+    @timed(TIMELINE_SECONDS, "get_merchant_timeline")
     async def get_merchant_timeline(self, merchant_id: str, start_date: datetime, end_date: datetime) -> List[TimelineEvent]:
         """Retrieve timeline events for a merchant within a date range."""
         events = await db.timeline_events.find({
@@ -0,0 +1,202 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from pymongo import ReplaceOne, UpdateOne
+
+from src.config.database import db
+
+logger = logging.getLogger("TransactionRollup")
+
+# Rollup documents are keyed by merchant and UTC day:
+#
+#   {"_id": "<merchant_id>:<YYYY-MM-DD>", "merchant_id": ..., "date": <midnight>,
+#    "count": n, "total_amount": x,
+#    "hours": {"<hour>": {"count": n, "total_amount": x,
+#                         "categories": {"<category>": {"count": n, "total_amount": x}}}}}
+#
+# so a 30/90/365-day summary reads at most that many small documents.
+
+
+def _utc(timestamp: datetime) -> datetime:
+    """Naive UTC datetime, matching how Mongo stores timestamps."""
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def _category_key(category: Optional[str]) -> str:
+    """Make a category usable as a document field name."""
+    key = str(category or "unknown").replace(".", "_").lstrip("$")
+    return key or "unknown"
+
+
+def _day_start(timestamp: datetime) -> datetime:
+    return datetime(timestamp.year, timestamp.month, timestamp.day)
+
+
+def _rollup_id(merchant_id: str, day: datetime) -> str:
+    return f"{merchant_id}:{day.date().isoformat()}"
+
+
+def rollup_increments(transactions: List[Dict]) -> Dict[Tuple[str, datetime], Dict[str, float]]:
+    """
+    Fold transactions into `$inc` documents, one per merchant and day.
+
+    Returns:
+        Mapping of (merchant_id, day) to the field increments for that rollup.
+    """
+    increments: Dict[Tuple[str, datetime], Dict[str, float]] = defaultdict(lambda: defaultdict(int))
+    for txn in transactions:
+        timestamp = _utc(txn["timestamp"])
+        amount = txn["amount"]
+        hour = f"hours.{timestamp.hour}"
+        category = f"{hour}.categories.{_category_key(txn.get('product_category'))}"
+        fields = increments[(txn["merchant_id"], _day_start(timestamp))]
+        for prefix in ("", f"{hour}.", f"{category}."):
+            fields[f"{prefix}count"] += 1
+            fields[f"{prefix}total_amount"] += amount
+    return increments
+
+
+class TransactionRollup:
+    """Daily/hourly/category rollups of transactions, maintained on ingest."""
+
+    @property
+    def collection(self):
+        return db.transaction_rollup_collection
+
+    async def apply(self, transactions: List[Dict]) -> None:
+        """Add newly stored transactions to their rollups with `$inc` upserts."""
+        updates = [
+            UpdateOne(
+                {"_id": _rollup_id(merchant_id, day)},
+                {
+                    "$inc": dict(fields),
+                    "$setOnInsert": {"merchant_id": merchant_id, "date": day}
+                },
+                upsert=True
+            )
+            for (merchant_id, day), fields in rollup_increments(transactions).items()
+        ]
+        if updates:
+            await self.collection.bulk_write(updates, ordered=False)
+
+    async def backfill(self, merchant_ids: Optional[List[str]] = None, batch_size: int = 500) -> int:
+        """
+        Rebuild rollups from the raw transactions collection.
+
+        Groups are computed server-side and each day's document is replaced
+        whole, so the job is idempotent. Transactions ingested for a day while
+        it is being rebuilt may be missed; run it before enabling ingest or
+        re-run it for the affected merchants.
+
+        Args:
+            merchant_ids: Merchants to rebuild; all merchants when omitted.
+            batch_size: Rollup documents written per bulk write.
+
+        Returns:
+            Number of rollup documents written.
+        """
+        match = {"merchant_id": {"$in": merchant_ids}} if merchant_ids else {}
+        pipeline = [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": {
+                        "merchant_id": "$merchant_id",
+                        "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+                        "hour": {"$hour": "$timestamp"},
+                        "category": "$product_category"
+                    },
+                    "count": {"$sum": 1},
+                    "total_amount": {"$sum": "$amount"}
+                }
+            },
+            {"$sort": {"_id.merchant_id": 1, "_id.day": 1}}
+        ]
+
+        written, batch = 0, []
+        current_id, current = None, None
+        async for group in db.transaction_collection.aggregate(pipeline, allowDiskUse=True):
+            key = group["_id"]
+            rollup_id = f"{key['merchant_id']}:{key['day']}"
+            if rollup_id != current_id:
+                if current is not None:
+                    batch.append(ReplaceOne({"_id": current_id}, current, upsert=True))
+                current_id = rollup_id
+                current = {
+                    "merchant_id": key["merchant_id"],
+                    "date": datetime.fromisoformat(key["day"]),
+                    "count": 0,
+                    "total_amount": 0.0,
+                    "hours": {}
+                }
+            hour = current["hours"].setdefault(
+                str(key["hour"]), {"count": 0, "total_amount": 0.0, "categories": {}}
+            )
+            category = hour["categories"].setdefault(
+                _category_key(key.get("category")), {"count": 0, "total_amount": 0.0}
+            )
+            for bucket in (current, hour, category):
+                bucket["count"] += group["count"]
+                bucket["total_amount"] += group["total_amount"]
+
+            if len(batch) >= batch_size:
+                await self.collection.bulk_write(batch, ordered=False)
+                written += len(batch)
+                batch = []
+
+        if current is not None:
+            batch.append(ReplaceOne({"_id": current_id}, current, upsert=True))
+        if batch:
+            await self.collection.bulk_write(batch, ordered=False)
+            written += len(batch)
+        logger.info(f"Backfilled {written} rollup documents")
+        return written
+
+    async def _hour_buckets(
+        self, merchant_id: str, start_date: datetime, end_date: datetime
+    ) -> List[Tuple[datetime, int, Dict]]:
+        """Return (day, hour, bucket) for every hour bucket overlapping the range."""
+        start_date, end_date = _utc(start_date), _utc(end_date)
+        first_hour = start_date.replace(minute=0, second=0, microsecond=0)
+        rollups = await self.collection.find(
+            {"merchant_id": merchant_id, "date": {"$gte": _day_start(start_date), "$lte": end_date}},
+            {"_id": 0, "date": 1, "hours": 1}
+        ).to_list(None)
+
+        hours = []
+        for rollup in rollups:
+            for hour, bucket in rollup.get("hours", {}).items():
+                hour_start = rollup["date"] + timedelta(hours=int(hour))
+                if first_hour <= hour_start <= end_date:
+                    hours.append((rollup["date"], int(hour), bucket))
+        return hours
+
+    async def daily_summary(self, merchant_id: str, start_date: datetime, end_date: datetime) -> Dict:
+        """Transaction count and amount per day, at hour resolution at the range edges."""
+        summaries = defaultdict(lambda: {"count": 0, "total_amount": 0.0})
+        for day, _, bucket in await self._hour_buckets(merchant_id, start_date, end_date):
+            summary = summaries[day.date().isoformat()]
+            summary["count"] += bucket["count"]
+            summary["total_amount"] += bucket["total_amount"]
+        return dict(sorted(summaries.items()))
+
+    async def hourly_summary(self, merchant_id: str, start_date: datetime, end_date: datetime) -> Dict:
+        """Transaction count and amount per hour of day."""
+        summaries = defaultdict(lambda: {"count": 0, "total_amount": 0.0})
+        for _, hour, bucket in await self._hour_buckets(merchant_id, start_date, end_date):
+            summaries[hour]["count"] += bucket["count"]
+            summaries[hour]["total_amount"] += bucket["total_amount"]
+        return dict(summaries)
+
+    async def category_summary(self, merchant_id: str, start_date: datetime, end_date: datetime) -> Dict:
+        """Transaction count and amount per product category."""
+        summaries = defaultdict(lambda: {"count": 0, "total_amount": 0.0})
+        for _, _, bucket in await self._hour_buckets(merchant_id, start_date, end_date):
+            for category, totals in bucket.get("categories", {}).items():
+                summaries[category]["count"] += totals["count"]
+                summaries[category]["total_amount"] += totals["total_amount"]
+        return dict(summaries)
@@ -0,0 +1,96 @@
+from array import array
+from collections import OrderedDict
+from typing import Optional
+import logging
+
+logger = logging.getLogger("VelocityMonitor")
+
+
+class _RingBuffer:
+    """Fixed-capacity buffer of the most recent transaction timestamps (epoch seconds)."""
+    __slots__ = ("times", "head", "size", "spiking", "latest")
+
+    def __init__(self, capacity: int):
+        self.times = array("q", bytes(8 * capacity))
+        self.head = 0  # index of the oldest entry once full
+        self.size = 0
+        self.spiking = False
+        self.latest: Optional[int] = None
+
+    def push(self, timestamp: int) -> int:
+        """Append a timestamp and return the oldest one still held."""
+        self.latest = timestamp
+        capacity = len(self.times)
+        if self.size < capacity:
+            self.times[self.size] = timestamp
+            self.size += 1
+            return self.times[0]
+        self.times[self.head] = timestamp
+        self.head = (self.head + 1) % capacity
+        return self.times[self.head]
+
+
+class VelocityMonitor:
+    """
+    Streaming velocity spike detector fed at ingest.
+
+    Each merchant keeps only its last `threshold` timestamps. When the buffer
+    is full and spans no more than `window_seconds`, the trailing window holds
+    at least `threshold` transactions, which is the same condition the batch
+    detector counts. `observe` returns True only on the transaction that
+    crosses the threshold, so callers emit one event per spike.
+
+    Timestamps older than the merchant's newest one (late or backfilled
+    transactions) are counted in `late_transactions` and otherwise ignored,
+    so buffers stay in time order; the batch detector still sees them.
+
+    Memory is bounded by `max_merchants * threshold * 8` bytes plus small
+    per-merchant overhead; the least recently active merchants are dropped.
+    """
+    def __init__(self, threshold: int = 100, window_seconds: int = 3600, max_merchants: int = 50000):
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.max_merchants = max_merchants
+        self._buffers: "OrderedDict[str, _RingBuffer]" = OrderedDict()
+        self.late_transactions = 0
+
+    def observe(self, merchant_id: str, timestamp: int) -> bool:
+        """
+        Record a transaction and report whether it started a velocity spike.
+
+        Args:
+            merchant_id: Merchant the transaction belongs to.
+            timestamp: Transaction time in epoch seconds.
+
+        Returns:
+            True if this transaction pushed the merchant over the threshold;
+            always False for a transaction older than the newest one seen.
+        """
+        buffer = self._buffers.get(merchant_id)
+        if buffer is None:
+            buffer = self._buffers[merchant_id] = _RingBuffer(self.threshold)
+            if len(self._buffers) > self.max_merchants:
+                self._buffers.popitem(last=False)
+        else:
+            self._buffers.move_to_end(merchant_id)
+            if buffer.latest is not None and timestamp < buffer.latest:
+                self.late_transactions += 1
+                return False
+
+        oldest = buffer.push(timestamp)
+        in_spike = buffer.size == self.threshold and timestamp - oldest <= self.window_seconds
+        crossed = in_spike and not buffer.spiking
+        buffer.spiking = in_spike
+        return crossed
+
+    def is_spiking(self, merchant_id: str) -> Optional[bool]:
+        """Current spike state, or None if the merchant is not being tracked."""
+        buffer = self._buffers.get(merchant_id)
+        return buffer.spiking if buffer is not None else None
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+
+# Shared monitor for this worker
+velocity_monitor = VelocityMonitor()
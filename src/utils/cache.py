@@ -0,0 +1,296 @@
+# src/utils/cache.py
+
+from dataclasses import dataclass, asdict
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import asyncio
+import functools
+import json
+import logging
+
+from cachetools import TTLCache
+
+from src.config.redis_client import redis_client
+from src.utils.metrics import REDIS_COMMAND_SECONDS
+
+logger = logging.getLogger("Cache")
+
+
+@dataclass
+class NamespaceConfig:
+    """TTL and local-tier sizing for one cache keyspace."""
+    ttl: int                 # Redis TTL in seconds
+    local_ttl: int = 60      # in-process TTL, kept short so workers converge quickly
+    local_maxsize: int = 1000
+
+
+# Replaces the per-service cache_ttl dicts. Keys in the pattern, risk_metrics
+# and timeline_events namespaces embed the merchant's data version and the
+# analysis window (see window_key), so ingest invalidates them and they can
+# live long for quiet merchants.
+DEFAULT_NAMESPACES: Dict[str, NamespaceConfig] = {
+    "merchant_profile": NamespaceConfig(ttl=3600),   # 1 hour
+    "risk_metrics": NamespaceConfig(ttl=86400),      # 24 hours
+    "pattern": NamespaceConfig(ttl=86400),           # 24 hours
+    "timeline_events": NamespaceConfig(ttl=86400),   # 24 hours
+    # Version counters never expire in Redis; the local copy bounds how long
+    # another worker's ingest can go unseen
+    "data_version": NamespaceConfig(ttl=0, local_ttl=2, local_maxsize=10000),
+}
+
+
+def window_key(merchant_id: str, data_version: int, days: int) -> str:
+    """Key prefix for results computed from one merchant's data version over a `days`-day window."""
+    return f"{merchant_id}:v{data_version}:d{days}"
+
+
+def _json_default(value: Any) -> str:
+    """Encode datetimes as ISO 8601 so pydantic models parse them back; anything else via str()."""
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+@dataclass
+class CacheStats:
+    local_hits: int = 0
+    remote_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    sets: int = 0
+
+
+class _LocalTier(TTLCache):
+    """TTL/LRU cache that counts size-bound evictions."""
+    def __init__(self, maxsize: int, ttl: int, stats: CacheStats):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._stats = stats
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._stats.evictions += 1
+        return key, value
+
+
+class TwoTierCache:
+    """
+    In-process TTL/LRU tier in front of Redis.
+
+    Values are JSON-serialised in Redis under "{namespace}:{key}" and kept
+    decoded in process memory, so hot keys are served without a network
+    round trip. The local tier holds the decoded JSON rather than the
+    original object, so both tiers return the same types (datetimes come
+    back as ISO 8601 strings either way). Cached values are shared; callers must
+    not mutate them.
+    """
+    def __init__(self, namespaces: Optional[Dict[str, NamespaceConfig]] = None, redis=None):
+        self.namespaces = dict(namespaces or DEFAULT_NAMESPACES)
+        self._redis = redis
+        self._stats: Dict[str, CacheStats] = {}
+        self._local: Dict[str, _LocalTier] = {}
+        for namespace, config in self.namespaces.items():
+            self._stats[namespace] = CacheStats()
+            self._local[namespace] = _LocalTier(config.local_maxsize, config.local_ttl, self._stats[namespace])
+
+    @property
+    def redis(self):
+        return self._redis if self._redis is not None else redis_client.get_client()
+
+    def ttl(self, namespace: str) -> int:
+        return self.namespaces[namespace].ttl
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Return a cached value, or None on a miss in both tiers."""
+        return (await self.get_many(namespace, [key])).get(key)
+
+    async def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Look up several keys, hitting Redis with at most one MGET.
+
+        Args:
+            namespace: Configured cache namespace.
+            keys: Keys within the namespace.
+
+        Returns:
+            Mapping of found keys to their values; misses are omitted.
+        """
+        local, stats = self._local[namespace], self._stats[namespace]
+        found, remote_keys = {}, []
+        for key in keys:
+            value = local.get(key)
+            if value is not None:
+                stats.local_hits += 1
+                found[key] = value
+            else:
+                remote_keys.append(key)
+
+        if remote_keys:
+            with REDIS_COMMAND_SECONDS.time("mget"):
+                raw_values = await self.redis.mget([f"{namespace}:{key}" for key in remote_keys])
+            for key, raw in zip(remote_keys, raw_values):
+                if raw is None:
+                    stats.misses += 1
+                    continue
+                stats.remote_hits += 1
+                found[key] = local[key] = json.loads(raw)
+        return found
+
+    async def set(self, namespace: str, key: str, value: Any) -> Any:
+        """Store a value in both tiers and return it as the cache will serve it."""
+        return (await self.set_many(namespace, {key: value}))[key]
+
+    async def set_many(self, namespace: str, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store several values in both tiers with one pipelined Redis round trip.
+
+        Returns:
+            The values as later reads will return them, i.e. decoded from JSON.
+        """
+        if not values:
+            return {}
+        local, ttl = self._local[namespace], self.ttl(namespace)
+        pipeline = self.redis.pipeline(transaction=False)
+        stored = {}
+        for key, value in values.items():
+            raw = json.dumps(value, default=_json_default)
+            stored[key] = local[key] = json.loads(raw)
+            pipeline.setex(f"{namespace}:{key}", ttl, raw)
+        with REDIS_COMMAND_SECONDS.time("setex_pipeline"):
+            await pipeline.execute()
+        self._stats[namespace].sets += len(values)
+        return stored
+
+    async def delete(self, namespace: str, *keys: str) -> None:
+        """Remove keys from both tiers."""
+        if not keys:
+            return
+        for key in keys:
+            self._local[namespace].pop(key, None)
+        with REDIS_COMMAND_SECONDS.time("delete"):
+            await self.redis.delete(*(f"{namespace}:{key}" for key in keys))
+
+    async def data_version(self, merchant_id: str) -> int:
+        """
+        Return the merchant's data version, bumped whenever new transactions arrive.
+
+        Read it before fetching transactions so cached results are never
+        stored under a version newer than the data they were computed from.
+        """
+        return (await self.data_versions([merchant_id]))[merchant_id]
+
+    async def data_versions(self, merchant_ids: List[str]) -> Dict[str, int]:
+        """Return data versions for several merchants with at most one MGET."""
+        local, stats = self._local["data_version"], self._stats["data_version"]
+        versions, remote_ids = {}, []
+        for merchant_id in merchant_ids:
+            version = local.get(merchant_id)
+            if version is not None:
+                stats.local_hits += 1
+                versions[merchant_id] = version
+            else:
+                remote_ids.append(merchant_id)
+
+        if remote_ids:
+            with REDIS_COMMAND_SECONDS.time("mget"):
+                raw_values = await self.redis.mget([f"data_version:{merchant_id}" for merchant_id in remote_ids])
+            for merchant_id, raw in zip(remote_ids, raw_values):
+                if raw is None:
+                    stats.misses += 1
+                else:
+                    stats.remote_hits += 1
+                versions[merchant_id] = local[merchant_id] = int(raw or 0)
+        return versions
+
+    async def bump_data_version(self, *merchant_ids: str) -> Dict[str, int]:
+        """
+        Increment data versions, orphaning every versioned cache entry of those merchants.
+
+        Returns:
+            The new version of each merchant.
+        """
+        merchant_ids = list(dict.fromkeys(merchant_ids))
+        if not merchant_ids:
+            return {}
+        pipeline = self.redis.pipeline(transaction=False)
+        for merchant_id in merchant_ids:
+            pipeline.incr(f"data_version:{merchant_id}")
+        with REDIS_COMMAND_SECONDS.time("incr_pipeline"):
+            versions = await pipeline.execute()
+        local = self._local["data_version"]
+        for merchant_id, version in zip(merchant_ids, versions):
+            local[merchant_id] = int(version)
+        self._stats["data_version"].sets += len(merchant_ids)
+        return {merchant_id: int(version) for merchant_id, version in zip(merchant_ids, versions)}
+
+    def stats(self) -> Dict[str, Dict]:
+        """Hit, miss and eviction counters per namespace."""
+        return {
+            namespace: {**asdict(stats), "local_size": len(self._local[namespace])}
+            for namespace, stats in self._stats.items()
+        }
+
+
+# Shared cache for this worker
+cache = TwoTierCache()
+
+
+def cached(namespace: str, key_builder: Optional[Callable[..., str]] = None, backend: Optional[TwoTierCache] = None):
+    """
+    Cache the result of an async function or method in a namespace.
+
+    Concurrent misses for the same key share a single call, so a burst of
+    requests for a cold merchant runs the underlying query once. If that
+    call is cancelled, one of the waiters takes over. None results are not
+    cached, and cached results are returned in their JSON-decoded form.
+
+    Args:
+        namespace: Cache namespace, which sets the TTLs.
+        key_builder: Builds the key from the call arguments. Defaults to joining
+            the positional arguments after `self` with ":".
+        backend: Cache to use; defaults to the shared `cache`.
+    """
+    def default_key(*args, **kwargs) -> str:
+        return ":".join(str(arg) for arg in args[1:])
+
+    build_key = key_builder or default_key
+
+    def decorator(func):
+        inflight: Dict[str, asyncio.Future] = {}
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            store = backend or cache
+            key = build_key(*args, **kwargs)
+            value = await store.get(namespace, key)
+            if value is not None:
+                return value
+            while key in inflight:
+                leader = inflight[key]
+                try:
+                    return await asyncio.shield(leader)
+                except asyncio.CancelledError:
+                    # Only retry when the leader was cancelled, not this caller
+                    if not leader.cancelled():
+                        raise
+
+            future = asyncio.get_running_loop().create_future()
+            inflight[key] = future
+            try:
+                value = await func(*args, **kwargs)
+                if value is not None:
+                    value = await store.set(namespace, key, value)
+                future.set_result(value)
+                return value
+            except Exception as e:
+                future.set_exception(e)
+                # Mark retrieved so waiter-less failures are not logged as unhandled
+                future.exception()
+                raise
+            finally:
+                inflight.pop(key, None)
+                if not future.done():
+                    # Cancelled (a BaseException): release the waiters instead of leaving them hanging
+                    future.cancel()
+
+        return wrapper
+    return decorator
@@ -1,7 +1,10 @@
 # src/utils/exceptions.py
 
 from fastapi import HTTPException
-from starlette.status import HTTP_404_NOT_FOUND, HTTP_400_BAD_REQUEST, HTTP_500_INTERNAL_SERVER_ERROR
+from starlette.status import (
+    HTTP_400_BAD_REQUEST, HTTP_403_FORBIDDEN, HTTP_404_NOT_FOUND, HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    HTTP_500_INTERNAL_SERVER_ERROR
+)
 
 class DatabaseConnectionError(HTTPException):
     def __init__(self, detail: str = "Failed to connect to the database."):
@@ -21,6 +24,18 @@ class InvalidTransactionError(HTTPException):
     def __init__(self, detail: str = "Invalid transaction data provided."):
         super().__init__(status_code=HTTP_400_BAD_REQUEST, detail=detail)
         
+class PayloadTooLargeError(HTTPException):
+    def __init__(self, detail: str = "Request body is too large."):
+        super().__init__(status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+
 class GeneralAPIError(HTTPException):
     def __init__(self, detail: str = "An unexpected error occurred."):
-        super().__init__(status_code=HTTP_500_INTERNAL_SERVER_ERROR, detail=detail)
\ No newline at end of file
+        super().__init__(status_code=HTTP_500_INTERNAL_SERVER_ERROR, detail=detail)
+
+class InvalidCursorError(HTTPException):
+    def __init__(self, detail: str = "Invalid pagination cursor."):
+        super().__init__(status_code=HTTP_400_BAD_REQUEST, detail=detail)
+
+class AdminAuthError(HTTPException):
+    def __init__(self, detail: str = "A valid X-Admin-Token header is required."):
+        super().__init__(status_code=HTTP_403_FORBIDDEN, detail=detail)
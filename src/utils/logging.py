@@ -0,0 +1,218 @@
+# src/utils/logging.py
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterator, Optional
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+
+from cachetools import LRUCache
+
+# Request-scoped context, copied onto every record logged inside the request
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+merchant_id_var: ContextVar[Optional[str]] = ContextVar("merchant_id", default=None)
+
+# Pass as `extra=` on per-call hot-path messages to keep roughly 1 in 100
+HOT_PATH = {"sample_rate": 0.01}
+
+# Attributes every LogRecord has, plus filter controls; anything else came from `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sample_rate"}
+
+
+@contextmanager
+def log_context(**values: Optional[str]) -> Iterator[None]:
+    """
+    Attach request_id and/or merchant_id to every record logged in the block.
+
+    Context variables follow asyncio tasks, so concurrent requests keep
+    their own values.
+    """
+    variables = {"request_id": request_id_var, "merchant_id": merchant_id_var}
+    tokens = [(variables[name], variables[name].set(value)) for name, value in values.items()]
+    try:
+        yield
+    finally:
+        for variable, token in reversed(tokens):
+            variable.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copy the request context onto the record while still in the caller's task."""
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.merchant_id = getattr(record, "merchant_id", None) or merchant_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep records logged with a `sample_rate` extra with that probability; others always pass."""
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample_rate", None)
+        return rate is None or random.random() < rate
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "suppressed")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.suppressed = 0
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per (logger, message template) for records below `max_level`.
+
+    Messages must use %-style arguments for repeats to share a bucket. The
+    next record that gets through carries a `suppressed` count of the ones
+    dropped before it. Buckets are kept in an LRU so distinct messages
+    cannot grow memory without bound.
+    """
+    def __init__(
+        self, per_second: float = 10.0, burst: int = 50,
+        max_level: int = logging.ERROR, max_keys: int = 1024
+    ):
+        super().__init__()
+        self.per_second = per_second
+        self.burst = burst
+        self.max_level = max_level
+        self._buckets: LRUCache = LRUCache(maxsize=max_keys)
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.max_level:
+            return True
+        key = (record.name, record.msg if isinstance(record.msg, str) else type(record.msg).__name__)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket(self.burst, now)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.per_second)
+            bucket.updated = now
+            if bucket.tokens < 1:
+                bucket.suppressed += 1
+                return False
+            bucket.tokens -= 1
+            if bucket.suppressed:
+                record.suppressed, bucket.suppressed = bucket.suppressed, 0
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with context and `extra=` fields at the top level."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hand records to the listener thread without formatting them.
+
+    The stock QueueHandler formats in the caller so records can be pickled;
+    ours stay in process, so message interpolation, JSON encoding and the
+    write all happen on the listener thread. When the queue is full the
+    record is dropped and counted rather than blocking the event loop.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+
+
+def configure_logging(
+    level: str = "INFO",
+    json_format: bool = True,
+    queue_size: int = 10000,
+    rate_limit_per_second: float = 10.0,
+    rate_limit_burst: int = 50,
+    stream=None
+) -> None:
+    """
+    Route all logging through a bounded queue to a background writer thread.
+
+    Replaces any handlers on the root logger, so it is safe to call again,
+    e.g. from tests or when settings change.
+
+    Args:
+        level: Root log level name.
+        json_format: Write JSON lines; plain text when False.
+        queue_size: Records buffered before new ones are dropped.
+        rate_limit_per_second: Sustained rate per message template below ERROR.
+        rate_limit_burst: Records per template allowed in a burst.
+        stream: Output stream; defaults to stdout.
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(
+        JsonFormatter() if json_format
+        else logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+
+    _queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    # Filters run in the caller, before the record is queued
+    _queue_handler.addFilter(SamplingFilter())
+    _queue_handler.addFilter(RateLimitFilter(rate_limit_per_second, rate_limit_burst))
+    _queue_handler.addFilter(ContextFilter())
+
+    root.addHandler(_queue_handler)
+    root.setLevel(level.upper())
+
+    _listener = QueueListener(_queue_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records, stop the writer thread and detach the queue handler."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+def logging_stats() -> Dict[str, int]:
+    """Queue depth and records dropped because the queue was full."""
+    if _queue_handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": _queue_handler.queue.qsize(), "dropped": _queue_handler.dropped}
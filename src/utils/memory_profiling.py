@@ -0,0 +1,231 @@
+# src/utils/memory_profiling.py
+
+from collections import OrderedDict, deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+import os
+import tracemalloc
+import uuid
+
+# Source root, so frames of this codebase can be told apart from libraries
+_SRC_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+_NOT_TRACING = nullcontext()
+
+# Entry of the analysis being tracked in this task, for peaks reported by pool workers
+_current_analysis: ContextVar[Optional[Dict]] = ContextVar("current_analysis", default=None)
+
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def module_group(filename: str) -> str:
+    """
+    Name the group an allocation site belongs to.
+
+    Our modules are grouped by file ("risk_calculator", "timeline_generator"),
+    except repositories, which share one group; libraries are grouped by
+    top-level package and anything else is "stdlib".
+    """
+    if filename.startswith(_SRC_ROOT):
+        parts = filename[len(_SRC_ROOT):].split(os.sep)
+        if parts[0] == "repositories":
+            return "repositories"
+        return os.path.splitext(parts[-1])[0]
+    if "site-packages" + os.sep in filename:
+        return filename.split("site-packages" + os.sep, 1)[1].split(os.sep, 1)[0]
+    return "stdlib"
+
+
+def _attributed_frame(traceback: tracemalloc.Traceback) -> tracemalloc.Frame:
+    """The innermost frame in our code, so driver decoding is charged to the query's caller."""
+    for frame in reversed(traceback):
+        if frame.filename.startswith(_SRC_ROOT):
+            return frame
+    return traceback[-1]
+
+
+def _grouped(snapshot: tracemalloc.Snapshot, group_by: str) -> Dict[str, Tuple[int, int]]:
+    """Sum (size, count) per module group or per attributed source line."""
+    groups: Dict[str, Tuple[int, int]] = {}
+    for stat in snapshot.statistics("traceback"):
+        frame = _attributed_frame(stat.traceback)
+        key = module_group(frame.filename) if group_by == "module" else f"{frame.filename}:{frame.lineno}"
+        size, count = groups.get(key, (0, 0))
+        groups[key] = (size + stat.size, count + stat.count)
+    return groups
+
+
+def traced_call(func: Callable, *args) -> Tuple[Any, int]:
+    """
+    Call `func` in a pool worker under tracemalloc.
+
+    The API process's tracer cannot see allocations made in another process,
+    so the worker measures its own peak and returns it with the result.
+
+    Returns:
+        (result, peak traced bytes above the starting level).
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(1)
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    try:
+        result = func(*args)
+        return result, max(0, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+
+class MemoryProfiler:
+    """
+    tracemalloc snapshots and per-analysis peaks for the admin endpoints.
+
+    Tracing slows allocation-heavy code noticeably; start it to investigate
+    and stop it afterwards. Snapshots are kept in memory, at most
+    `max_snapshots` of them.
+    """
+    def __init__(self, max_snapshots: int = 10, max_analyses: int = 200):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[str, Tuple[datetime, tracemalloc.Snapshot]]" = OrderedDict()
+        self._analyses: Deque[Dict] = deque(maxlen=max_analyses)
+        self._active_analyses = 0
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 25) -> Dict:
+        """Start tracing with `frames` frames per traceback; a no-op when already tracing."""
+        if not self.tracing:
+            tracemalloc.start(frames)
+        return self.status()
+
+    def stop(self) -> Dict:
+        """Stop tracing and drop the snapshots and analysis peaks."""
+        tracemalloc.stop()
+        self._snapshots.clear()
+        self._analyses.clear()
+        return self.status()
+
+    def status(self) -> Dict:
+        current, peak = tracemalloc.get_traced_memory() if self.tracing else (0, 0)
+        return {
+            "tracing": self.tracing,
+            "frames": tracemalloc.get_traceback_limit() if self.tracing else 0,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "snapshots": self.list_snapshots(),
+        }
+
+    def take_snapshot(self) -> str:
+        """
+        Snapshot the traced allocations.
+
+        Raises:
+            RuntimeError: If tracing has not been started.
+        """
+        if not self.tracing:
+            raise RuntimeError("tracemalloc is not tracing; start it first")
+        snapshot_id = uuid.uuid4().hex[:12]
+        self._snapshots[snapshot_id] = (datetime.utcnow(), tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS))
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def list_snapshots(self) -> List[Dict]:
+        return [
+            {"snapshot_id": snapshot_id, "taken_at": taken_at.isoformat()}
+            for snapshot_id, (taken_at, _) in self._snapshots.items()
+        ]
+
+    def _snapshot(self, snapshot_id: str) -> tracemalloc.Snapshot:
+        if snapshot_id not in self._snapshots:
+            raise KeyError(snapshot_id)
+        return self._snapshots[snapshot_id][1]
+
+    def top(self, snapshot_id: str, group_by: str = "module", limit: int = 20) -> List[Dict]:
+        """Largest allocation groups in a snapshot."""
+        groups = _grouped(self._snapshot(snapshot_id), group_by)
+        ranked = sorted(groups.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+        return [{"group": key, "size_bytes": size, "count": count} for key, (size, count) in ranked]
+
+    def diff(self, base_id: str, target_id: str, group_by: str = "module", limit: int = 20) -> List[Dict]:
+        """Groups whose retained memory changed most between two snapshots."""
+        base = _grouped(self._snapshot(base_id), group_by)
+        target = _grouped(self._snapshot(target_id), group_by)
+        changes = []
+        for key in base.keys() | target.keys():
+            base_size, base_count = base.get(key, (0, 0))
+            size, count = target.get(key, (0, 0))
+            if size != base_size or count != base_count:
+                changes.append({
+                    "group": key,
+                    "size_bytes": size,
+                    "size_diff_bytes": size - base_size,
+                    "count": count,
+                    "count_diff": count - base_count,
+                })
+        changes.sort(key=lambda change: abs(change["size_diff_bytes"]), reverse=True)
+        return changes[:limit]
+
+    def track_analysis(self, merchant_id: str):
+        """
+        Record the peak traced memory of an analysis; a shared no-op when not tracing.
+
+        The peak counter is process-wide, so peaks of analyses that overlapped
+        another one are flagged as `overlapped` and include its allocations.
+        Work sent to the detector process pool is measured in the worker (see
+        `traced_call`) and reported separately as `worker_peak_bytes`.
+        """
+        if not self.tracing:
+            return _NOT_TRACING
+        return self._tracked_analysis(merchant_id)
+
+    @contextmanager
+    def _tracked_analysis(self, merchant_id: str) -> Iterator[None]:
+        overlapped = self._active_analyses > 0
+        self._active_analyses += 1
+        if not overlapped:
+            tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        entry = {"merchant_id": merchant_id, "process_pool": False, "worker_peak_bytes": 0}
+        token = _current_analysis.set(entry)
+        try:
+            yield
+        finally:
+            _current_analysis.reset(token)
+            self._active_analyses -= 1
+            if self.tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                entry.update({
+                    "finished_at": datetime.utcnow().isoformat(),
+                    "peak_bytes": max(0, peak - baseline),
+                    "retained_bytes": current - baseline,
+                    "overlapped": overlapped or self._active_analyses > 0,
+                })
+                self._analyses.append(entry)
+
+    def record_worker_peak(self, peak_bytes: int) -> None:
+        """Attach a peak measured by `traced_call` in a pool worker to the current analysis."""
+        entry = _current_analysis.get()
+        if entry is not None:
+            entry["process_pool"] = True
+            entry["worker_peak_bytes"] = max(entry["worker_peak_bytes"], peak_bytes)
+
+    def analysis_peaks(self, limit: int = 50) -> List[Dict]:
+        """Most recent analyses, newest first."""
+        return list(self._analyses)[::-1][:limit]
+
+
+# Shared profiler for this worker
+memory_profiler = MemoryProfiler()
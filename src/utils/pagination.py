@@ -0,0 +1,44 @@
+# src/utils/pagination.py
+
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import base64
+import json
+
+from src.utils.exceptions import InvalidCursorError
+
+
+def encode_cursor(timestamp: datetime, transaction_id: str) -> str:
+    """Encode a (timestamp, transaction_id) keyset position as an opaque cursor."""
+    payload = json.dumps({"t": timestamp.isoformat(), "id": transaction_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by `encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), str(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(detail=f"Invalid pagination cursor: {e}")
+
+
+def keyset_filter(merchant_id: str, cursor: Optional[str]) -> Dict:
+    """
+    Build the query for rows after `cursor` in (timestamp desc, transaction_id desc) order.
+
+    Served by the (merchant_id, timestamp, transaction_id) index without a
+    blocking sort.
+    """
+    query: Dict = {"merchant_id": merchant_id}
+    if cursor:
+        timestamp, transaction_id = decode_cursor(cursor)
+        query["$or"] = [
+            {"timestamp": {"$lt": timestamp}},
+            {"timestamp": timestamp, "transaction_id": {"$lt": transaction_id}},
+        ]
+    return query
+
+
+KEYSET_SORT = [("timestamp", -1), ("transaction_id", -1)]
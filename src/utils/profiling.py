@@ -0,0 +1,204 @@
+# src/utils/profiling.py
+
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+import sys
+import threading
+import time
+import uuid
+
+from cachetools import TTLCache
+
+_NO_STAGE = nullcontext()
+
+# Innermost Python frames of threads that are parked rather than working
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("selectors.py", "select"),
+}
+
+
+@dataclass
+class StageTiming:
+    total_ms: float = 0.0
+    calls: int = 0
+
+
+@dataclass
+class RequestProfile:
+    """Stage timings and sampled stacks for one profiled request."""
+    profile_id: str
+    label: str
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    total_ms: float = 0.0
+    stages: Dict[str, StageTiming] = field(default_factory=dict)
+    # Folded stacks ("thread;outer;...;inner") -> sample count, as flamegraph tools read them
+    samples: Counter = field(default_factory=Counter)
+    sample_interval_ms: float = 0.0
+    sampling_skipped: bool = False
+
+    def record_stage(self, path: str, elapsed: float) -> None:
+        timing = self.stages.setdefault(path, StageTiming())
+        timing.total_ms += elapsed * 1000
+        timing.calls += 1
+
+    def to_dict(self, top_stacks: int = 50) -> Dict:
+        return {
+            "profile_id": self.profile_id,
+            "label": self.label,
+            "started_at": self.started_at.isoformat(),
+            "total_ms": round(self.total_ms, 3),
+            "stages": {
+                path: {"total_ms": round(timing.total_ms, 3), "calls": timing.calls}
+                for path, timing in self.stages.items()
+            },
+            "cpu_profile": {
+                "sample_interval_ms": self.sample_interval_ms,
+                "total_samples": sum(self.samples.values()),
+                "skipped": self.sampling_skipped,
+                "folded_stacks": [
+                    {"stack": stack, "samples": count}
+                    for stack, count in self.samples.most_common(top_stacks)
+                ],
+            },
+        }
+
+
+_active_profile: ContextVar[Optional[RequestProfile]] = ContextVar("active_profile", default=None)
+_stage_path: ContextVar[str] = ContextVar("stage_path", default="")
+
+
+def profile_stage(name: str):
+    """
+    Time a block as a stage of the active profile; a shared no-op otherwise.
+
+    Stages nest by path ("load_analysis/fetch"). The path lives in a context
+    variable, so stages of concurrently gathered tasks stay separate.
+    """
+    if _active_profile.get() is None:
+        return _NO_STAGE
+    return _timed_stage(name)
+
+
+@contextmanager
+def _timed_stage(name: str) -> Iterator[None]:
+    profile = _active_profile.get()
+    parent = _stage_path.get()
+    path = f"{parent}/{name}" if parent else name
+    token = _stage_path.set(path)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.record_stage(path, time.perf_counter() - started)
+        _stage_path.reset(token)
+
+
+class StackSampler:
+    """
+    Samples every busy thread's Python stack on a timer thread.
+
+    Threads parked in a wait, queue get or select are skipped. The whole
+    process is sampled, so stacks of other requests served at the same time
+    appear too; profile under low load for a clean picture. Only one
+    sampler runs at a time.
+    """
+    _lock = threading.Lock()
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _is_idle(frame) -> bool:
+        code = frame.f_code
+        return (code.co_filename.rsplit("/", 1)[-1], code.co_name) in _IDLE_FRAMES
+
+    def _fold(self, frame, thread_name: str) -> str:
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join([thread_name] + names[::-1])
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        thread_names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or self._is_idle(frame):
+                    continue
+                if thread_id not in thread_names:
+                    thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                self.samples[self._fold(frame, thread_names.get(thread_id, str(thread_id)))] += 1
+
+    def start(self) -> bool:
+        """Start sampling; False when another sampler is already running."""
+        if not self._lock.acquire(blocking=False):
+            return False
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self._lock.release()
+
+
+class ProfileStore:
+    """Recent profiles kept in process memory for later retrieval."""
+    def __init__(self, maxsize: int = 100, ttl: int = 3600):
+        self._profiles: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def put(self, profile: RequestProfile) -> None:
+        self._profiles[profile.profile_id] = profile
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict]:
+        return [
+            {"profile_id": p.profile_id, "label": p.label, "started_at": p.started_at.isoformat(), "total_ms": p.total_ms}
+            for p in sorted(self._profiles.values(), key=lambda p: p.started_at, reverse=True)
+        ]
+
+
+# Shared store for this worker
+profile_store = ProfileStore()
+
+
+@contextmanager
+def profile_request(label: str, sample_interval: float = 0.005) -> Iterator[RequestProfile]:
+    """
+    Profile the block: stage timings via `profile_stage` plus a sampled CPU profile.
+
+    The finished profile is saved in `profile_store` under its profile_id.
+    """
+    profile = RequestProfile(profile_id=uuid.uuid4().hex, label=label, sample_interval_ms=sample_interval * 1000)
+    sampler = StackSampler(sample_interval)
+    sampling = sampler.start()
+    profile.sampling_skipped = not sampling
+    token = _active_profile.set(profile)
+    started = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.total_ms = (time.perf_counter() - started) * 1000
+        _active_profile.reset(token)
+        if sampling:
+            sampler.stop()
+            profile.samples = sampler.samples
+        profile_store.put(profile)
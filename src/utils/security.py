@@ -0,0 +1,26 @@
+# src/utils/security.py
+
+from typing import Optional
+import hmac
+
+from fastapi import Header
+
+from src.config.settings import get_settings
+from src.utils.exceptions import AdminAuthError
+
+
+def verify_admin_token(token: Optional[str]) -> None:
+    """
+    Check a caller-supplied admin token against `Settings.admin_token`.
+
+    Raises:
+        AdminAuthError: If no admin token is configured or the token does not match.
+    """
+    expected = get_settings().admin_token
+    if not expected or not token or not hmac.compare_digest(token.encode(), expected.encode()):
+        raise AdminAuthError()
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """FastAPI dependency guarding admin endpoints."""
+    verify_admin_token(x_admin_token)
@@ -0,0 +1,54 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from starlette.requests import Request
+from src.config.settings import Settings
+from src.routes import merchant_routes, transaction_routes
+from src.utils.exceptions import InvalidTransactionError, PayloadTooLargeError, RiskProfileNotFoundError
+
+def _request(body: bytes, content_type: str = "application/json") -> Request:
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        return messages.pop(0)
+
+    headers = [(b"content-type", content_type.encode())]
+    return Request({"type": "http", "method": "POST", "headers": headers}, receive)
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(
+        transaction_routes, "get_settings", lambda: Settings(bulk_max_items=2, bulk_max_bytes=200)
+    )
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body,content_type", [
+    (b'[{}, {}, {}]', "application/json"),
+    (b'{}\n{}\n{}\n', "application/x-ndjson"),
+    (b'[' + b' ' * 300 + b']', "application/json"),
+])
+async def test_bulk_limits_return_413(limits, body, content_type):
+    with pytest.raises(PayloadTooLargeError) as error:
+        await transaction_routes.create_transactions_bulk(_request(body, content_type))
+    assert error.value.status_code == 413
+
+@pytest.mark.asyncio
+async def test_bulk_rejects_undecodable_json_with_400(limits):
+    with pytest.raises(InvalidTransactionError) as error:
+        await transaction_routes.create_transactions_bulk(_request(b'["\xff"]'))
+    assert error.value.status_code == 400
+
+@pytest.mark.asyncio
+async def test_missing_risk_profile_is_computed_or_404(monkeypatch):
+    merchant_id = "merchant_" + "a" * 24
+    repository = MagicMock(get_risk_profile=AsyncMock(side_effect=RiskProfileNotFoundError(merchant_id)))
+    monkeypatch.setattr(merchant_routes, "RiskProfileRepository", lambda: repository)
+    monkeypatch.setattr(merchant_routes, "db", MagicMock(merchants=MagicMock(find_one=AsyncMock(return_value=None))))
+    with pytest.raises(RiskProfileNotFoundError) as error:
+        await merchant_routes.get_merchant_risk_profile(merchant_routes.MerchantIDPathParams(merchant_id=merchant_id))
+    assert error.value.status_code == 404
+
+    profile = object()
+    merchant_routes.db.merchants.find_one.return_value = {"_id": 1}
+    monkeypatch.setattr(merchant_routes.risk_profile_worker, "_compute", AsyncMock(return_value=profile))
+    params = merchant_routes.MerchantIDPathParams(merchant_id=merchant_id)
+    assert await merchant_routes.get_merchant_risk_profile(params) is profile
@@ -0,0 +1,108 @@
+import pytest
+import asyncio
+import json
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from src.utils.cache import TwoTierCache, NamespaceConfig, DEFAULT_NAMESPACES, cached
+
+@pytest.fixture
+def redis():
+    redis = MagicMock()
+    redis.mget = AsyncMock(return_value=[None])
+    pipeline = MagicMock()
+    pipeline.execute = AsyncMock(return_value=[])
+    redis.pipeline.return_value = pipeline
+    redis.delete = AsyncMock()
+    return redis
+
+@pytest.fixture
+def two_tier(redis):
+    return TwoTierCache({"profile": NamespaceConfig(ttl=60, local_ttl=60, local_maxsize=2)}, redis=redis)
+
+@pytest.mark.asyncio
+async def test_local_tier_serves_hits_without_redis(two_tier, redis):
+    await two_tier.set("profile", "m1", {"name": "Shop"})
+    redis.pipeline.return_value.setex.assert_called_once_with("profile:m1", 60, json.dumps({"name": "Shop"}))
+
+    assert await two_tier.get("profile", "m1") == {"name": "Shop"}
+    redis.mget.assert_not_awaited()
+    assert two_tier.stats()["profile"]["local_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_remote_hit_populates_local_tier(two_tier, redis):
+    redis.mget.return_value = [json.dumps({"name": "Remote"}), None]
+    found = await two_tier.get_many("profile", ["m1", "m2"])
+    assert found == {"m1": {"name": "Remote"}}
+    redis.mget.assert_awaited_once_with(["profile:m1", "profile:m2"])
+
+    assert await two_tier.get("profile", "m1") == {"name": "Remote"}
+    stats = two_tier.stats()["profile"]
+    assert (stats["remote_hits"], stats["misses"], stats["local_hits"]) == (1, 1, 1)
+
+@pytest.mark.asyncio
+async def test_size_bound_eviction_is_counted(two_tier):
+    await two_tier.set_many("profile", {"m1": 1, "m2": 2, "m3": 3})
+    stats = two_tier.stats()["profile"]
+    assert stats["evictions"] == 1
+    assert stats["local_size"] == 2
+
+@pytest.mark.asyncio
+async def test_cached_decorator_shares_concurrent_misses(two_tier):
+    calls = []
+
+    class Service:
+        @cached("profile", backend=two_tier)
+        async def load(self, merchant_id):
+            calls.append(merchant_id)
+            await asyncio.sleep(0.01)
+            return {"merchant_id": merchant_id}
+
+    service = Service()
+    results = await asyncio.gather(service.load("m1"), service.load("m1"))
+    assert results == [{"merchant_id": "m1"}, {"merchant_id": "m1"}]
+    assert calls == ["m1"]
+
+    assert await service.load("m1") == {"merchant_id": "m1"}
+    assert calls == ["m1"]
+
+@pytest.mark.asyncio
+async def test_bump_data_version_updates_local_copy(redis):
+    versioned = TwoTierCache(DEFAULT_NAMESPACES, redis=redis)
+    redis.mget.return_value = [None, "4"]
+    assert await versioned.data_versions(["m1", "m2"]) == {"m1": 0, "m2": 4}
+
+    redis.pipeline.return_value.execute.return_value = [1]
+    await versioned.bump_data_version("m1", "m1")
+    redis.pipeline.return_value.incr.assert_called_once_with("data_version:m1")
+    assert await versioned.data_version("m1") == 1
+    redis.mget.assert_awaited_once_with(["data_version:m1", "data_version:m2"])
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_hands_over_to_a_waiter(two_tier):
+    calls = []
+
+    class Service:
+        @cached("profile", backend=two_tier)
+        async def load(self, merchant_id):
+            calls.append(merchant_id)
+            await asyncio.sleep(0.05 if len(calls) == 1 else 0)
+            return {"merchant_id": merchant_id}
+
+    service = Service()
+    leader = asyncio.create_task(service.load("m1"))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(service.load("m1"))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await asyncio.wait_for(waiter, 1) == {"merchant_id": "m1"}
+    assert leader.cancelled()
+    assert calls == ["m1", "m1"]
+
+@pytest.mark.asyncio
+async def test_both_tiers_return_the_same_types(two_tier, redis):
+    value = {"registered_at": datetime(2024, 1, 2, 3, 4, 5)}
+    stored = await two_tier.set("profile", "m1", value)
+    raw = redis.pipeline.return_value.setex.call_args.args[2]
+    assert stored == await two_tier.get("profile", "m1") == json.loads(raw)
+    assert stored == {"registered_at": "2024-01-02T03:04:05"}
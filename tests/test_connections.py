@@ -0,0 +1,40 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from src.config.connections import ConnectionManager
+from src.config.database import PoolMonitor
+
+@pytest.fixture
+def manager():
+    database = MagicMock()
+    database.ping = AsyncMock()
+    database.pool_monitor = PoolMonitor()
+    redis = MagicMock()
+    redis.ping = AsyncMock()
+    redis.pool_stats.return_value = {"max_connections": 50, "open": 3, "in_use": 1}
+    return ConnectionManager(database=database, redis=redis, probe_timeout=0.1)
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_connections_on_both_pools(manager):
+    await manager.warm_up(5)
+    assert manager.database.ping.await_count == 5
+    assert manager.redis.ping.await_count == 5
+
+@pytest.mark.asyncio
+async def test_health_reports_failed_probe(manager):
+    manager.redis.ping.side_effect = ConnectionError("refused")
+    health = await manager.health()
+    assert health["mongodb"]["status"] == "ok"
+    assert health["redis"] == {"status": "error", "error": "refused"}
+    assert manager.pool_stats()["redis"]["in_use"] == 1
+
+def test_pool_monitor_tracks_saturation():
+    monitor = PoolMonitor()
+    event = MagicMock()
+    for _ in range(3):
+        monitor.connection_created(event)
+        monitor.connection_check_out_started(event)
+        monitor.connection_checked_out(event)
+    monitor.connection_checked_in(event)
+    monitor.connection_check_out_started(event)
+    stats = monitor.stats()
+    assert (stats["open"], stats["checked_out"], stats["peak_checked_out"], stats["waiting"]) == (3, 2, 3, 1)
@@ -0,0 +1,92 @@
+import pytest
+from datetime import datetime
+from src.services import data_generator
+from src.services.data_generator import BusinessConfig, DataGenerator, TransactionConfig
+
+@pytest.fixture
+def configs():
+    business = BusinessConfig(
+        category_weights={"retail": 0.4, "food": 0.3, "services": 0.3},
+        revenue_ranges={"retail": (100000, 1000000), "food": (50000, 500000), "services": (75000, 750000)},
+        ticket_ranges={"retail": (50, 500), "food": (20, 200), "services": (100, 1000)},
+        operating_hours={"retail": [(9, 21)], "food": [(8, 22)], "services": [(9, 18)]},
+        seasonality={"q1": 0.8, "q2": 1.0, "q3": 1.2, "q4": 1.5},
+        risk_factors={"retail": 0.3, "food": 0.2, "services": 0.4}
+    )
+    transaction = TransactionConfig(
+        volume_ranges={"retail": (50, 500), "food": (100, 1000), "services": (20, 200)},
+        payment_methods={"credit": 0.4, "debit": 0.3, "wallet": 0.2, "upi": 0.1},
+        status_weights={"success": 0.95, "failed": 0.05},
+        platform_weights={"web": 0.4, "mobile": 0.4, "pos": 0.2},
+        time_patterns={"morning": [(9, 12)], "afternoon": [(12, 17)], "evening": [(17, 21)]}
+    )
+    return business, transaction
+
+def test_seeded_benchmark_window_is_reproducible(configs):
+    end_date = datetime(2024, 6, 30)
+    first = DataGenerator(*configs, seed=7).generate_benchmark_window(2000, end_date=end_date)
+    second = DataGenerator(*configs, seed=7).generate_benchmark_window(2000, end_date=end_date)
+    merchant, transactions = first
+    assert merchant["merchant_id"] == second[0]["merchant_id"]
+    assert transactions == second[1]
+    assert len(transactions) == 2000
+    assert all(txn["merchant_id"] == merchant["merchant_id"] for txn in transactions)
+    timestamps = [txn["timestamp"] for txn in transactions]
+    assert timestamps == sorted(timestamps)
+    assert timestamps[-1] <= end_date
+
+def test_vectorized_day_matches_per_row_shape(configs):
+    generator = DataGenerator(*configs, seed=3)
+    merchant = generator.generate_merchant_profiles(1)[0]
+    date = datetime(2024, 6, 3, 12)
+    per_row = generator._generate_normal_transactions(merchant, date)
+    vectorized = generator._generate_normal_transactions(merchant, date, vectorized=True)
+    assert vectorized
+    assert set(vectorized[0]) == set(per_row[0])
+    assert set(vectorized[0]["metadata"]) == set(per_row[0]["metadata"])
+    timestamps = [txn["timestamp"] for txn in vectorized]
+    assert timestamps == sorted(timestamps)
+    assert all(timestamp.startswith("2024-06-03") for timestamp in timestamps)
+    assert len({txn["transaction_id"] for txn in vectorized}) == len(vectorized)
+    assert all(0.0 <= txn["metadata"]["risk_score"] <= 1.0 for txn in vectorized)
+
+def test_parallel_dataset_is_identical_for_any_worker_count(configs):
+    def rows(workers):
+        generator = DataGenerator(*configs, seed=5, reference_time=datetime(2024, 6, 30))
+        return [
+            txn for _, batch in generator.generate_dataset_parallel(6, 2, workers=workers, fraud_percentage=0.5)
+            for txn in batch
+        ]
+
+    inline = rows(1)
+    assert inline and inline == rows(3)
+    timestamps = [txn["timestamp"] for txn in inline]
+    assert timestamps == sorted(timestamps)
+
+def test_history_is_evicted_beyond_the_lookbacks(configs):
+    generator = DataGenerator(*configs, seed=2, reference_time=datetime(2024, 6, 30))
+    transactions = [
+        txn for _, batch in generator.generate_dataset(2, 45, fraud_percentage=0.5, vectorized=True)
+        for txn in batch
+    ]
+    newest = max(txn["timestamp"] for txn in transactions)
+    oldest_kept = min(
+        history[0]["timestamp"] for history in generator._customer_history.values()
+    )
+    assert oldest_kept >= "2024-05-29"
+    assert sum(len(history) for history in generator._customer_history.values()) < len(transactions)
+    for history in generator._merchant_history.values():
+        timestamps = [txn["timestamp"] for txn in history]
+        assert timestamps == sorted(timestamps)
+        assert timestamps[0] >= "2024-06-28" and timestamps[-1] <= newest
+
+def test_returning_customer_pool_is_bounded(configs, monkeypatch):
+    monkeypatch.setattr(data_generator, "CUSTOMER_POOL_SIZE", 50)
+    generator = DataGenerator(*configs, seed=3, reference_time=datetime(2024, 6, 30))
+    transactions = [
+        txn for _, batch in generator.generate_dataset(2, 10, fraud_percentage=0.5, vectorized=True)
+        for txn in batch
+    ]
+    assert len({txn["customer_id"] for txn in transactions}) > 50
+    assert len(generator._customer_ids) == len(generator._customer_cache) == 50
+    assert set(generator._customer_ids) == set(generator._customer_cache)
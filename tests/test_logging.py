@@ -0,0 +1,43 @@
+import io
+import json
+import logging
+from src.utils.logging import (
+    RateLimitFilter, configure_logging, log_context, logging_stats, shutdown_logging
+)
+
+def _record(msg="Scanned %d rows", args=(1,), level=logging.INFO):
+    return logging.LogRecord("test", level, __file__, 1, msg, args, None)
+
+def test_rate_limit_suppresses_repeats_and_reports_count():
+    limiter = RateLimitFilter(per_second=0.0, burst=2)
+    passed = [limiter.filter(_record(args=(i,))) for i in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert limiter.filter(_record(level=logging.ERROR))
+
+    # A refilled bucket lets the next record through with the suppressed count
+    limiter.per_second = 1e9
+    record = _record()
+    assert limiter.filter(record)
+    assert record.suppressed == 3
+
+def test_records_are_written_as_json_with_context():
+    stream = io.StringIO()
+    configure_logging(level="INFO", stream=stream)
+    try:
+        logger = logging.getLogger("ContextTest")
+        with log_context(request_id="req-1", merchant_id="merchant_1"):
+            logger.info("Scored %.1f", 42.0, extra={"pattern": "late_night"})
+        logger.debug("Not emitted")
+        logger.warning("Sampled", extra={"sample_rate": 1.0})
+    finally:
+        shutdown_logging()
+    assert logging_stats() == {"queued": 0, "dropped": 0}
+
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(entries) == 2
+    assert "sample_rate" not in entries[1]
+    assert entries[0]["message"] == "Scored 42.0"
+    assert entries[0]["logger"] == "ContextTest"
+    assert entries[0]["request_id"] == "req-1"
+    assert entries[0]["merchant_id"] == "merchant_1"
+    assert entries[0]["pattern"] == "late_night"
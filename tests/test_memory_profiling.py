@@ -0,0 +1,48 @@
+import os
+import pytest
+from src.services.detector_executor import DetectorExecutor, ExecutorMode
+from src.utils.memory_profiling import MemoryProfiler, module_group
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+def test_module_group_names_our_modules_and_libraries():
+    assert module_group(os.path.join(SRC, "services", "risk_calculator.py")) == "risk_calculator"
+    assert module_group(os.path.join(SRC, "repositories", "transaction_repository.py")) == "repositories"
+    assert module_group("/usr/lib/python3/site-packages/bson/__init__.py") == "bson"
+
+def test_snapshot_diff_and_analysis_peak():
+    profiler = MemoryProfiler()
+    assert profiler.track_analysis("m1") is profiler.track_analysis("m2")
+    profiler.start(frames=5)
+    try:
+        base = profiler.take_snapshot()
+        with profiler.track_analysis("m1"):
+            retained = [bytearray(1024) for _ in range(1000)]
+        target = profiler.take_snapshot()
+
+        changes = profiler.diff(base, target, group_by="site")
+        assert changes[0]["size_diff_bytes"] >= 1000 * 1024
+        assert "test_memory_profiling.py" in changes[0]["group"]
+        [peak] = profiler.analysis_peaks()
+        assert peak["merchant_id"] == "m1" and peak["peak_bytes"] >= 1000 * 1024
+    finally:
+        profiler.stop()
+    del retained
+
+def _allocate(size):
+    return len(bytearray(size))
+
+@pytest.mark.asyncio
+async def test_process_pool_peaks_are_measured_in_the_worker(monkeypatch):
+    profiler = MemoryProfiler()
+    monkeypatch.setattr("src.services.detector_executor.memory_profiler", profiler)
+    executor = DetectorExecutor(mode=ExecutorMode.PROCESS, max_process_workers=1)
+    profiler.start(frames=1)
+    try:
+        with profiler.track_analysis("m1"):
+            assert await executor.run(1, _allocate, 4 * 1024 * 1024) == 4 * 1024 * 1024
+        [peak] = profiler.analysis_peaks()
+    finally:
+        profiler.stop()
+        executor.shutdown()
+    assert peak["process_pool"] and peak["worker_peak_bytes"] >= 4 * 1024 * 1024
@@ -0,0 +1,37 @@
+import pytest
+from types import SimpleNamespace
+from src.config.database import CommandTimer
+from src.utils.metrics import DB_COMMAND_SECONDS, Histogram, MetricsRegistry, timed
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("op_seconds", "Op latency.", ("op",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, 'say "hi"')
+
+    lines = registry.render().splitlines()
+    assert "# TYPE op_seconds histogram" in lines
+    assert 'op_seconds_bucket{op="say \\"hi\\"",le="0.1"} 1' in lines
+    assert 'op_seconds_bucket{op="say \\"hi\\"",le="1"} 2' in lines
+    assert 'op_seconds_bucket{op="say \\"hi\\"",le="+Inf"} 3' in lines
+    assert 'op_seconds_count{op="say \\"hi\\""} 3' in lines
+    with pytest.raises(ValueError):
+        histogram.observe(1.0)
+
+@pytest.mark.asyncio
+async def test_timed_records_failures_and_command_timer_labels_collection():
+    histogram = Histogram("call_seconds", "Call latency.", ("call",))
+
+    @timed(histogram, "fetch")
+    async def fetch():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await fetch()
+    assert histogram.count("fetch") == 1
+
+    timer = CommandTimer()
+    before = DB_COMMAND_SECONDS.count("transactions", "find", "success")
+    timer.started(SimpleNamespace(command_name="find", command={"find": "transactions"}, request_id=7))
+    timer.succeeded(SimpleNamespace(command_name="find", request_id=7, duration_micros=1500))
+    assert DB_COMMAND_SECONDS.count("transactions", "find", "success") == before + 1
@@ -0,0 +1,21 @@
+import pytest
+from datetime import datetime
+from src.utils.exceptions import InvalidCursorError
+from src.utils.pagination import encode_cursor, decode_cursor, keyset_filter
+
+def test_cursor_round_trip_builds_keyset_filter():
+    timestamp = datetime(2024, 3, 1, 12, 30, 15, 250)
+    cursor = encode_cursor(timestamp, "txn_42")
+    assert decode_cursor(cursor) == (timestamp, "txn_42")
+
+    query = keyset_filter("merchant_1", cursor)
+    assert query["merchant_id"] == "merchant_1"
+    assert query["$or"] == [
+        {"timestamp": {"$lt": timestamp}},
+        {"timestamp": timestamp, "transaction_id": {"$lt": "txn_42"}},
+    ]
+    assert keyset_filter("merchant_1", None) == {"merchant_id": "merchant_1"}
+
+def test_malformed_cursor_is_rejected():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor")
@@ -0,0 +1,23 @@
+import asyncio
+import time
+import pytest
+from src.utils.profiling import profile_request, profile_stage, profile_store
+
+def test_stage_is_shared_noop_without_active_profile():
+    assert profile_stage("fetch") is profile_stage("detect")
+
+@pytest.mark.asyncio
+async def test_profile_records_nested_stages_and_samples():
+    async def detector(name):
+        with profile_stage(name):
+            time.sleep(0.02)
+
+    with profile_request("test", sample_interval=0.001) as profile:
+        with profile_stage("analyze"):
+            await asyncio.gather(detector("late_night"), detector("velocity"))
+
+    assert set(profile.stages) == {"analyze", "analyze/late_night", "analyze/velocity"}
+    assert profile.stages["analyze"].total_ms >= 40
+    assert sum(profile.samples.values()) > 0
+    assert any("detector" in stack for stack in profile.samples)
+    assert profile_store.get(profile.profile_id) is profile
@@ -0,0 +1,393 @@
+import pytest
+from dataclasses import replace
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+import numpy as np
+from src.services.pattern_engine import (
+    TransactionWindow, AnalysisParams, analyze_window, parse_hour_window, count_hours,
+    find_split_clusters, count_velocity_spikes, count_velocity_spikes_bucketed, split_candidate_ranges
+)
+from src.services.aggregate_analysis import build_window_pipeline, load_aggregated_analysis
+from src.config.settings import Settings
+from src.utils.metrics import DETECTOR_SECONDS
+from src.services.detector_executor import DetectorExecutor, ExecutorMode
+from src.services.risk_calculator import AnalysisMode, RiskCalculatorService
+from src.services.risk_profile_worker import RiskProfileWorker
+from src.services.rolling_risk_state import MerchantRollingState, RollingStateStore
+from src.services.velocity_monitor import VelocityMonitor
+
+@pytest.fixture
+def transactions():
+    base = datetime(2024, 3, 1, 22, 0, 0)
+    offsets_minutes = [0, 10, 20, 30, 200, 205, 210, 400, 401, 402, 403]
+    amounts = [5000.0, 4000.0, 3000.0, 20.0, 10.0, 15.5, 30.0, 100.0, 7.25, 60.0, 90.0]
+    customers = ["c1", "c1", "c2", "c1", "c3", "c1", "c2", "c1", "c1", "c3", "c1"]
+    return [
+        {"timestamp": base + timedelta(minutes=m), "amount": a, "customer_id": c}
+        for m, a, c in zip(offsets_minutes, amounts, customers)
+    ]
+
+@pytest.fixture
+def window(transactions):
+    return TransactionWindow.from_documents("merchant_1", list(reversed(transactions)))
+
+def test_parse_hour_window():
+    assert parse_hour_window("23:00-04:00") == (23, 4)
+    assert parse_hour_window("09:30-17:00") == (9, 17)
+
+def test_from_documents_builds_columns(window):
+    assert len(window) == 11
+    assert window.timestamps.dtype.kind == "i"
+    assert sorted(window.customer_ids.tolist()) == ["c1", "c2", "c3"]
+
+@pytest.fixture
+def analysis(window):
+    params = AnalysisParams(velocity_window_seconds=600, velocity_threshold=3, round_factor=10)
+    return analyze_window(window, params)
+
+def test_count_hours_wraps_midnight(transactions, analysis):
+    expected = sum(1 for t in transactions if t["timestamp"].hour >= 23 or t["timestamp"].hour < 4)
+    assert count_hours(analysis.hour_histogram, 23, 4) == expected
+    assert count_hours(analysis.hour_histogram, 22, 23) == 4
+
+def test_velocity_spikes_match_two_pointer_scan(transactions, analysis):
+    times = sorted(t["timestamp"] for t in transactions)
+    expected, start = 0, 0
+    for end in range(len(times)):
+        while (times[end] - times[start]).total_seconds() > 600:
+            start += 1
+        if end - start + 1 >= 3:
+            expected += 1
+    assert analysis.velocity_spike_count == expected
+
+def test_split_clusters(analysis):
+    assert analysis.cluster_sizes.tolist() == [4, 3, 4]
+    assert analysis.cluster_totals.tolist() == [12020.0, 55.5, 257.25]
+
+def test_split_clusters_empty_window():
+    sizes, totals = find_split_clusters(np.empty(0, dtype=np.int64), np.empty(0), 30, 3)
+    assert len(sizes) == 0 and len(totals) == 0
+
+def test_round_and_customer_counts(analysis):
+    assert analysis.transaction_count == 11
+    assert analysis.round_count == 9
+    counts = dict(zip(analysis.customer_ids.tolist(), analysis.customer_counts.tolist()))
+    assert counts == {"c1": 7, "c2": 2, "c3": 2}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", [ExecutorMode.INLINE, ExecutorMode.THREAD, ExecutorMode.PROCESS])
+async def test_executor_matches_inline_analysis(window, analysis, mode):
+    executor = DetectorExecutor(mode=mode, max_process_workers=1)
+    params = AnalysisParams(velocity_window_seconds=600, velocity_threshold=3, round_factor=10)
+    before = DETECTOR_SECONDS.count("split_transactions", "split_clusters")
+    try:
+        result = await executor.analyze(window, params)
+    finally:
+        executor.shutdown()
+    assert DETECTOR_SECONDS.count("split_transactions", "split_clusters") == before + 1
+    assert result.velocity_spike_count == analysis.velocity_spike_count
+    assert result.round_count == analysis.round_count
+    assert result.hour_histogram.tolist() == analysis.hour_histogram.tolist()
+    assert result.customer_counts.tolist() == analysis.customer_counts.tolist()
+    assert result.cluster_sizes.tolist() == analysis.cluster_sizes.tolist()
+
+def test_executor_from_settings():
+    executor = DetectorExecutor.from_settings(Settings(
+        detector_executor_mode="thread", detector_process_threshold=1000, detector_max_thread_workers=2
+    ))
+    assert executor.mode == ExecutorMode.THREAD
+    assert executor.process_threshold == 1000
+    assert executor.max_thread_workers == 2
+    with pytest.raises(ValueError):
+        DetectorExecutor.from_settings(Settings(detector_executor_mode="gpu"))
+
+def assert_same_analysis(left, right):
+    assert left.transaction_count == right.transaction_count
+    assert left.hour_histogram.tolist() == right.hour_histogram.tolist()
+    assert left.round_count == right.round_count
+    assert left.velocity_spike_count == right.velocity_spike_count
+    assert dict(zip(left.customer_ids.tolist(), left.customer_counts.tolist())) == \
+        dict(zip(right.customer_ids.tolist(), right.customer_counts.tolist()))
+    assert left.cluster_sizes.tolist() == right.cluster_sizes.tolist()
+    assert left.cluster_totals.tolist() == right.cluster_totals.tolist()
+
+def test_rolling_state_matches_full_rescan(transactions, window, analysis):
+    params = AnalysisParams(velocity_window_seconds=600, velocity_threshold=3, round_factor=10)
+    seeded = MerchantRollingState.from_window(window, params, window_seconds=30 * 86400)
+    assert_same_analysis(seeded.to_analysis(int(window.timestamps.max())), analysis)
+
+    head = TransactionWindow.from_documents("merchant_1", transactions[:5])
+    incremental = MerchantRollingState.from_window(head, params, window_seconds=30 * 86400)
+    for txn in transactions[5:]:
+        incremental.add(int(np.datetime64(txn["timestamp"], "s").astype(np.int64)), txn["amount"], txn["customer_id"])
+    assert_same_analysis(incremental.to_analysis(int(window.timestamps.max())), analysis)
+
+def test_rolling_state_evicts_old_buckets_and_flags_out_of_order(window):
+    state = MerchantRollingState.from_window(window, AnalysisParams(), window_seconds=3600)
+    latest = int(window.timestamps.max())
+    assert state.to_analysis(latest).transaction_count == 4
+    assert state.to_analysis(latest + 3 * 3600).transaction_count == 0
+
+    state.add(latest - 60, 10.0, "c1")
+    assert state.stale
+
+    store = RollingStateStore(max_merchants=1)
+    store.put(state)
+    assert store.get("merchant_1", 3600, 0) is None
+
+def test_rolling_store_replays_ingest_during_seed_once(window):
+    store = RollingStateStore()
+    latest = int(window.timestamps.max())
+    buffer = store.begin_seed("merchant_1")
+    # One transaction the seed fetch also returned, one it missed
+    store.record("merchant_1", latest, 10.0, "c1", "TXN-seen", 1)
+    store.record("merchant_1", latest + 60, 15.0, "c2", "TXN-new", 2)
+
+    state = MerchantRollingState.from_window(window, AnalysisParams(), window_seconds=86400)
+    store.finish_seed(state, buffer, ["TXN-seen"])
+
+    assert store.get("merchant_1", 86400, 2).to_analysis(latest + 60).transaction_count == len(window) + 1
+    assert not store._seeding
+
+def test_rolling_store_rebuilds_after_another_workers_ingest(window):
+    store = RollingStateStore()
+    store.put(MerchantRollingState.from_window(window, AnalysisParams(), window_seconds=86400, data_version=3))
+    assert store.get("merchant_1", 86400, 3) is not None
+    assert store.get("merchant_1", 86400, 4) is None
+
+def test_velocity_monitor_flags_threshold_crossing_once():
+    monitor = VelocityMonitor(threshold=3, window_seconds=60, max_merchants=2)
+    assert [monitor.observe("m1", t) for t in (0, 30, 50, 55, 200, 210, 220)] == \
+        [False, False, True, False, False, False, True]
+    assert monitor.is_spiking("m1")
+
+    monitor.observe("m2", 0)
+    monitor.observe("m3", 0)
+    assert len(monitor) == 2
+    assert monitor.is_spiking("m1") is None
+
+def test_velocity_monitor_ignores_late_transactions():
+    monitor = VelocityMonitor(threshold=100, window_seconds=3600)
+    start = 10 * 86400
+    assert not any(monitor.observe("m1", start + i * 10000) for i in range(99))
+    assert not monitor.observe("m1", start - 86400)
+    assert monitor.late_transactions == 1
+    assert not monitor.is_spiking("m1")
+
+@pytest.mark.asyncio
+async def test_profile_worker_bounds_remembered_scores():
+    calculator = MagicMock(analyze_merchant_risk=AsyncMock(
+        side_effect=lambda merchant_id: MagicMock(overall_risk_score=float(merchant_id[1:]))
+    ))
+    worker = RiskProfileWorker(calculator=calculator, repository=MagicMock(save_risk_profile=AsyncMock()),
+                               max_scored_merchants=2)
+    for merchant_id in ("m1", "m2", "m3"):
+        worker.mark_dirty(merchant_id)
+        assert await worker.refresh(merchant_id)
+    assert list(worker._risk_scores) == ["m2", "m3"]
+
+def test_bucketed_kernels_match_raw_scan():
+    rng = np.random.default_rng(7)
+    times = np.sort(rng.integers(0, 6 * 3600, 400)) // 60 * 60  # minute-aligned
+    amounts = rng.uniform(1, 500, len(times)).round(2)
+    minutes, counts = np.unique(times // 60, return_counts=True)
+
+    assert count_velocity_spikes_bucketed(minutes, counts, 600, 15) == count_velocity_spikes(times, 600, 15)
+
+    ranges = split_candidate_ranges(minutes, counts, 2, 3)
+    in_range = np.zeros(len(times), dtype=bool)
+    for start, end in ranges:
+        in_range |= (times >= start) & (times < end)
+    sizes, totals = find_split_clusters(times[in_range], amounts[in_range], 2, 3)
+    expected_sizes, expected_totals = find_split_clusters(times, amounts, 2, 3)
+    assert sizes.tolist() == expected_sizes.tolist()
+    assert np.allclose(totals, expected_totals)
+
+def test_split_ranges_respect_amount_threshold_and_cap():
+    minutes = np.array([0, 1, 100, 101, 150, 151, 300, 301])
+    counts = np.array([2, 2, 2, 2, 2, 2, 2, 2])
+    amounts = np.array([10.0, 10.0, 6000.0, 6000.0, 10.0, 10.0, 5000.0, 5000.0])
+
+    assert split_candidate_ranges(minutes, counts, 30, 3, amounts, 10000) == [(6000, 6120), (18000, 18120)]
+    # Capped ranges join across the shortest gaps and still contain every candidate
+    assert split_candidate_ranges(minutes, counts, 30, 3, max_ranges=2) == [(0, 9120), (18000, 18120)]
+
+def test_window_pipeline_sums_amounts_per_minute():
+    pipeline = build_window_pipeline("m1", datetime(2024, 3, 1), datetime(2024, 3, 2), AnalysisParams())
+    group = pipeline[1]["$facet"]["minutes"][0]["$group"]
+    assert group["amount"] == {"$sum": "$amount"}
+    assert group["count"] == {"$sum": 1}
+
+@pytest.mark.asyncio
+async def test_aggregated_analysis_fetches_only_ranges_reaching_the_threshold():
+    collection = MagicMock()
+    collection.aggregate.return_value.to_list = AsyncMock(return_value=[{
+        "minutes": [
+            {"_id": 0, "count": 3, "amount": 30.0, "round_count": 3},
+            {"_id": 100, "count": 3, "amount": 12000.0, "round_count": 0},
+        ],
+        "customers": [{"_id": "c1", "count": 6}],
+    }])
+    rows = [{"timestamp": datetime.utcfromtimestamp(6000 + i), "amount": 4000.0} for i in range(3)]
+    collection.find.return_value.sort.return_value.to_list = AsyncMock(return_value=rows)
+
+    params = AnalysisParams(split_amount_threshold=10000)
+    analysis = await load_aggregated_analysis(collection, "m1", datetime(1970, 1, 1), datetime(1970, 1, 2), params)
+
+    query = collection.find.call_args.args[0]
+    assert [clause["timestamp"]["$gte"] for clause in query["$or"]] == [datetime.utcfromtimestamp(6000)]
+    assert analysis.transaction_count == 6
+    assert analysis.cluster_sizes.tolist() == [3]
+    assert analysis.cluster_totals.tolist() == [12000.0]
+
+@pytest.mark.asyncio
+async def test_split_confidence_ignores_clusters_below_the_threshold(analysis):
+    calculator = RiskCalculatorService(db_client=object())
+    config = {"amount_threshold": 10000}
+    suspicious = analysis.cluster_totals >= 10000
+    pruned = replace(
+        analysis, cluster_sizes=analysis.cluster_sizes[suspicious], cluster_totals=analysis.cluster_totals[suspicious]
+    )
+    assert len(pruned.cluster_sizes) < len(analysis.cluster_sizes)
+
+    full = await calculator._detect_split_transactions(analysis, config)
+    aggregated = await calculator._detect_split_transactions(pruned, config)
+    assert full.confidence_score == aggregated.confidence_score == 4 / 11
+
+def test_calculator_analysis_mode_from_settings():
+    calculator = RiskCalculatorService.from_settings(Settings(risk_analysis_mode="aggregation"), db_client=object())
+    assert calculator.analysis_mode == AnalysisMode.AGGREGATION
+    with pytest.raises(ValueError):
+        RiskCalculatorService.from_settings(Settings(risk_analysis_mode="sampled"), db_client=object())
+
+@pytest.mark.asyncio
+async def test_pattern_cache_keys_include_the_window():
+    calculator = RiskCalculatorService(db_client=object())
+    with patch("src.services.risk_calculator.cache") as cache:
+        cache.set_many = AsyncMock()
+        await calculator.cache_pattern_results("m1", {"split_transactions": {}}, 4, 30)
+        await calculator.cache_pattern_results("m1", {"split_transactions": {}}, 4, 1)
+    keys = [list(call.args[1]) for call in cache.set_many.await_args_list]
+    assert keys == [["m1:v4:d30:split_transactions"], ["m1:v4:d1:split_transactions"]]
+
+class DictCache:
+    """Versioned cache stand-in: one dict, fixed data version per merchant."""
+    def __init__(self):
+        self.values = {}
+
+    async def data_version(self, merchant_id):
+        return 1
+
+    async def data_versions(self, merchant_ids):
+        return {merchant_id: 1 for merchant_id in merchant_ids}
+
+    async def get(self, namespace, key):
+        return self.values.get((namespace, key))
+
+    async def get_many(self, namespace, keys):
+        return {key: self.values[(namespace, key)] for key in keys if (namespace, key) in self.values}
+
+    async def set(self, namespace, key, value):
+        self.values[(namespace, key)] = value
+        return value
+
+    async def set_many(self, namespace, values):
+        for key, value in values.items():
+            self.values[(namespace, key)] = value
+        return values
+
+def _history(merchant_id, now):
+    """A quiet last day after a month of late-night, round-amount, single-customer bursts."""
+    rows = [
+        {"merchant_id": merchant_id, "timestamp": now - timedelta(days=day, hours=22, minutes=minute),
+         "amount": 5000.0, "customer_id": "c1"}
+        for day in range(2, 30) for minute in range(0, 60, 2)
+    ]
+    rows += [
+        {"merchant_id": merchant_id, "timestamp": now - timedelta(hours=hour), "amount": 12.5 + hour,
+         "customer_id": f"c{hour}"}
+        for hour in range(1, 6)
+    ]
+    return rows
+
+async def _profile(calculator, merchant_id, days):
+    profile = await calculator.analyze_merchant_risk(merchant_id, days=days)
+    return sorted(pattern.name for pattern in profile.detected_patterns), profile.overall_risk_score
+
+@pytest.mark.asyncio
+async def test_cached_results_do_not_leak_between_windows():
+    rows = _history("m1", datetime.utcnow())
+
+    async def fetch(merchant_id, start_date, end_date, fields=None):
+        return [row for row in rows if start_date <= row["timestamp"] <= end_date]
+
+    async def run(days_sequence):
+        calculator = RiskCalculatorService(db_client=object(), executor=DetectorExecutor(mode=ExecutorMode.INLINE))
+        calculator._fetch_transactions = fetch
+        with patch("src.services.risk_calculator.cache", DictCache()), \
+                patch("src.services.risk_calculator.TimelineGenerator") as timeline:
+            timeline.return_value.generate_events = AsyncMock(return_value=[])
+            return [await _profile(calculator, "m1", days) for days in days_sequence]
+
+    month, day_after_month = await run([30, 1])
+    [day_on_cold_cache] = await run([1])
+    assert day_after_month == day_on_cold_cache
+    assert month != day_on_cold_cache
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def sort(self, *args):
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for row in self.rows:
+            yield row
+
+@pytest.mark.asyncio
+async def test_columnar_batch_splits_the_stream_per_merchant():
+    now = datetime.utcnow()
+    rows = [
+        {"merchant_id": merchant_id, "timestamp": now - timedelta(minutes=minute), "amount": 10.0,
+         "customer_id": "c1"}
+        for merchant_id, count in (("m1", 3), ("m3", 4), ("m4", 2))
+        for minute in range(count)
+    ]
+    calculator = RiskCalculatorService(db_client=object(), executor=DetectorExecutor(mode=ExecutorMode.INLINE))
+    counts = {}
+
+    async def build(merchant_id, analysis, data_version, days):
+        if merchant_id == "m4":
+            raise RuntimeError("detector failed")
+        counts[merchant_id] = analysis.transaction_count
+        return calculator._create_empty_risk_profile(merchant_id)
+
+    calculator._build_risk_profile = build
+    with patch("src.services.risk_calculator.cache", DictCache()), \
+            patch("src.services.risk_calculator.db") as database:
+        database.transaction_collection.find.return_value = FakeCursor(rows)
+        results = [item async for item in calculator.analyze_merchants_risk(["m1", "m2", "m3", "m1", "m4"])]
+
+    assert sorted(merchant_id for merchant_id, _ in results) == ["m1", "m2", "m3", "m4"]
+    outcomes = dict(results)
+    assert counts == {"m1": 3, "m3": 4}
+    assert outcomes["m2"].overall_risk_score == 0.0
+    assert isinstance(outcomes["m4"], RuntimeError)
+    query = database.transaction_collection.find.call_args.args[0]
+    assert query["merchant_id"]["$in"] == ["m1", "m2", "m3", "m4"]
+
+@pytest.mark.asyncio
+async def test_batch_analysis_follows_the_analysis_mode():
+    calculator = RiskCalculatorService(db_client=object(), analysis_mode=AnalysisMode.AGGREGATION)
+    calculator._load_analysis = AsyncMock(return_value=None)
+    with patch("src.services.risk_calculator.cache.data_versions", AsyncMock(return_value={"m1": 3, "m2": 5})), \
+            patch("src.services.risk_calculator.db") as database:
+        results = dict([item async for item in calculator.analyze_merchants_risk(["m1", "m2"])])
+
+    assert {merchant_id: profile.overall_risk_score for merchant_id, profile in results.items()} == {"m1": 0.0, "m2": 0.0}
+    assert sorted(call.args[3] for call in calculator._load_analysis.await_args_list) == [3, 5]
+    database.transaction_collection.find.assert_not_called()
@@ -0,0 +1,50 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.services.transaction_rollup import TransactionRollup, rollup_increments
+
+def test_increments_fold_per_merchant_day():
+    transactions = [
+        {"merchant_id": "m1", "timestamp": datetime(2024, 3, 1, 9, 15), "amount": 100.0, "product_category": "books"},
+        {"merchant_id": "m1", "timestamp": datetime(2024, 3, 1, 9, 45), "amount": 50.5, "product_category": "home.garden"},
+        {"merchant_id": "m1", "timestamp": datetime(2024, 3, 2, 1, 0), "amount": 20.0, "product_category": "books"},
+    ]
+    increments = rollup_increments(transactions)
+    assert set(increments) == {("m1", datetime(2024, 3, 1)), ("m1", datetime(2024, 3, 2))}
+
+    first_day = increments[("m1", datetime(2024, 3, 1))]
+    assert first_day["count"] == 2
+    assert first_day["total_amount"] == 150.5
+    assert first_day["hours.9.count"] == 2
+    assert first_day["hours.9.categories.books.total_amount"] == 100.0
+    assert first_day["hours.9.categories.home_garden.count"] == 1
+
+@pytest.mark.asyncio
+async def test_summaries_trim_edge_hours():
+    rollups = [
+        {"date": datetime(2024, 3, 1), "hours": {
+            "8": {"count": 3, "total_amount": 30.0, "categories": {"books": {"count": 3, "total_amount": 30.0}}},
+            "22": {"count": 1, "total_amount": 5.0, "categories": {"toys": {"count": 1, "total_amount": 5.0}}},
+        }},
+        {"date": datetime(2024, 3, 2), "hours": {
+            "8": {"count": 2, "total_amount": 40.0, "categories": {"books": {"count": 2, "total_amount": 40.0}}},
+            "12": {"count": 7, "total_amount": 70.0, "categories": {"books": {"count": 7, "total_amount": 70.0}}},
+        }},
+    ]
+    with patch("src.services.transaction_rollup.db") as mock_db:
+        mock_db.transaction_rollup_collection.find.return_value.to_list = AsyncMock(return_value=rollups)
+        rollup = TransactionRollup()
+        start, end = datetime(2024, 3, 1, 9, 30), datetime(2024, 3, 2, 10, 0)
+
+        assert await rollup.daily_summary("m1", start, end) == {
+            "2024-03-01": {"count": 1, "total_amount": 5.0},
+            "2024-03-02": {"count": 2, "total_amount": 40.0},
+        }
+        assert await rollup.hourly_summary("m1", start, end) == {
+            22: {"count": 1, "total_amount": 5.0},
+            8: {"count": 2, "total_amount": 40.0},
+        }
+        assert await rollup.category_summary("m1", start, end) == {
+            "toys": {"count": 1, "total_amount": 5.0},
+            "books": {"count": 2, "total_amount": 40.0},
+        }
@@ -0,0 +1,101 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.services.timeline_generator import TimelineGenerator
+
+def _get(doc, path):
+    for part in path.split("."):
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+def _set(doc, path, value):
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[leaf] = value
+
+class FakeTimelineCollection:
+    """Applies upserts and inserts to an in-memory list of documents."""
+    def __init__(self):
+        self.documents = []
+
+    def _find(self, query):
+        return [doc for doc in self.documents if all(_get(doc, k) == v for k, v in query.items())]
+
+    async def update_one(self, query, update, upsert=False):
+        matched = self._find(query)
+        if matched or not upsert:
+            return
+        doc = {}
+        for path, value in {**query, **update.get("$setOnInsert", {})}.items():
+            _set(doc, path, value)
+        self.documents.append(doc)
+
+    async def update_many(self, query, update):
+        for doc in self._find(query):
+            for path, value in update["$set"].items():
+                _set(doc, path, value)
+
+    async def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            match, update = request._filter, request._doc["$set"]
+            existing = [doc for doc in self.documents if all(doc[k] == v for k, v in match.items())]
+            if existing:
+                existing[0].update(update)
+            else:
+                self.documents.append(dict(update))
+
+    async def insert_many(self, documents):
+        self.documents.extend(documents)
+
+@pytest.mark.asyncio
+async def test_recomputes_do_not_duplicate_daily_summaries():
+    collection = FakeTimelineCollection()
+    database = MagicMock(timeline_events=collection)
+    cache = MagicMock(data_version=AsyncMock(side_effect=[1, 2]), get=AsyncMock(return_value=None), set=AsyncMock())
+    summaries = {
+        "2024-03-01": {"count": 3, "total_amount": 120.0},
+        "2024-03-02": {"count": 5, "total_amount": 80.0},
+    }
+
+    with patch("src.services.timeline_generator.db", database), patch("src.services.timeline_generator.cache", cache):
+        generator = TimelineGenerator()
+        await generator.generate_events("m1", {"risk_score": 10, "risk_factors": []}, summaries=summaries)
+        assert len(collection.documents) == 2
+        summaries["2024-03-02"] = {"count": 6, "total_amount": 95.0}
+        await generator.generate_events("m1", {"risk_score": 10, "risk_factors": []}, summaries=summaries)
+
+    assert len(collection.documents) == 2
+    assert "6 transactions" in collection.documents[1]["description"]
+
+@pytest.mark.asyncio
+async def test_cached_events_are_per_window():
+    stored = {}
+    cache = MagicMock(
+        data_version=AsyncMock(return_value=1),
+        get=AsyncMock(side_effect=lambda namespace, key: stored.get(key)),
+        set=AsyncMock(side_effect=lambda namespace, key, value: stored.setdefault(key, value)),
+    )
+    month = {f"2024-03-{day:02d}": {"count": 1, "total_amount": 1.0} for day in range(1, 31)}
+    database = MagicMock(timeline_events=FakeTimelineCollection())
+
+    with patch("src.services.timeline_generator.db", database), patch("src.services.timeline_generator.cache", cache):
+        generator = TimelineGenerator()
+        assert len(await generator.generate_events("m1", {"risk_score": 10}, summaries=month, days=30)) == 30
+        last_day = {"2024-03-30": month["2024-03-30"]}
+        day = await generator.generate_events("m1", {"risk_score": 10}, summaries=last_day, days=1)
+    assert len(day) == 1
+
+@pytest.mark.asyncio
+async def test_high_risk_alert_is_raised_once_per_crossing():
+    collection = FakeTimelineCollection()
+    cache = MagicMock(data_version=AsyncMock(return_value=1), get=AsyncMock(return_value=None), set=AsyncMock())
+
+    with patch("src.services.timeline_generator.db", MagicMock(timeline_events=collection)), \
+            patch("src.services.timeline_generator.cache", cache):
+        generator = TimelineGenerator()
+        for score in (90, 95, 40, 80):
+            await generator.generate_events("m1", {"risk_score": score, "risk_factors": ["velocity"]}, summaries={})
+
+    alerts = [doc for doc in collection.documents if doc["event_type"] == "HIGH_RISK_ALERT"]
+    assert [alert["metadata"]["open"] for alert in alerts] == [False, True]
+    assert alerts[0]["description"] == "High risk score detected: 90"